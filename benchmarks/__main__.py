@@ -0,0 +1,50 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Runs the benchmarks and compares them with the saved baseline"""
+
+from __future__ import print_function
+
+from sigtools.modifiers import annotate, kwoargs
+
+from clize import run
+from benchmarks import (
+    suite, startup, signatures, positional, parsing, dispatch, helptext,
+    formatter)
+
+
+MODULES = (
+    startup, signatures, positional, parsing, dispatch, helptext, formatter)
+
+
+@kwoargs('repeat', 'save', 'baseline')
+@annotate(repeat=('r', int), save='s', baseline='b')
+def main(repeat=3, save=False, baseline=suite.DEFAULT_BASELINE, *names):
+    """Measures the time and peak memory taken by each benchmark, and
+    shows how they changed since the baseline was saved
+
+    names: Only run the benchmarks whose names start with one of these
+
+    repeat: How many times to time each benchmark. The best time is kept.
+
+    save: Store the measurements as the new baseline
+
+    baseline: The file the baseline is stored in
+    """
+    saved = suite.load_baseline(baseline)
+    results = {}
+    print('{0:<44} {1:>15} {2:>8} {3:>10} {4:>8}'.format(
+        'benchmark', 'time', 'change', 'peak', 'change'))
+    for module in MODULES:
+        for bench in module.benchmarks():
+            if names and not bench.name.startswith(names):
+                continue
+            result = results[bench.name] = bench.measure(repeat)
+            print(suite.format_result(bench.name, result, saved))
+    if save:
+        suite.save_baseline(baseline, results)
+
+
+if __name__ == '__main__':
+    run(main)
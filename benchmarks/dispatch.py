@@ -0,0 +1,51 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Times a dispatcher with many subcommands, as a new process would run
+it: building it, then running one command or listing them all"""
+
+from functools import partial
+
+from sigtools import support
+
+from clize import runner, errors
+from benchmarks.suite import Benchmark
+
+
+def commands(count):
+    """Returns ``count`` documented functions named ``command0`` and up."""
+    ret = []
+    for i in range(count):
+        func = support.f('arg, *, flag=False', name='command{0}'.format(i))
+        func.__doc__ = """Command number {0}
+
+        arg: An argument
+
+        flag: A flag
+        """.format(i)
+        ret.append(func)
+    return ret
+
+
+def _run(funcs, *args):
+    return runner.SubcommandDispatcher(funcs).cli('bench', *args)
+
+
+def _typo(funcs, command):
+    try:
+        _run(funcs, command)
+    except errors.ArgumentError as exc:
+        return str(exc)
+
+
+def benchmarks():
+    funcs = commands(1000)
+    yield Benchmark('dispatcher: 1000 commands, run last',
+                    partial(_run, funcs, 'command999', 'x', '--flag'),
+                    number=10)
+    yield Benchmark('dispatcher: 1000 commands, --help',
+                    partial(_run, funcs, '--help'))
+    yield Benchmark('dispatcher: 1000 commands, typo',
+                    partial(_typo, funcs, 'comand999'),
+                    number=10)
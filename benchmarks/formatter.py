@@ -0,0 +1,33 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Times laying out long option lists in columns"""
+
+from functools import partial
+
+from clize import util
+from benchmarks.suite import Benchmark
+
+
+def option_rows(count):
+    return [
+        ('-{0}, --option-{1} VALUE'.format(chr(97 + i % 26), i),
+         'Describes option {0}, with enough words that this text has to be '
+         'wrapped over a few lines in a terminal.'.format(i))
+        for i in range(count)]
+
+
+def layout(rows, width=80):
+    f = util.Formatter(max_width=width)
+    with f.columns() as cols:
+        for row in rows:
+            cols.append(*row)
+    return str(f)
+
+
+def benchmarks():
+    for count in (100, 1000):
+        rows = option_rows(count)
+        yield Benchmark('Formatter: {0} option rows'.format(count),
+                        partial(layout, rows), number=max(1000 // count, 1))
@@ -0,0 +1,50 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Times building the help for docstrings in clize's format and in
+Sphinx's format"""
+
+from functools import partial
+
+from sigtools import support
+
+from clize import runner
+from benchmarks.suite import Benchmark
+
+
+PARAMETERS = 20
+
+
+def clize_docstring(count):
+    return 'Does things\n\n' + ''.join(
+        'p{0}: Describes parameter {0}, which does something\n\n'.format(i)
+        for i in range(count)) + 'Some footnotes.\n'
+
+
+def sphinx_docstring(count):
+    return 'Does things\n\n' + ''.join(
+        ':param p{0}: Describes parameter {0}, which does something\n'
+        .format(i)
+        for i in range(count)) + '\nSome footnotes.\n'
+
+
+def documented_function(docstring, count):
+    func = support.f(', '.join(
+        'p{0}=0'.format(i) for i in range(count)))
+    func.__doc__ = docstring
+    return func
+
+
+def _help(func):
+    return runner.Clize(func)('bench', '--help')
+
+
+def benchmarks():
+    for label, make in (('clize', clize_docstring),
+                        ('sphinx', sphinx_docstring)):
+        func = documented_function(make(PARAMETERS), PARAMETERS)
+        _help(func)
+        yield Benchmark(
+            'help: {0} docstring, {1} parameters'.format(label, PARAMETERS),
+            partial(_help, func), number=20)
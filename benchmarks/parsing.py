@@ -0,0 +1,59 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Times reading long command lines"""
+
+import string
+from functools import partial
+
+from sigtools import support
+
+from clize import parser
+from benchmarks.suite import Benchmark
+
+
+LETTERS = string.ascii_lowercase
+
+
+def _signature(sig_str):
+    return parser.CliSignature.from_signature(support.s(sig_str))
+
+
+def star_args(count):
+    """``*args`` converted to `int`, with ``count`` arguments."""
+    csig = _signature('*args:int')
+    return csig, [str(i) for i in range(count)]
+
+
+def short_clusters(count):
+    """Short flags and an option given as clusters like ``-abco5``,
+    followed by ``count`` positional arguments."""
+    flags = ', '.join(
+        '{0}:"{1}"=False'.format(c * 2, c) for c in LETTERS if c != 'o')
+    csig = _signature('*args, ' + flags + ', oo:"o"=0')
+    clusters = ['-' + LETTERS[i:i + 5].replace('o', '') for i in range(0, 25, 5)]
+    return csig, clusters + ['-o5'] + [str(i) for i in range(count)]
+
+
+def long_options(count):
+    """``count`` distinct long options, given as ``--name=value``."""
+    csig = _signature('*, ' + ', '.join(
+        'opt{0}:int=0'.format(i) for i in range(count)))
+    return csig, ['--opt{0}={0}'.format(i) for i in range(count)]
+
+
+def _read(csig, args):
+    return csig.read_arguments(args, 'bench')
+
+
+def benchmarks():
+    for label, make in (('*args', star_args),
+                        ('short clusters +', short_clusters),
+                        ('long options', long_options)):
+        for count in (100, 1000):
+            csig, args = make(count)
+            _read(csig, args)
+            yield Benchmark(
+                'read_arguments: {0} {1}'.format(label, count),
+                partial(_read, csig, args), number=max(10000 // count, 1))
@@ -0,0 +1,48 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Times binding arguments to signatures with many positional parameters"""
+
+import timeit
+from functools import partial
+
+from sigtools import support
+
+from clize import parser, run
+from benchmarks.suite import Benchmark
+
+
+def positional_signature(count):
+    return parser.CliSignature.from_signature(
+        support.s(', '.join('a{0}'.format(i) for i in range(count))))
+
+
+def benchmarks():
+    for count in (10, 100, 1000):
+        csig = positional_signature(count)
+        args = [str(i) for i in range(count)]
+        yield Benchmark(
+            'read_arguments: {0} positionals'.format(count),
+            partial(csig.read_arguments, args, 'bench'),
+            number=max(10000 // count, 1))
+
+
+def main(number=20, *counts):
+    """Reads as many arguments as there are positional parameters
+
+    number: How many times to bind the arguments for each size
+
+    counts: Signature sizes to time. Defaults to 10, 100 and 1000
+    """
+    for count in map(int, counts or (10, 100, 1000)):
+        csig = positional_signature(count)
+        args = [str(i) for i in range(count)]
+        elapsed = timeit.timeit(
+            lambda: csig.read_arguments(args, 'bench'), number=number)
+        print('{0:>6} positionals: {1:10.1f} us/parse'.format(
+            count, elapsed / number * 1e6))
+
+
+if __name__ == '__main__':
+    run(main)
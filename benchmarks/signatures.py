@@ -0,0 +1,32 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Times building CLI signatures from function signatures"""
+
+from functools import partial
+
+from sigtools import support
+
+from clize import parser
+from benchmarks.suite import Benchmark
+
+
+def mixed_signature(count):
+    """Returns a signature with about ``count`` parameters: positional
+    parameters, ``*args``, and flags and options with and without short
+    aliases."""
+    third = max(count // 3, 1)
+    pos = ['p{0}'.format(i) for i in range(third)]
+    flags = ['f{0}=False'.format(i) for i in range(third)]
+    opts = ['o{0}:int=0'.format(i) for i in range(count - 2 * third)]
+    return support.s(', '.join(pos + ['*args'] + flags + opts))
+
+
+def benchmarks():
+    for count in (10, 100, 1000):
+        sig = mixed_signature(count)
+        yield Benchmark(
+            'from_signature: {0} parameters'.format(count),
+            partial(parser.CliSignature.from_signature, sig),
+            number=max(1000 // count, 1))
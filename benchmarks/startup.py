@@ -0,0 +1,40 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Times importing clize in a new interpreter"""
+
+import os
+import sys
+import subprocess
+from functools import partial
+
+from benchmarks.suite import Benchmark
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PEAK_SCRIPT = (
+    'import tracemalloc; tracemalloc.start(); import {0}; '
+    'print(tracemalloc.get_traced_memory()[1])')
+
+
+def _python(code):
+    return subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)
+
+
+def _peak(module):
+    try:
+        return int(_python(PEAK_SCRIPT.format(module)))
+    except (subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def benchmarks():
+    # the interpreter's own startup time, to subtract from the others
+    yield Benchmark('import: python -c pass', partial(_python, 'pass'),
+                    number=5, peak=lambda: None)
+    for module in ('clize', 'clize.help'):
+        yield Benchmark(
+            'import: ' + module, partial(_python, 'import ' + module),
+            number=5, peak=partial(_peak, module))
@@ -0,0 +1,103 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Measures benchmarks and compares them with a stored baseline"""
+
+import os
+import gc
+import json
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+class Benchmark(object):
+    """A piece of work to time.
+
+    :param str name: Identifies the benchmark in reports and baselines.
+    :param func: Does the work. Anything it doesn't need to measure should
+        be set up beforehand.
+    :param int number: How many times to call ``func`` for each timing.
+    :param peak: If given, called instead of tracing ``func`` to find the
+        peak memory use in bytes, for work done outside this process.
+    """
+
+    def __init__(self, name, func, number=1, peak=None):
+        self.name = name
+        self.func = func
+        self.number = number
+        self.peak = peak
+
+    def time(self, repeat=3):
+        """Returns the best time taken by one call to `func`, in seconds."""
+        timer = timeit.Timer(self.func)
+        return min(timer.repeat(repeat=repeat, number=self.number)
+                   ) / self.number
+
+    def peak_memory(self):
+        """Returns how many bytes were allocated at most during one call to
+        `func`, or `None` if that can't be measured."""
+        if self.peak is not None:
+            return self.peak()
+        if tracemalloc is None:
+            return None
+        gc.collect()
+        tracemalloc.start()
+        try:
+            self.func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def measure(self, repeat=3):
+        """Returns a dict with the ``time`` and ``peak`` measurements."""
+        return {'time': self.time(repeat), 'peak': self.peak_memory()}
+
+
+def load_baseline(path):
+    """Reads the measurements saved by `save_baseline`, or returns an
+    empty dict if there are none."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_baseline(path, results):
+    """Adds ``results`` to the measurements stored in ``path``."""
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def _format_peak(peak):
+    if peak is None:
+        return '{0:>10}'.format('-')
+    return '{0:7.1f} KiB'.format(peak / 1024.0)
+
+
+def _format_change(new, old):
+    if not old or new is None:
+        return '{0:>8}'.format('')
+    return '{0:+7.1f}%'.format((new - old) * 100.0 / old)
+
+
+def format_result(name, result, baseline):
+    """Returns one report line, with the changes relative to the
+    ``baseline`` measurement of the same benchmark, if any."""
+    base = baseline.get(name, {})
+    return '{0:<44} {1:12.1f} us {2} {3} {4}'.format(
+        name, result['time'] * 1e6,
+        _format_change(result['time'], base.get('time')),
+        _format_peak(result['peak']),
+        _format_change(result['peak'], base.get('peak')))
@@ -0,0 +1,97 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Runs coroutines returned by commands and value converters.
+
+This module uses Python 3.5 syntax and is only imported once an awaitable
+object was returned, which can't happen on earlier versions."""
+
+import asyncio
+import inspect
+
+from clize import trace
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def run(awaitable):
+    """Runs ``awaitable`` to completion on a new event loop and returns its
+    result."""
+    try:
+        asyncio_run = asyncio.run
+    except AttributeError:
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(_await(awaitable))
+        finally:
+            loop.close()
+    return asyncio_run(_await(awaitable))
+
+
+def running():
+    """Tells whether an event loop is running in the current thread."""
+    try:
+        get_running_loop = asyncio.get_running_loop
+    except AttributeError:
+        return asyncio._get_running_loop() is not None
+    try:
+        get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def schedule(awaitable):
+    """Starts running ``awaitable`` on the running event loop and returns
+    the `asyncio.Task` that will hold its result."""
+    return asyncio.ensure_future(awaitable)
+
+
+async def gather(awaitables):
+    """Awaits ``awaitables`` concurrently. Returns their results in the
+    same order, with the exception raised in place of the result for those
+    that failed."""
+    return await asyncio.gather(*awaitables, return_exceptions=True)
+
+
+async def then(awaitable, func):
+    """Awaits ``awaitable``, then returns ``func`` called with its result,
+    awaiting that too if it is awaitable."""
+    ret = func(await awaitable)
+    if inspect.isawaitable(ret):
+        ret = await ret
+    return ret
+
+
+async def converted(awaitable, fail):
+    """Awaits ``awaitable``, raising ``fail(exc)`` instead of any exception
+    ``exc`` it raises."""
+    try:
+        return await awaitable
+    except Exception as e:
+        raise fail(e)
+
+
+async def result(value):
+    """Returns ``value``, after awaiting it if it is awaitable."""
+    if inspect.isawaitable(value):
+        value = await value
+    return value
+
+
+async def traced(name, awaitable):
+    """Awaits ``awaitable`` within `.trace.phase` ``name``."""
+    with trace.phase(name):
+        return await awaitable
+
+
+async def anext(iterator):
+    """Returns the next value of ``iterator``, awaiting it if needed."""
+    try:
+        value = next(iterator)
+    except StopIteration:
+        raise StopAsyncIteration
+    return await result(value)
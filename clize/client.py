@@ -0,0 +1,148 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Runs command lines on a server started with `clize.server`
+
+Usage::
+
+    python path/to/clize/client.py /tmp/myapp.sock --some --arguments
+
+This module only uses the standard library, so that the client starts about
+as fast as Python itself. Running the file directly, as above, doesn't
+import clize at all. ``python -m clize.client`` works too, but imports the
+``clize`` package and its dependencies first.
+
+This needs a platform with Unix domain sockets and Python 3.3 or later.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import time
+import array
+import errno
+import socket
+import struct
+import contextlib
+
+
+CONNECT_RETRY = 1.0
+"""How many seconds `call` keeps trying to connect while the server is
+starting, for instance when it restarts after a change."""
+
+_HEADER = struct.Struct('!I')
+_STATUS = struct.Struct('!i')
+
+
+def _check_support():
+    if not (hasattr(socket, 'AF_UNIX')
+            and hasattr(socket.socket, 'sendmsg')):
+        raise OSError(
+            'clize.client needs Unix domain sockets and Python 3.3 or later')
+
+
+def _encode(request):
+    return json.dumps(request).encode('utf-8', 'surrogatepass')
+
+
+def _recv_exactly(sock, size, data=b''):
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError('Connection closed')
+        data += chunk
+    return data
+
+
+def send_request(sock, request, fds):
+    """Sends ``request``, a JSON-serializable dict, and the file descriptors
+    ``fds`` over the Unix domain socket ``sock``."""
+    data = _encode(request)
+    sock.sendmsg(
+        [_HEADER.pack(len(data))],
+        [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])
+    sock.sendall(data)
+
+
+def _connect(path, retry):
+    deadline = time.time() + retry
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except socket.error as exc:
+            sock.close()
+            if (exc.errno not in (errno.ENOENT, errno.ECONNREFUSED)
+                    or time.time() >= deadline):
+                raise
+            time.sleep(0.05)
+        else:
+            return sock
+
+
+def call(path, args, cwd=None, env=None, stdio=(0, 1, 2),
+         retry=CONNECT_RETRY):
+    """Runs a command line on the server listening at ``path`` and returns
+    its exit status.
+
+    :param sequence args: The command line, starting with the program name.
+    :param str cwd: The working directory to run it in. Defaults to the
+        current one.
+    :param dict env: The environment variables to run it with. Defaults to
+        `os.environ`.
+    :param stdio: The file descriptors to use as its standard input, output
+        and error.
+    :param float retry: How long to keep trying to connect if the server
+        isn't listening yet, in seconds.
+    :raises OSError: if this platform doesn't support Unix domain sockets
+        with file descriptor passing.
+    :raises EOFError: if the server closed the connection without sending
+        an exit status.
+    """
+    _check_support()
+    request = {
+        'argv': list(args),
+        'cwd': os.getcwd() if cwd is None else cwd,
+        'env': dict(os.environ if env is None else env),
+    }
+    with contextlib.closing(_connect(path, retry)) as sock:
+        send_request(sock, request, stdio)
+        status, = _STATUS.unpack(_recv_exactly(sock, _STATUS.size))
+    return status
+
+
+_USAGE = 'Usage: {0} socket-path [args...]'
+
+
+def main(args=None):
+    """Runs the command line in ``args``, which defaults to `sys.argv`, on
+    the server listening at the socket given as its first argument, then
+    exits with the command's exit status.
+
+    The program name passed to the command is the socket's file name
+    without its extension."""
+    if args is None:
+        args = sys.argv
+    pname = os.path.basename(args[0])
+    if len(args) < 2:
+        print(_USAGE.format(pname), file=sys.stderr)
+        sys.exit(2)
+    if args[1] in ('-h', '--help'):
+        print(_USAGE.format(pname))
+        sys.exit()
+    path = args[1]
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        status = call(path, [name] + list(args[2:]))
+    except (socket.error, OSError, EOFError) as exc:
+        print('{0}: Could not run the command on {1}: {2}'.format(
+            pname, path, exc), file=sys.stderr)
+        sys.exit(1)
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
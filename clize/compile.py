@@ -0,0 +1,266 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Ahead-of-time compilation of a command into a module that can run it
+without introspecting it
+
+Usage::
+
+    python -m clize.compile myapp.cli:main -o myapp/_cli_compiled.py
+
+The generated module stores the command's parameters and its help
+rendered for a few terminal widths. Its ``main`` function checks that the
+source files involved haven't changed and otherwise falls back to
+building the command's CLI as usual.
+"""
+
+import contextlib
+import hashlib
+import itertools
+from functools import partial
+
+from six.moves import cPickle as pickle
+from sigtools.modifiers import annotate, kwoargs
+
+from clize import runner, parser, parameters, errors, util
+
+
+PICKLE_PROTOCOL = 2
+
+CLIZE_MODULES = ('clize.parser', 'clize.help', 'clize.runner')
+
+DEFAULT_WIDTHS = (78, 80, 100, 120)
+
+
+def _module_checksum(modname):
+    path = runner._module_source(modname)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except (IOError, OSError):
+        return None
+
+
+def _source_modules(cli):
+    func_signature = cli.func_signature
+    sources = func_signature.sources
+    funcs = itertools.chain(
+        [cli.func], sources['+depths'],
+        *(sources[pname] for pname in func_signature.parameters))
+    modules = set(CLIZE_MODULES)
+    for func in funcs:
+        module = getattr(func, '__module__', None)
+        if module is not None:
+            modules.add(module)
+    return sorted(modules)
+
+
+@contextlib.contextmanager
+def _terminal_width(width):
+    orig = util.get_terminal_width
+    util.get_terminal_width = lambda: width
+    try:
+        yield
+    finally:
+        util.get_terminal_width = orig
+
+
+def _get_compilable_cli(target):
+    try:
+        cli = runner.Clize.get_cli(target).target
+    except (ValueError, ImportError, AttributeError) as exc:
+        raise errors.UserError("Can't load {0}: {1}".format(target, exc))
+    if (not isinstance(cli, runner.Clize)
+            or isinstance(cli.owner, runner.SubcommandDispatcher)):
+        raise errors.UserError(
+            "{0} is not a single command and can't be compiled"
+            .format(target))
+    return cli
+
+
+def compile_cli(target, name, widths=DEFAULT_WIDTHS):
+    """Returns the source of a module that runs the command designated by
+    ``target``, such as ``'myapp.cli:main'``, with its parameters and help
+    precomputed.
+
+    :param str name: The program name to render the help for.
+    :param widths: The terminal widths to render the help for.
+    """
+    cli = _get_compilable_cli(target)
+    params = parser.CliSignature.convert_parameters(cli.func_signature)
+    try:
+        data = pickle.dumps(params, PICKLE_PROTOCOL)
+        pickle.loads(data)
+    except Exception as exc:
+        raise errors.UserError(
+            "The parameters of {0} can't be stored: {1}".format(target, exc))
+    checksums = dict(
+        (modname, _module_checksum(modname))
+        for modname in _source_modules(cli))
+    helper = cli.helper
+    texts = {}
+    for width in widths:
+        with _terminal_width(width):
+            texts['help', name, width] = helper.cli(name + ' --help')
+            texts['usage', name, width] = helper.cli(
+                name + ' --help', '--usage')
+    texts['short usage', name, None] = '\n'.join(helper.show_usage(name))
+    return _TEMPLATE.format(
+        target=target, checksums=_format_dict(checksums),
+        parameters=repr(data), texts=_format_dict(texts))
+
+
+def _format_dict(d):
+    return '{\n' + ''.join(
+        '    {0!r}: {1!r},\n'.format(key, d[key]) for key in sorted(d)
+        ) + '}'
+
+
+_TEMPLATE = '''\
+# Generated by "python -m clize.compile {target}". Do not edit.
+"""Precomputed command-line interface for {target}"""
+
+from clize.compile import run_compiled
+
+
+TARGET = {target!r}
+
+CHECKSUMS = {checksums}
+
+PARAMETERS = {parameters}
+
+TEXTS = {texts}
+
+
+def main(**kwargs):
+    return run_compiled(TARGET, CHECKSUMS, PARAMETERS, TEXTS, **kwargs)
+
+
+if __name__ == '__main__':
+    main()
+'''
+
+
+class _StoredParameters(object):
+    """Stands in for a `.SignatureCache` to provide the parameters stored
+    in a compiled module."""
+
+    def __init__(self, func, data):
+        self.func = func
+        self.data = data
+
+    def get(self, func):
+        if func is not self.func:
+            return None
+        return pickle.loads(self.data)
+
+    def put(self, func, parameters, func_signature=None):
+        pass
+
+    def flush(self):
+        pass
+
+
+class _StoredHelpCli(object):
+    def __init__(self, helper):
+        self._helper = helper
+
+    def __call__(self, name, *args):
+        kind = {(): 'help', ('--usage',): 'usage'}.get(args)
+        text = self._helper.texts.get(
+            (kind, name.rpartition(' ')[0], util.get_terminal_width()))
+        if text is None:
+            return self._helper.helper.cli(name, *args)
+        return text
+
+    def __getattr__(self, name):
+        return getattr(self._helper.helper.cli, name)
+
+
+class StoredHelp(object):
+    """Helper that serves the help stored in a compiled module, and builds
+    it as usual for program names or terminal widths it wasn't rendered
+    for.
+
+    :param texts: The stored help texts.
+    :param helper_class: The helper class the command would otherwise use.
+    """
+
+    def __init__(self, subject, owner, texts, helper_class=None):
+        self.subject = subject
+        self.owner = owner
+        self.texts = texts
+        self.helper_class = helper_class
+
+    @util.property_once
+    def helper(self):
+        """The helper that builds the help."""
+        if self.helper_class is None:
+            from clize.help import ClizeHelp as class_
+        else:
+            class_ = self.helper_class
+        return class_(self.subject, self.owner)
+
+    @util.property_once
+    def cli(self):
+        return _StoredHelpCli(self)
+
+    def show_usage(self, name):
+        text = self.texts.get(('short usage', name, None))
+        if text is None:
+            return self.helper.show_usage(name)
+        return tuple(text.split('\n'))
+
+    def __getattr__(self, name):
+        return getattr(self.helper, name)
+
+
+def load_compiled(target, checksums, parameters, texts):
+    """Returns the CLI object for ``target``, set up to use the stored
+    parameters and help if the checksums of the source files match."""
+    cli = _get_compilable_cli(target)
+    if not all(_module_checksum(modname) == checksum
+               for modname, checksum in checksums.items()):
+        return cli
+    cli.signature_cache = _StoredParameters(cli.func, parameters)
+    cli.helper_class = partial(
+        StoredHelp, texts=texts, helper_class=cli.helper_class)
+    return cli
+
+
+def run_compiled(target, checksums, parameters, texts, **kwargs):
+    """Runs a compiled command. ``kwargs`` are passed to `.run`."""
+    runner.run(load_compiled(target, checksums, parameters, texts), **kwargs)
+
+
+@kwoargs('width', 'output', 'name')
+@annotate(output='o', name='n', width=('w', int, parameters.multi()))
+def main(target, width, output=None, name=None):
+    """Compile a command into a module that runs it without introspecting
+    it or building its help
+
+    target: The command to compile, as in ``package.module:function``
+
+    output: The file to write the module to. Prints it if unset.
+
+    name: The program name to render the help for. Defaults to the name of
+    the command's top-level package.
+
+    width: The terminal widths to render the help for. Defaults to 78, 80,
+    100 and 120.
+    """
+    if name is None:
+        name = target.partition(':')[0].partition('.')[0]
+    widths = width or DEFAULT_WIDTHS
+    source = compile_cli(target, name, widths)
+    if output is None:
+        return source
+    with open(output, 'w') as f:
+        f.write(source)
+
+
+if __name__ == '__main__':
+    runner.run(main)
@@ -164,9 +164,16 @@ class SetErrorContext(object):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if isinstance(exc_val, self.exc_type):
-            for key, val in self.values.items():
-                if not hasattr(exc_val, key):
-                    setattr(exc_val, key, val)
+            set_error_context(exc_val, **self.values)
+
+
+def set_error_context(exc, **attributes):
+    """Sets attributes on ``exc`` if they are yet unset. Used by
+    `SetErrorContext` and directly in hot loops where entering a context
+    manager for every iteration would be wasteful."""
+    for key, val in attributes.items():
+        if not hasattr(exc, key):
+            setattr(exc, key, val)
 
 SetUserErrorContext = partial(SetErrorContext, UserError)
 SetArgumentErrorContext = partial(SetErrorContext, ArgumentError)
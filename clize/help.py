@@ -25,11 +25,12 @@ from __future__ import unicode_literals
 
 import sys
 import io
+import hashlib
 import itertools
 import inspect
 import re
+from functools import partial
 
-import od
 import attr
 import six
 from docutils.frontend import OptionParser
@@ -39,7 +40,7 @@ from docutils import nodes as dunodes, transforms
 from docutils.transforms import references
 from sigtools.modifiers import annotate, kwoargs
 
-from clize import runner, parser, util, parameters
+from clize import runner, parser, util, parameters, trace
 
 
 def _lines_to_paragraphs(L):
@@ -402,9 +403,30 @@ Designates a paragraph after a parameter description.
 """
 
 
+_FIELD_MARKER_RE = re.compile(r'^[ \t]*:(?![: ])', re.M)
+
+
+def may_have_field_list(docstring):
+    """Tells whether ``docstring`` has a line that could start a
+    reStructuredText field list, such as ``:param name: ...``.
+
+    This is only a lexical check: it may return `True` for docstrings
+    that have no field list, but never returns `False` for one that
+    does.
+    """
+    return _FIELD_MARKER_RE.search(docstring) is not None
+
+
 def elements_from_autodetected_docstring(docstring, name):
     if not docstring:
         return ()
+    if not may_have_field_list(docstring):
+        return elements_from_clize_docstring(docstring)
+    blocks = _read_simple_sphinx_docstring(docstring)
+    if blocks is not None:
+        if not any(block[0] == _FIELD for block in blocks):
+            return elements_from_clize_docstring(docstring)
+        return list(_elements_from_simple_sphinx(blocks))
     document, errout = document_from_sphinx_docstring(docstring, name)
     if document.next_node(dunodes.field_list, include_self=True) is None:
         return elements_from_clize_docstring(docstring)
@@ -449,6 +471,19 @@ class HelpForAutodetectedDocstring(HelpForParameters):
         ret.add_from_parameter_sources(subject)
         return ret
 
+    @classmethod
+    def description_from_subject(cls, subject, owner):
+        """Returns the first header paragraph of the help `from_subject`
+        would build, reading only the docstring the header comes from.
+
+        Takes the same arguments as `from_subject`.
+        """
+        ret = cls.blank_from_signature(subject.signature)
+        real_subject, _ = ret._get_parameter_sources(subject)
+        ret.add_docstring(
+            inspect.getdoc(real_subject), real_subject.__name__, set(), True)
+        return ret.header[0] if ret.header else ''
+
     @classmethod
     def _get_param_type(cls, param):
         try:
@@ -485,6 +520,19 @@ class HelpForAutodetectedDocstring(HelpForParameters):
 
         :param .Clize subject: the Clize runner to document
         """
+        real_subject, funcs = self._get_parameter_sources(subject)
+        self.add_docstring(inspect.getdoc(real_subject), real_subject.__name__, None, True)
+        for func, pnames in funcs:
+            try:
+                fname = func.__name__
+            except AttributeError:
+                pass
+            else:
+                self.add_docstring(
+                    inspect.getdoc(func), fname,
+                    pnames - self._documented, False)
+
+    def _get_parameter_sources(self, subject):
         func_signature = subject.func_signature
         funcs = util.OrderedDict()
         for pname in func_signature.parameters:
@@ -496,16 +544,7 @@ class HelpForAutodetectedDocstring(HelpForParameters):
             funcs.items(),
             key=lambda i: func_signature.sources['+depths'].get(i[0], 1000))
         real_subject = self._pop_real_subject(funcs, subject) or subject
-        self.add_docstring(inspect.getdoc(real_subject), real_subject.__name__, None, True)
-        for func, pnames in funcs:
-            try:
-                fname = func.__name__
-            except AttributeError:
-                pass
-            else:
-                self.add_docstring(
-                    inspect.getdoc(func), fname,
-                    pnames - self._documented, False)
+        return real_subject, funcs
 
     def add_docstring(self, docstring, name, pnames, primary):
         """Parses and integrates info from a docstring to this instance.
@@ -603,7 +642,8 @@ class _NodeSeeker(dunodes.GenericNodeVisitor, object):
 def _du_field_name_and_body(node):
     name = None
     body = None
-    for n in node.traverse():
+    # Node.traverse is deprecated in favour of Node.findall from docutils 0.18
+    for n in getattr(node, 'findall', node.traverse)():
         if isinstance(n, dunodes.field_name):
             name = n
         elif isinstance(n, dunodes.field_body):
@@ -633,6 +673,10 @@ def _is_label(text, node):
         )
 
 
+def _indent_preformatted(text):
+    return '\n'.join('    ' + line for line in text.split('\n'))
+
+
 class _SphinxVisitor(dunodes.SparseNodeVisitor, object):
     def __init__(self, *args, **kwargs):
         super(_SphinxVisitor, self).__init__(*args, **kwargs)
@@ -662,7 +706,7 @@ class _SphinxVisitor(dunodes.SparseNodeVisitor, object):
         raise dunodes.SkipChildren
 
     def indent_preformatted(self, text):
-        return '\n'.join('    ' + line for line in text.split('\n'))
+        return _indent_preformatted(text)
 
     def visit_literal_block(self, node):
         self.result.append(
@@ -706,6 +750,7 @@ def document_from_sphinx_docstring(source, name):
     """Reads a Sphinx.autodoc-compatible docstring into something
     `helpstream_from_elements` can process.
     """
+    trace.count('docutils parse')
     parser = Parser()
     settings = OptionParser(components=(Parser,)).get_default_values()
     errout = settings.warning_stream = io.StringIO()
@@ -722,11 +767,148 @@ def elements_from_sphinx_document(document):
     return visitor
 
 def elements_from_sphinx_docstring(docstring, name):
+    blocks = _read_simple_sphinx_docstring(docstring)
+    if blocks is not None:
+        return list(_elements_from_simple_sphinx(blocks))
     document, errout = document_from_sphinx_docstring(docstring, name)
     sys.stderr.write(errout)
     return elements_from_sphinx_document(document)
 
 
+# Most docstrings only use paragraphs, ``::`` literal blocks and field
+# lists. These are read without docutils, and anything else, including
+# inline markup, is left to docutils. When in doubt, these regular
+# expressions reject text rather than risk reading it differently.
+
+_PARAGRAPH, _LITERAL, _FIELD = 'paragraph', 'literal', 'field'
+
+_SIMPLE_FIELD_RE = re.compile(r'^:([^:`\\\s][^:`\\]*)(?<! ):(?: +(.*))?$')
+_OTHER_BLOCK_RE = re.compile(
+    r'[-+*=|:/]|\.\.( |$)|>>>( |$)|'
+    r'\(?(\d+|#|[a-zA-Z]|[ivxlcdmIVXLCDM]+)[.)]( |$)|'
+    '[\u2022\u2023\u2043]')
+_SECTION_LINE_RE = re.compile(r'^([^\w\s])\1*$')
+_INLINE_MARKUP_RE = re.compile(r'[*`|\\]|_(?!\w)')
+_LITERAL_MARKER_RE = re.compile(r'(?<!\\)(\\\\)*::$')
+
+
+class _NotSimple(Exception):
+    pass
+
+
+def _read_simple_sphinx_docstring(docstring):
+    """Reads ``docstring`` into a list of ``(_PARAGRAPH, text)``,
+    ``(_LITERAL, text)`` and ``(_FIELD, name, blocks)`` tuples, or returns
+    `None` if it needs to be read with docutils."""
+    lines = [line.expandtabs(8).rstrip() for line in docstring.splitlines()]
+    indent = min(
+        [len(line) - len(line.lstrip()) for line in lines if line] or [0])
+    try:
+        return _read_simple_blocks([line[indent:] for line in lines], True)
+    except _NotSimple:
+        return None
+
+
+def _indented_block(lines, start):
+    """Returns the end of the indented block starting at ``start``, its
+    lines without their common indentation and whether it was followed by
+    a blank line."""
+    end = start
+    while end < len(lines) and (not lines[end] or lines[end][0] == ' '):
+        end += 1
+    block = lines[start:end]
+    blank_after = end == len(lines)
+    while block and not block[-1]:
+        block.pop()
+        blank_after = True
+    indent = min([len(line) - len(line.lstrip()) for line in block if line]
+                 or [0])
+    return end, [line[indent:] for line in block], blank_after
+
+
+def _read_simple_blocks(lines, allow_fields):
+    blocks = []
+    i = 0
+    blank_before = True
+    while i < len(lines):
+        line = lines[i]
+        if not line:
+            blank_before = True
+            i += 1
+            continue
+        if line[0] == ' ':
+            raise _NotSimple
+        field = _SIMPLE_FIELD_RE.match(line)
+        if field and allow_fields:
+            if not blank_before and blocks[-1][0] != _FIELD:
+                raise _NotSimple
+            name, first = field.group(1), field.group(2) or ''
+            if _INLINE_MARKUP_RE.search(name):
+                raise _NotSimple
+            i, body, blank_before = _indented_block(lines, i + 1)
+            body.insert(0, first)
+            while body and not body[0]:
+                body.pop(0)
+            blocks.append((_FIELD, name, _read_simple_blocks(body, False)))
+            continue
+        if not blank_before or (line != '::' and _OTHER_BLOCK_RE.match(line)):
+            raise _NotSimple
+        end = i + 1
+        while end < len(lines) and lines[end]:
+            if lines[end][0] in ' :' or _SECTION_LINE_RE.match(lines[end]):
+                raise _NotSimple
+            end += 1
+        if _SECTION_LINE_RE.match(line) and line != '::':
+            raise _NotSimple
+        text = '\n'.join(lines[i:end])
+        if _INLINE_MARKUP_RE.search(text):
+            raise _NotSimple
+        i = end
+        if not _LITERAL_MARKER_RE.search(text):
+            blocks.append((_PARAGRAPH, text))
+            continue
+        if len(text) > 2:
+            if text[-3] in ' \n':
+                blocks.append((_PARAGRAPH, text[:-3].rstrip()))
+            else:
+                blocks.append((_PARAGRAPH, text[:-1]))
+        while i < len(lines) and not lines[i]:
+            i += 1
+        if i == end or i == len(lines) or lines[i][0] != ' ':
+            raise _NotSimple
+        i, literal, blank_before = _indented_block(lines, i)
+        blocks.append((_LITERAL, '\n'.join(literal)))
+    return blocks
+
+
+def _elements_from_simple_sphinx(blocks):
+    for i, block in enumerate(blocks):
+        if block[0] == _PARAGRAPH:
+            text = block[1]
+            if (text.endswith(':') and i + 1 < len(blocks)
+                    and blocks[i + 1][0] == _FIELD):
+                yield EL_LABEL, text[:-1]
+            else:
+                yield EL_FREE_TEXT, _remove_newlines(text), False
+        elif block[0] == _LITERAL:
+            yield EL_FREE_TEXT, _indent_preformatted(block[1]), True
+        else:
+            options = block[1].split()
+            if options[0] != 'param':
+                continue
+            param = options[-1]
+            body = list(block[2])
+            description = ""
+            if body and body[0][0] == _PARAGRAPH:
+                description = _remove_newlines(body.pop(0)[1])
+            yield EL_PARAM_DESC, param, description
+            for kind, text in body:
+                if kind == _PARAGRAPH:
+                    yield EL_AFTER, param, _remove_newlines(text), False
+                else:
+                    yield EL_AFTER, param, _indent_preformatted(text), True
+
+
 class HelpForSphinxDocstring(HelpForClizeDocstring):
     """Builds generic parameter help from the docstrings of Clize instances
 
@@ -752,6 +934,21 @@ def _alternate_usages(alternate_params):
                 yield subname + ' ' + usage
 
 
+class _DeferredList(object):
+    """Iterable that computes its items the first time it is iterated
+    over."""
+
+    def __init__(self, func):
+        self.func = func
+
+    @util.property_once
+    def items(self):
+        return list(self.func())
+
+    def __iter__(self):
+        return iter(self.items)
+
+
 @attr.s
 class HelpForSubcommands(object):
     """Stores help for subcommand dispatchers.
@@ -767,11 +964,17 @@ class HelpForSubcommands(object):
     .. attribute:: footer
 
         Iterable of paragraphs for the help footnotes.
+
+    .. attribute:: manifest
+
+        The `.CommandManifest` the descriptions of the subcommands are
+        recorded in, if any.
     """
     _usages = attr.ib()
     subcommands = attr.ib()
     header = attr.ib()
     footer = attr.ib()
+    manifest = attr.ib(default=None)
 
     @classmethod
     def from_subject(cls, subject, owner):
@@ -785,11 +988,11 @@ class HelpForSubcommands(object):
         :param .SubcommandDispatcher owner: The subcommand dispatcher being
             documented.
         """
-        usages = cls._get_usages(subject.signature.alternate, owner.cmds.items())
-        subcommands = od(
-            (names, cls._get_description(command))
-            for names, command in owner.cmds.items()
-        )
+        usages = _DeferredList(partial(
+            cls._get_usages, subject.signature.alternate, owner.cmds))
+        manifest = getattr(owner, 'manifest', None)
+        subcommands = util.LazyMapping(
+            owner.cmds, partial(cls._get_description, manifest=manifest))
         header = footer = ()
         if owner.description:
             header = cls._get_free_text(
@@ -797,10 +1000,28 @@ class HelpForSubcommands(object):
         if owner.footnotes:
             footer = cls._get_free_text(
                 elements_from_clize_docstring(inspect.cleandoc(owner.footnotes)))
-        return cls(list(usages), subcommands, list(header), list(footer))
+        return cls(usages, subcommands, list(header), list(footer),
+                   manifest)
 
     @classmethod
-    def _get_description(cls, command):
+    def description_from_subject(cls, subject, owner):
+        """Returns the first header paragraph of the help `from_subject`
+        would build, without looking at the subcommands."""
+        if owner.description:
+            for text in cls._get_free_text(elements_from_clize_docstring(
+                    inspect.cleandoc(owner.description))):
+                return text
+        return ''
+
+    @classmethod
+    def _get_description(cls, command, manifest=None):
+        import_path = getattr(command, 'import_path', None)
+        if manifest is not None and import_path is not None:
+            description = manifest.get_description(import_path)
+            if description is None:
+                description = cls._get_description(command)
+                manifest.put_description(import_path, description)
+            return description
         try:
             return command.helper.description
         except AttributeError:
@@ -810,7 +1031,7 @@ class HelpForSubcommands(object):
     def _get_usages(cls, alternate_params, subcommands):
         for usage in _alternate_usages(alternate_params):
             yield usage
-        for names, subcommand in subcommands:
+        for names, subcommand in six.iteritems(subcommands):
             try:
                 get_usages = subcommand.helper.usages
             except AttributeError:
@@ -845,6 +1066,8 @@ class HelpForSubcommands(object):
             with f.columns() as cols:
                 for names, description in self.subcommands.items():
                     cols.append(', '.join(names), description)
+        if self.manifest is not None:
+            self.manifest.flush()
         return f
 
     def show_usage(self, name):
@@ -864,6 +1087,25 @@ class HelpForSubcommands(object):
             yield usage
 
 
+def _describer(builder):
+    """Returns the ``description_from_subject`` method matching ``builder``,
+    if ``builder`` is a ``from_subject`` method and the class defining it
+    also defines ``description_from_subject``."""
+    cls = getattr(builder, '__self__', None)
+    if not isinstance(cls, type) \
+            or getattr(builder, '__name__', None) != 'from_subject':
+        return None
+    for klass in cls.__mro__:
+        attrs = vars(klass)
+        if 'description_from_subject' in attrs:
+            if 'from_subject' in attrs:
+                return cls.description_from_subject
+            return None
+        elif 'from_subject' in attrs:
+            return None
+    return None
+
+
 class HelpCli(object):
     """A command-line interface for constructing and accessing the help
     and other meta-information about a CLI"""
@@ -873,6 +1115,7 @@ class HelpCli(object):
         self.subject = subject
         self.owner = owner
         self.builder = builder
+        self._help = None
 
     @runner.Clize(hide_help=True)
     @kwoargs('usage')
@@ -883,21 +1126,74 @@ class HelpCli(object):
         usage: Only show the full usage
         """
         name = name.rpartition(' ')[0]
-        f = util.Formatter()
-        help = self.get_help()
-        if usage:
-            f.extend(help.show_full_usage(name))
-        else:
-            f.extend(help.show_help(name))
-        return six.text_type(f)
+        return self._cached(
+            'usage' if usage else 'help', name,
+            partial(self._render, name, usage))
+
+    def _render(self, name, usage):
+        with trace.phase('render help'):
+            f = util.Formatter()
+            help = self.get_help()
+            if usage:
+                f.extend(help.show_full_usage(name))
+            else:
+                f.extend(help.show_help(name))
+            return six.text_type(f)
+
+    def _cached(self, kind, name, render):
+        cache = getattr(self.subject, 'help_cache', None)
+        key = None if cache is None else self._cache_key(kind, name)
+        if key is None:
+            return render()
+        text = cache.get(key)
+        if text is None:
+            text = render()
+            cache.put(key, text)
+        return text
+
+    def _cache_key(self, kind, name):
+        cls = getattr(self.builder, '__self__', None)
+        if not (isinstance(cls, type)
+                and issubclass(cls, HelpForAutodetectedDocstring)):
+            return None
+        subject = self.subject
+        sources = subject.func_signature.sources
+        funcs = util.OrderedDict.fromkeys([subject.func])
+        for pname in subject.func_signature.parameters:
+            funcs.update(util.OrderedDict.fromkeys(sources[pname]))
+        funcs.update(util.OrderedDict.fromkeys(sources['+depths']))
+        for param in subject.signature.alternate:
+            func = getattr(param, 'func', None)
+            funcs[getattr(func, 'func', func)] = None
+        parts = [
+            kind, name, util.get_terminal_width(),
+            six.text_type(subject.signature),
+            runner._file_fingerprint(sys.modules[__name__]),
+        ]
+        for func in funcs:
+            module = getattr(func, '__module__', None)
+            parts.append((
+                module,
+                getattr(func, '__qualname__', getattr(func, '__name__', None)),
+                inspect.getdoc(func),
+                runner._file_fingerprint(sys.modules.get(module)),
+            ))
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
 
     def get_help(self):
         """Get the object """
-        return self.builder(self.subject, self.owner)
+        if self._help is None:
+            with trace.phase('build help'):
+                self._help = self.builder(self.subject, self.owner)
+        return self._help
 
     @property
     def description(self):
         """A short description of this command"""
+        if self._help is None:
+            describe = _describer(self.builder)
+            if describe is not None:
+                return describe(self.subject, self.owner)
         header = self.get_help().header
         if header:
             return header[0]
@@ -917,7 +1213,12 @@ class HelpCli(object):
 
     def show_usage(self, name):
         """Legacy alias of ``get_help().show_usage(...)``"""
-        return self.get_help().show_usage(name)
+        if getattr(self.subject, 'help_cache', None) is None:
+            return self.get_help().show_usage(name)
+        return tuple(self._cached(
+            'short usage', name,
+            lambda: '\n'.join(self.get_help().show_usage(name))
+            ).split('\n'))
 
     def usages(self):
         """Legacy alias of ``get_help().usages(...)``"""
@@ -88,11 +88,11 @@ class MakeflagParameter(parser.NamedParameter):
     def get_value(self, ba, i):
         assert self.takes_argument != 0
         arg = ba.in_args[i]
-        if (
-                self.takes_argument == 1
-                or arg[1] != '-' and len(arg) > 2
-                or '=' in arg
-                ):
+        if arg.startswith('--'):
+            glued = '=' in arg
+        else:
+            glued = len(arg) > ba.short_offset + 1
+        if self.takes_argument == 1 or glued:
             return super(MakeflagParameter, self).get_value(ba, i)
         args = ba.in_args[i+1:i+1+self.takes_argument]
         if len(args) != self.takes_argument:
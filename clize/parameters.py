@@ -2,13 +2,14 @@
 # Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
 # COPYING for details.
 
+import sys
 import inspect
 from functools import update_wrapper
 
 import six
 from sigtools import modifiers, specifiers, signatures
 
-from clize import parser, errors, util
+from clize import parser, errors, util, trace
 
 
 class _ShowList(BaseException):
@@ -225,6 +226,7 @@ class _SubBoundArguments(object):
     sticky = _ComposedProperty('sticky')
     posarg_only = _ComposedProperty('posarg_only')
     skip = _ComposedProperty('skip')
+    short_offset = _ComposedProperty('short_offset')
     unsatisfied = _ComposedProperty('unsatisfied')
     not_provided = _ComposedProperty('not_provided')
 
@@ -250,6 +252,7 @@ class _DerivBoundArguments(object):
     sticky = _ComposedProperty('sticky')
     posarg_only = _ComposedProperty('posarg_only')
     skip = _ComposedProperty('skip')
+    short_offset = _ComposedProperty('short_offset')
 
 
 class ForwarderParameter(parser.NamedParameter,
@@ -326,18 +329,34 @@ class DecoratedArgumentParameter(parser.ParameterWithSourceEquivalent):
     def __init__(self, decorator, **kwargs):
         super(DecoratedArgumentParameter, self).__init__(**kwargs)
         self.decorator = decorator
+        self._read_decorator()
+        try:
+            super(DecoratedArgumentParameter, type(self)).required.__get__
+        except AttributeError:
+            self._sub_required = self.required
+        self.required = True
+
+    def _read_decorator(self):
+        trace.count('signature')
         self.cli = parser.CliSignature.from_signature(
-            signatures.mask(specifiers.signature(decorator), 1))
+            signatures.mask(specifiers.signature(self.decorator), 1))
         self.extras = [
             _redirect_ba(p, self)
             for p in self.cli.parameters.values()
             #if not isinstance(p, ForwarderParameter)
             ]
-        try:
-            super(DecoratedArgumentParameter, type(self)).required.__get__
-        except AttributeError:
-            self._sub_required = self.required
-        self.required = True
+
+    def __getstate__(self):
+        # the forwarders in extras patch methods of the decorator's
+        # parameters, so both are rebuilt when unpickling
+        state = dict(self.__dict__)
+        del state['cli'], state['extras']
+        state['decorator'] = _picklable_function(self.decorator)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._read_decorator()
 
     def get_meta(self, ba):
         return ba.meta.setdefault(self.argument_name, _DapMeta(ba, self))
@@ -403,6 +422,39 @@ class DecoratedArgumentParameter(parser.ParameterWithSourceEquivalent):
             p.prepare_help(helper)
 
 
+class _DecoratedFunction(object):
+    """Stands for a function whose module-level name holds a decorated
+    version of it, such as `pass_name`, so that pickle can find it."""
+
+    def __init__(self, func):
+        self.func = func
+
+    def __reduce__(self):
+        return _undecorated_function, (
+            self.func.__module__,
+            getattr(self.func, '__qualname__', self.func.__name__))
+
+
+def _undecorated_function(module, name):
+    import importlib
+    obj = importlib.import_module(module)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj.__wrapped__
+
+
+def _picklable_function(func):
+    try:
+        obj = sys.modules[func.__module__]
+        for attr in getattr(func, '__qualname__', func.__name__).split('.'):
+            obj = getattr(obj, attr)
+    except (AttributeError, KeyError):
+        return func
+    if obj is not func and getattr(obj, '__wrapped__', None) is func:
+        return _DecoratedFunction(func)
+    return func
+
+
 def argument_decorator(f):
     """Decorates a function to create an annotation for adding parameters
     to qualify another.
@@ -410,8 +462,10 @@ def argument_decorator(f):
     .. literalinclude:: /../examples/argdeco.py
        :lines: 5-24
     """
-    return parser.use_mixin(
+    ret = parser.use_mixin(
         DecoratedArgumentParameter, kwargs={'decorator': f})
+    ret.__wrapped__ = f
+    return ret
 
 
 class InserterParameter(parser.ParameterWithSourceEquivalent):
@@ -427,6 +481,11 @@ class InserterParameter(parser.ParameterWithSourceEquivalent):
         self.required = True
         self.value_factory = value_factory
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['value_factory'] = _picklable_function(self.value_factory)
+        return state
+
 
 class InserterPositionalParameter(InserterParameter):
     def read_argument(self, ba, i):
@@ -466,6 +525,7 @@ def value_inserter(value_factory):
         kwargs={'value_factory': value_factory},
         name='value_inserter({})'.format(name))
     update_wrapper(uc, value_factory)
+    uc.__wrapped__ = value_factory
     return uc
 
 
@@ -14,7 +14,12 @@ import six
 from sigtools import modifiers
 import attr
 
-from clize import errors, util
+from clize import errors, util, trace
+
+
+def _overrides(obj, base, name):
+    return (six.get_unbound_function(getattr(type(obj), name))
+            is not six.get_unbound_function(getattr(base, name)))
 
 
 class ParameterFlag(object):
@@ -56,6 +61,11 @@ class Parameter(object):
     Mostly only useful for ``*args`` parameters. In other cases, simply don't
     provide a default value."""
 
+    S = STREAM = ParameterFlag('STREAM')
+    """Annotate a positional parameter with this for it to receive all
+    remaining positional arguments as an iterator, which converts each
+    value only when it is reached. See `StreamParameter`."""
+
 
     required = False
     """Is this parameter required?"""
@@ -110,6 +120,14 @@ class Parameter(object):
     def post_parse(self, ba):
         """Called after all arguments are processed successfully."""
 
+    def needs_post_parse(self):
+        """Tells whether `post_parse` must be called for this parameter.
+
+        `.CliSignature` only calls `post_parse` on parameters for which this
+        returns true. The default implementation checks whether `post_parse`
+        was overridden."""
+        return _overrides(self, Parameter, 'post_parse')
+
     def get_all_names(self):
         """Return a string with all of this parameter's names."""
         return self.get_full_name()
@@ -175,8 +193,14 @@ class HelperParameter(Parameter):
             display_name='<internal>', **kwargs)
 
 
+CONVERSION_THREADS = 8
+"""How many threads convert the values of a multi-value parameter at
+most, for converters decorated with ``value_converter(concurrent=True)``."""
+
+
 @modifiers.kwoargs(start='name')
-def value_converter(func=None, name=None, convert_default=False):
+def value_converter(func=None, name=None, convert_default=False,
+                    lazy=False, validate=None, concurrent=False):
     """Callables decorated with this can be used as a value converter.
 
     :param str name: Use this name to designate the parameter value type.
@@ -193,6 +217,25 @@ def value_converter(func=None, name=None, convert_default=False):
 
         Make sure to handle `None` appropriately if you override this.
 
+    :param bool lazy: If true, the parameter receives a `DeferredValue`
+        that only calls the converter when its ``value`` is first read,
+        so that expensive conversions are skipped when the value isn't
+        used. The decorated callable itself is left unchanged.
+
+    :param validate: A callable that is passed the argument before it is
+        converted, at the time the arguments are read. It can raise
+        `ValueError` or `.errors.CliValueError` to reject it before the
+        command runs, even if the conversion is deferred.
+
+    :param concurrent: If true, parameters that take several values, such
+        as ``*args`` and `.parameters.multi` options, collect all their
+        arguments before converting them together on a pool of
+        `CONVERSION_THREADS` threads, or as many as given. Use this for
+        converters that spend their time waiting on I/O.
+
+    Passing ``lazy``, ``validate`` or ``concurrent`` leaves ``func`` itself
+    unchanged and returns a new converter.
+
     See :ref:`value converter`.
     """
     def decorate(func):
@@ -200,6 +243,11 @@ def value_converter(func=None, name=None, convert_default=False):
             'name': util.name_type2cli(func) if name is None else name,
             'convert_default': convert_default,
         }
+        if concurrent:
+            info['concurrent'] = (
+                CONVERSION_THREADS if concurrent is True else concurrent)
+        if lazy or validate is not None or concurrent:
+            func = _deferring_converter(func, lazy, validate)
         try:
             func._clize__value_converter = info
             return func
@@ -214,6 +262,107 @@ def value_converter(func=None, name=None, convert_default=False):
     return decorate
 
 
+def _deferring_converter(func, lazy, validate):
+    @wraps(func)
+    def _converter(arg):
+        if validate is not None:
+            validate(arg)
+        if lazy:
+            return DeferredValue(func, arg)
+        return func(arg)
+    return _converter
+
+
+def _convert(conv, arg):
+    try:
+        return conv(arg)
+    except ValueError as e:
+        raise _conversion_error(e, arg)
+
+
+def _conversion_error(e, arg):
+    if isinstance(e, errors.CliValueError):
+        exc = errors.BadArgumentFormat(e)
+    elif isinstance(e, ValueError):
+        exc = errors.BadArgumentFormat(repr(arg))
+    else:
+        return e
+    exc.__cause__ = e
+    return exc
+
+
+_AWAITING = util.Sentinel('_AWAITING')
+
+
+def _awaited_error(param, arg, ba, e):
+    """Returns the error to raise for ``e``, raised while awaiting the
+    value converted from ``arg``, with its context set."""
+    exc = _conversion_error(e, arg)
+    if isinstance(exc, errors.ArgumentError):
+        errors.set_error_context(exc, param=param, val=arg, ba=ba)
+    return exc
+
+
+def _replace_values(values, replacements):
+    for i, value in enumerate(values):
+        if isinstance(value, list):
+            _replace_values(value, replacements)
+        else:
+            values[i] = replacements.get(id(value), value)
+
+
+class DeferredValue(object):
+    """Passed to the callee in place of a value whose converter was
+    decorated with ``value_converter(lazy=True)``.
+
+    .. attribute:: arg
+
+        The argument, before conversion.
+
+    .. attribute:: param
+
+        The parameter that received it.
+    """
+
+    def __init__(self, conv, arg):
+        self.conv = conv
+        self.arg = arg
+        self.param = None
+        self.ba = None
+
+    @util.property_once
+    def value(self):
+        """The converted value. The conversion happens the first time this
+        is read, and raises `.errors.BadArgumentFormat` if it fails.
+
+        If the converter is a coroutine function and an event loop is
+        running, this is an `asyncio.Task` to await instead. `get` returns
+        an awaitable in all cases."""
+        try:
+            ret = _convert(self.conv, self.arg)
+        except errors.ArgumentError as exc:
+            errors.set_error_context(
+                exc, param=self.param, val=self.arg, ba=self.ba)
+            raise
+        if util.isawaitable(ret):
+            from clize import _async
+            ret = _async.converted(
+                ret, partial(_awaited_error, self.param, self.arg, self.ba))
+            if _async.running():
+                return _async.schedule(ret)
+            return util.run_awaitable(ret)
+        return ret
+
+    def get(self):
+        """Returns an awaitable of the converted value, for use in
+        coroutine functions: ``value = await deferred.get()``."""
+        from clize import _async
+        return _async.result(self.value)
+
+    def __repr__(self):
+        return '<{0} for {1!r}>'.format(type(self).__name__, self.arg)
+
+
 @value_converter(name='STR')
 def identity(x=None):
     return x
@@ -284,19 +433,41 @@ class ParameterWithValue(Parameter):
         """Coerces ``arg`` using the `.conv` function. Raises
         `.errors.BadArgumentFormat` if the coercion function raises
         `ValueError`.
+
+        Calls the `ParseHooks.conversion_started` and
+        `ParseHooks.conversion_finished` methods of the signature's hooks
+        around the conversion.
         """
+        hooks = ba.sig.hooks if ba is not None else ()
+        if not hooks:
+            return self._coerce_value(arg, ba)
+        for hook in hooks:
+            hook.conversion_started(ba, self, arg)
+        start = trace._clock()
         try:
-            ret = self.conv(arg)
-        except errors.CliValueError as e:
-            exc = errors.BadArgumentFormat(e)
-            exc.__cause__ = e
-            raise exc
-        except ValueError as e:
-            exc = errors.BadArgumentFormat(repr(arg))
-            exc.__cause__ = e
-            raise exc
+            ret = self._coerce_value(arg, ba)
+        except Exception as exc:
+            elapsed = trace._clock() - start
+            for hook in hooks:
+                hook.conversion_finished(ba, self, arg, None, elapsed, exc)
+            raise
+        elapsed = trace._clock() - start
+        for hook in hooks:
+            hook.conversion_finished(ba, self, arg, ret, elapsed, None)
+        return ret
+
+    def _coerce_value(self, arg, ba):
+        if trace.current is None:
+            ret = _convert(self.conv, arg)
         else:
-            return ret
+            with trace.phase('convert {0}', self.display_name):
+                ret = _convert(self.conv, arg)
+        if isinstance(ret, DeferredValue):
+            ret.param = self
+            ret.ba = ba
+        elif util.isawaitable(ret):
+            ba.meta.setdefault(_AWAITING, []).append((ret, self, arg))
+        return ret
 
     def get_value(self, ba, i):
         """Retrieves the "value" part of the argument in ``ba`` at
@@ -310,14 +481,22 @@ class ParameterWithValue(Parameter):
 
     def post_parse(self, ba):
         super(ParameterWithValue, self).post_parse(ba)
+        if self._converts_default() and self in ba.not_provided:
+            self.set_value(ba, self.coerce_value(self.default, ba))
+
+    def needs_post_parse(self):
+        """Only requires `post_parse` if it was overridden or if the default
+        value needs to be converted."""
+        if _overrides(self, ParameterWithValue, 'post_parse'):
+            return True
+        return self._converts_default()
+
+    def _converts_default(self):
         try:
             info = self.conv._clize__value_converter
         except AttributeError:
-            pass
-        else:
-            if self.default != util.UNSET and info['convert_default']:
-                if self in ba.not_provided:
-                    self.set_value(ba, self.coerce_value(self.default, ba))
+            return False
+        return self.default != util.UNSET and info['convert_default']
 
 
 class NamedParameter(Parameter):
@@ -361,35 +540,34 @@ class NamedParameter(Parameter):
         with one dash.
 
         For instance when ``-a`` is a flag in ``-abcd``, the object implementing
-        it will call this to proceed as if ``-a -bcd`` was passed."""
+        it will call this to proceed as if ``-a -bcd`` was passed.
+
+        ``ba.in_args`` is left untouched: `CliBoundArguments.short_offset` is
+        moved to the start of ``rest`` while the next parameter reads it."""
         if not rest:
             return
         try:
-            nparam = ba.sig.aliases['-' + rest[0]]
-        except KeyError as e:
-            raise errors.UnknownOption(e.args[0])
-        orig_args = ba.in_args
-        ba.in_args = ba.in_args[:i] + ('-' + rest,) + ba.in_args[i + 1:]
+            nparam = ba.sig.plan.short[rest[0]]
+        except KeyError:
+            raise errors.UnknownOption('-' + rest[0])
+        orig_offset = ba.short_offset
+        ba.short_offset = len(ba.in_args[i]) - len(rest)
         try:
             nparam.read_argument(ba, i)
         finally:
-            ba.in_args = orig_args
+            ba.short_offset = orig_offset
         ba.unsatisfied.discard(nparam)
         ba.not_provided.discard(nparam)
 
     def get_value(self, ba, i):
-        """Fetches the value after the ``=`` (``--opt=val``) or in the
-        next argument (``--opt val``)."""
+        """Fetches the value after the ``=`` (``--opt=val``), after the short
+        option (``-oval``) or in the next argument (``--opt val``)."""
         arg = super(NamedParameter, self).get_value(ba, i)
         if arg.startswith('--'):
             name, glued, val = arg.partition('=')
         else:
-            arg = arg.lstrip('-')
-            if len(arg) > 1:
-                glued = True
-                val = arg[1:]
-            else:
-                glued = False
+            val = arg[ba.short_offset + 1:]
+            glued = bool(val)
         if not glued:
             try:
                 val = ba.in_args[i+1]
@@ -466,7 +644,7 @@ class FlagParameter(OptionParameter):
             self.set_value(ba, self.coerce_value(val, ba) if sep else self.value)
         else:
             self.set_value(ba, self.value)
-            self.redispatch_short_arg(arg[2:], ba, i)
+            self.redispatch_short_arg(arg[ba.short_offset + 1:], ba, i)
 
     def format_argument(self, long_alias):
         """Formats the argument value type for usage messages.
@@ -498,7 +676,7 @@ class IntOptionParameter(OptionParameter):
             super(IntOptionParameter, self).read_argument(ba, i)
             return
 
-        arg = arg.lstrip('-')[1:]
+        arg = arg[ba.short_offset + 1:]
         if not arg:
             super(IntOptionParameter, self).read_argument(ba, i)
             return
@@ -519,26 +697,26 @@ class PositionalParameter(ParameterWithValue, ParameterWithSourceEquivalent):
         If `ba.args <CliBoundArguments.args>` is not filled up to this
         parameter's position yet, it will be filled with default values.
 
+        The position is looked up in `ParsePlan.positions`, so binding all
+        positional parameters of a signature takes linear time.
+
         :raises ValueError: when setting a parameter after unsatisfied
             parameters with no default value.
         """
-        matched = util.zip_longest(ba.sig.positional, ba.args, fillvalue=util.UNSET)
-        for i, (param, arg) in enumerate(matched):
-            if param is self:
-                if arg is util.UNSET:
-                    ba.args.append(val)
-                else:
-                    ba.args[i] = val
-                return
-            else:
-                if arg is util.UNSET:
-                    if param.default != util.UNSET:
-                        ba.args.append(param.default)
-                    else:
-                        raise ValueError(
-                            "Can't set parameters after required parameters")
-        else:
+        try:
+            index = ba.sig.plan.positions[self]
+        except KeyError:
             raise ValueError("{!r} not present in signature".format(self))
+        args = ba.args
+        if index < len(args):
+            args[index] = val
+            return
+        for param in ba.sig.positional[len(args):index]:
+            if param.default == util.UNSET:
+                raise ValueError(
+                    "Can't set parameters after required parameters")
+            args.append(param.default)
+        args.append(val)
 
     def help_parens(self):
         """Puts the value type in parenthesis since it isn't shown in
@@ -568,11 +746,51 @@ class MultiParameter(ParameterWithValue):
         """Return an object that new values will be appended to."""
         raise NotImplementedError
 
+    @property
+    def concurrency(self):
+        """How many threads convert this parameter's values, or 0 if they
+        are converted one at a time as they are read. Set using
+        ``value_converter(concurrent=...)``."""
+        try:
+            return self.conv._clize__value_converter.get('concurrent', 0)
+        except AttributeError:
+            return 0
+
     def read_argument(self, ba, i):
         """Reset read_argument to avoid hitting `OptionParameter.read_argument`
-        which checks for duplicate parameters"""
+        which checks for duplicate parameters.
+
+        If the values are converted concurrently, stores the argument for
+        `post_parse` to convert instead."""
+        if self.concurrency:
+            arg = self.get_value(ba, i)
+            self.set_value(ba, arg)
+            col = self.get_collection(ba)
+            ba.meta.setdefault((self, 'pending'), []).append(
+                (col, len(col) - 1, arg, i))
+            return
         self.set_value(ba, self.coerce_value(self.get_value(ba, i), ba))
 
+    def post_parse(self, ba):
+        """Converts the values collected by `read_argument` if they are
+        converted concurrently."""
+        super(MultiParameter, self).post_parse(ba)
+        pending = ba.meta.pop((self, 'pending'), None)
+        if pending:
+            if trace.current is None:
+                _convert_pending(self, ba, pending)
+            else:
+                with trace.phase('convert {0} ({1} values)',
+                                 self.display_name, len(pending)):
+                    _convert_pending(self, ba, pending)
+
+    def needs_post_parse(self):
+        """Requires `post_parse` if values are converted concurrently, if it
+        was overridden, or if the default value needs to be converted."""
+        return (bool(self.concurrency)
+                or _overrides(self, MultiParameter, 'post_parse')
+                or self._converts_default())
+
     def set_value(self, ba, val):
         """Adds passed argument to the collection returned
         by `get_collection`."""
@@ -602,6 +820,51 @@ class MultiParameter(ParameterWithValue):
         return super(MultiParameter, self).get_full_name() + '...'
 
 
+def _timed_convert(conv, arg):
+    start = trace._clock()
+    try:
+        value = _convert(conv, arg)
+    except Exception as exc:
+        return None, exc, trace._clock() - start
+    return value, None, trace._clock() - start
+
+
+def _convert_pending(param, ba, pending):
+    """Converts the ``(collection, index, arg, position)`` entries in
+    ``pending`` on a thread pool and stores the values in place. Raises
+    the error for the first argument that fails to convert, in argument
+    order."""
+    hooks = ba.sig.hooks
+    for hook in hooks:
+        for _, _, arg, _ in pending:
+            hook.conversion_started(ba, param, arg)
+    convert = partial(_timed_convert, param.conv)
+    args = [arg for _, _, arg, _ in pending]
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+    except ImportError:
+        results = [convert(arg) for arg in args]
+    else:
+        workers = min(param.concurrency, len(args))
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(convert, args))
+    for (col, index, arg, pos), (value, exc, elapsed) in zip(
+            pending, results):
+        for hook in hooks:
+            hook.conversion_finished(ba, param, arg, value, elapsed, exc)
+        if exc is not None:
+            if isinstance(exc, errors.ArgumentError):
+                errors.set_error_context(
+                    exc, param=param, pos=pos, val=arg, ba=ba)
+            raise exc
+        if isinstance(value, DeferredValue):
+            value.param = param
+            value.ba = ba
+        elif util.isawaitable(value):
+            ba.meta.setdefault(_AWAITING, []).append((value, param, arg))
+        col[index] = value
+
+
 class ExtraPosArgsParameter(MultiParameter, PositionalParameter):
     """Parameter that forwards all remaining positional arguments to the
     callee.
@@ -624,6 +887,106 @@ class ExtraPosArgsParameter(MultiParameter, PositionalParameter):
         ba.sticky = self
 
 
+class ArgumentStream(object):
+    """Iterator over the arguments given to a `StreamParameter`, converting
+    each one as it is reached.
+
+    Conversion errors are raised while iterating, as
+    `.errors.BadArgumentFormat` with the usual context for them to be
+    displayed with the command's usage.
+    """
+
+    def __init__(self, param, ba):
+        self.param = param
+        self.ba = ba
+        self.args = []
+        """The arguments, before conversion."""
+        self._pos = 0
+
+    def append(self, arg):
+        self.args.append(arg)
+
+    def __len__(self):
+        """The number of values not yet iterated over."""
+        return len(self.args) - self._pos
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """Returns the next value. If the converter is a coroutine function
+        and an event loop is running, returns an awaitable of the value
+        instead, as iterating with ``async for`` does."""
+        if self._pos >= len(self.args):
+            raise StopIteration
+        arg = self.args[self._pos]
+        self._pos += 1
+        try:
+            value = self.param.coerce_value(arg, self.ba)
+        except errors.ArgumentError as exc:
+            errors.set_error_context(
+                exc, param=self.param, val=arg, ba=self.ba)
+            raise
+        if self.ba.meta.pop(_AWAITING, None):
+            from clize import _async
+            value = _async.converted(
+                value, partial(_awaited_error, self.param, arg, self.ba))
+            if not _async.running():
+                value = util.run_awaitable(value)
+        return value
+
+    next = __next__
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        from clize import _async
+        return _async.anext(self)
+
+    def __repr__(self):
+        return '<{0} for {1} with {2} values left>'.format(
+            type(self).__name__, self.param.display_name, len(self))
+
+
+class StreamParameter(ExtraPosArgsParameter):
+    """Parameter that passes all remaining positional arguments to the
+    callee as a single `ArgumentStream`, so that each value is only
+    converted when the callee iterates over it.
+
+    Used to convert positional parameters annotated with
+    `Parameter.STREAM`. ``*args`` parameters can't be streamed, since Python
+    collects their values in a tuple before the callee runs.
+    """
+
+    def read_argument(self, ba, i):
+        """Collects the argument without converting it."""
+        self.set_value(ba, self.get_value(ba, i))
+
+    def get_collection(self, ba):
+        """Returns the stream that is passed to the callee, placing it in
+        `ba.args <CliBoundArguments.args>` the first time."""
+        stream = ba.meta.get(self)
+        if stream is None:
+            stream = ba.meta[self] = ArgumentStream(self, ba)
+            PositionalParameter.set_value(self, ba, stream)
+        return stream
+
+    def unsatisfied(self, ba):
+        """Lets `errors.MissingRequiredArguments` be raised or raises
+        `errors.NotEnoughValues` if arguments were passed but not enough
+        to meet `.min`."""
+        if self not in ba.meta:
+            return True
+        raise errors.NotEnoughValues
+
+    def post_parse(self, ba):
+        """Passes an empty stream if no arguments were given and the
+        parameter has no default value."""
+        if self.default is util.UNSET:
+            self.get_collection(ba)
+
+
 class AppendArguments(HelperParameter, MultiParameter):
     """Helper parameter that collects multiple values to be passed as
     positional arguments to the callee.
@@ -650,14 +1013,19 @@ class IgnoreAllArguments(HelperParameter, Parameter):
 
 class FallbackCommandParameter(NamedParameter):
     """Parameter that sets an alternative function when triggered. When used
-    as an argument other than the first all arguments are discarded."""
+    as an argument other than the first all arguments are discarded.
+
+    Subclasses that only find out the function when it is needed can leave
+    out ``func`` and provide `.func` as a property instead."""
 
     is_alternate_action = True
 
-    def __init__(self, func, **kwargs):
+    def __init__(self, func=None, **kwargs):
         super(FallbackCommandParameter, self).__init__(**kwargs)
-        self.func = func
-        """The function that will be called if this parameter is mentionned."""
+        if func is not None:
+            self.func = func
+            """The function that will be called if this parameter is
+            mentionned."""
 
     @util.property_once
     def description(self):
@@ -674,7 +1042,10 @@ class FallbackCommandParameter(NamedParameter):
         was the first argument."""
         ba.args[:] = [ba.name + ' ' + self.display_name]
         ba.kwargs.clear()
-        ba.post_name.append(ba.in_args[i])
+        arg = ba.in_args[i]
+        if ba.short_offset > 1:
+            arg = '-' + arg[ba.short_offset:]
+        ba.post_name.append(arg)
         ba.func = self.func
         ba.posarg_only = True
         ba.sticky = IgnoreAllArguments() if i else AppendArguments()
@@ -768,14 +1139,42 @@ def use_mixin(cls, kwargs={}, name=None):
     :param name: The name to use for the converter.  Uses ``cls``'s name
         if unset.
     """
-    class _PosWithMixin(cls, PositionalParameter): pass
-    class _VarargsWithMixin(cls, ExtraPosArgsParameter): pass
-    class _NamedWithMixin(cls, OptionParameter): pass
     if not name:
         name = cls.__name__
-    return use_class(pos=_PosWithMixin, varargs=_VarargsWithMixin,
-                     named=_NamedWithMixin,
-                     name=name, kwargs=kwargs)
+    return use_class(
+        pos=_mixin_class('_PosWithMixin', cls, PositionalParameter),
+        varargs=_mixin_class('_VarargsWithMixin', cls, ExtraPosArgsParameter),
+        named=_mixin_class('_NamedWithMixin', cls, OptionParameter),
+        name=name, kwargs=kwargs)
+
+
+_mixin_classes = {}
+
+
+def _mixin_class(name, cls, base):
+    key = name, cls, base
+    try:
+        return _mixin_classes[key]
+    except KeyError:
+        pass
+    ret = _mixin_classes[key] = type(name, (cls, base), {
+        '_clize__mixin': key,
+        '__reduce__': _reduce_mixin_instance,
+        })
+    return ret
+
+
+def _reduce_mixin_instance(self):
+    # mixin classes are created on the fly and can't be found by name,
+    # so they are recreated from their components when unpickling
+    getstate = getattr(self, '__getstate__', None)
+    state = self.__dict__ if getstate is None else getstate()
+    return _new_mixin_instance, type(self)._clize__mixin, state
+
+
+def _new_mixin_instance(name, cls, base):
+    mixin = _mixin_class(name, cls, base)
+    return mixin.__new__(mixin)
 
 
 def _use_class(pos_cls, varargs_cls, named_cls, varkwargs_cls, kwargs,
@@ -854,6 +1253,9 @@ def _use_class(pos_cls, varargs_cls, named_cls, varkwargs_cls, kwargs,
                 .format(default))
 
     if named:
+        if Parameter.STREAM in annotations:
+            raise ValueError(
+                "Parameter.STREAM can only be used on positional parameters")
         kwargs['aliases'] = [
             util.name_py2cli(alias, named)
             for alias in aliases]
@@ -862,6 +1264,14 @@ def _use_class(pos_cls, varargs_cls, named_cls, varkwargs_cls, kwargs,
         return named_cls(**kwargs)
     else:
         kwargs['display_name'] = util.name_py2cli(param.name)
+        if Parameter.STREAM in annotations:
+            if param.kind == param.VAR_POSITIONAL:
+                raise ValueError(
+                    "Parameter.STREAM can't be used on *{0}: Python "
+                    "collects *args in a tuple before the function runs. "
+                    "Use it on a regular parameter instead."
+                    .format(param.name))
+            return StreamParameter(**kwargs)
         if param.kind == param.VAR_POSITIONAL:
             return varargs_cls(**kwargs)
         return pos_cls(**kwargs)
@@ -892,6 +1302,93 @@ def _develop_extras(params):
             yield subparam
 
 
+@attr.s
+class ParsePlan(object):
+    """Lookup tables computed once per `.CliSignature` so that
+    `.CliBoundArguments.process_arguments` does work proportional to the
+    arguments it is given rather than to the size of the signature.
+
+    .. attribute:: aliases
+
+        Maps every alias to its `NamedParameter`.
+
+    .. attribute:: long
+
+        Maps aliases with two dashes, such as ``--opt``, to their parameter.
+
+    .. attribute:: short
+
+        Maps the character of single-dash aliases, such as ``o`` for ``-o``,
+        to their parameter. Used to walk clusters of short flags like
+        ``-abc``.
+
+    .. attribute:: positions
+
+        Maps positional parameters to their index in
+        `CliBoundArguments.args`.
+
+    .. attribute:: post_parse
+
+        Parameters on which `Parameter.post_parse` needs to be called, in
+        signature order.
+    """
+
+    aliases = attr.ib()
+    long = attr.ib()
+    short = attr.ib()
+    positions = attr.ib()
+    post_parse = attr.ib()
+
+    @classmethod
+    def from_signature(cls, sig):
+        """Builds the plan for a `.CliSignature` instance."""
+        long = {}
+        short = {}
+        for alias, param in sig.aliases.items():
+            if alias.startswith('--'):
+                long[alias] = param
+            elif len(alias) == 2:
+                short[alias[1]] = param
+        positions = dict((p, i) for i, p in enumerate(sig.positional))
+        post_parse = [
+            p for p in sig.parameters.values() if p.needs_post_parse()]
+        return cls(sig.aliases, long, short, positions, post_parse)
+
+
+class ParseHooks(object):
+    """Receives events as `.CliBoundArguments` processes arguments, such as
+    to measure how long each parameter's conversion takes.
+
+    Subclass it, override the methods for the events you are interested
+    in, and pass instances through `.Clize`'s ``hooks`` argument, which
+    sets `CliSignature.hooks`. The methods do nothing by default.
+    """
+
+    def argument_matched(self, ba, param, i):
+        """Called when the argument ``ba.in_args[i]`` is about to be
+        processed by ``param``."""
+
+    def conversion_started(self, ba, param, arg):
+        """Called before ``param`` converts ``arg``."""
+
+    def conversion_finished(self, ba, param, arg, value, elapsed, exc):
+        """Called after ``param`` converted ``arg``.
+
+        :param value: The converted value, or `None` if the conversion
+            failed.
+        :param float elapsed: The time the conversion took, in seconds.
+        :param exc: The exception raised by the conversion, or `None`.
+        """
+
+    def post_parse(self, ba):
+        """Called once all arguments have been processed and ``ba.args``,
+        ``ba.kwargs`` and ``ba.func`` are complete."""
+
+    def dispatched(self, func, name, args, kwargs):
+        """Called just before ``func`` is called with ``args`` and
+        ``kwargs``. ``name`` is the program name passed on to it."""
+
+
 class CliSignature(object):
     """A collection of parameters that can be used to translate CLI arguments
     to function arguments.
@@ -929,11 +1426,19 @@ class CliSignature(object):
         :annotation: = set()
 
         A set of all required parameters.
+
+    .. attribute:: plan
+
+        The `.ParsePlan` used to read arguments, computed on first use.
     """
 
     converter = default_converter
 
+    hooks = ()
+    """Sequence of `ParseHooks` notified as arguments are read."""
+
     def __init__(self, parameters):
+        trace.count('CliSignature')
         params = self.parameters = util.OrderedDict()
         pos = self.positional = []
         named = self.named = []
@@ -979,10 +1484,22 @@ class CliSignature(object):
         """
         return cls(
             parameters=itertools.chain(
-                filter(lambda x: x is not Parameter.IGNORE,
-                    (cls.convert_parameter(param)
-                    for param in sig.parameters.values())
-                ), extra), **kwargs)
+                cls.convert_parameters(sig), extra), **kwargs)
+
+    @classmethod
+    def convert_parameters(cls, sig):
+        """Converts all parameters of a signature object to CLI parameters,
+        leaving out ignored ones.
+
+        :param inspect.Signature sig: The signature object to use.
+        :rtype: list
+        """
+        return [
+            p for p in (
+                cls.convert_parameter(param)
+                for param in sig.parameters.values())
+            if p is not Parameter.IGNORE
+            ]
 
     @classmethod
     def convert_parameter(cls, param):
@@ -1007,15 +1524,32 @@ class CliSignature(object):
 
 
 
-    def read_arguments(self, args, name):
+    @util.property_once
+    def plan(self):
+        return ParsePlan.from_signature(self)
+
+    @util.property_once
+    def suggestions(self):
+        """A `.util.SuggestionIndex` of this signature's aliases, used to
+        suggest alternatives to unknown options."""
+        return util.SuggestionIndex(self.aliases)
+
+    def read_arguments(self, args, name, await_values=True):
         """Returns a `.CliBoundArguments` instance for this CLI signature
         bound to the given arguments.
 
         :param sequence args: The CLI arguments, minus the script name.
         :param str name: The script name.
+        :param bool await_values: Whether to await the values returned by
+            coroutine function converters on a new event loop. If false,
+            they are left in `.CliBoundArguments.awaiting` for the caller
+            to await with `.CliBoundArguments.await_values`.
         """
         ba = CliBoundArguments(self, args, name)
-        ba.process_arguments()
+        with trace.phase('process arguments'):
+            ba.process_arguments()
+        if await_values and ba.awaiting:
+            util.run_awaitable(ba.await_values())
         return ba
 
     def __str__(self):
@@ -1108,13 +1642,14 @@ class CliBoundArguments(object):
        The iterator over the positional parameters used to process positional
        arguments.
 
-    .. attribute:: namedparam
+    .. attribute:: namedparams
        :annotation: = dict(sig.aliases)
 
        The `dict` used to look up named parameters from their names.
 
-       It is copied here so that the argument parsing process may add or remove
-       parameters without affecting the original signature.
+       It is copied from the signature the first time it is accessed so that
+       the argument parsing process may add or remove parameters without
+       affecting the original signature.
 
     .. attribute:: unsatisfied
        :annotation: = set(sig.required)
@@ -1143,6 +1678,22 @@ class CliBoundArguments(object):
 
        Amount of arguments to skip.
 
+    .. attribute:: short_offset
+       :annotation: = 1
+
+       Position of the short option being processed within the current
+       argument. It is moved forward by `NamedParameter.redispatch_short_arg`
+       as a cluster of short options like ``-abc`` is processed, so that
+       parameters read their value from the right place without `.in_args`
+       being rebuilt.
+
+    .. attribute:: awaiting
+       :annotation: = []
+
+       ``(awaitable, param, arg)`` tuples for the values returned by
+       coroutine function converters, which are left in `.args` and
+       `.kwargs` until `.await_values` is awaited.
+
     """
 
     threshold = 0.75
@@ -1161,11 +1712,13 @@ class CliBoundArguments(object):
     meta = attr.ib(default=attr.Factory(dict))
 
     posparam = attr.ib(init=False)
-    namedparams = attr.ib(init=False)
+    _aliases = attr.ib(init=False, repr=False)
     unsatisfied = attr.ib(init=False)
     not_provided = attr.ib(init=False)
     posarg_only = attr.ib(init=False)
     skip = attr.ib(init=False)
+    short_offset = attr.ib(init=False)
+    awaiting = attr.ib(init=False, default=attr.Factory(list))
 
     def process_arguments(self):
         """Process the arguments in `.in_args`, setting the `.func`,
@@ -1174,20 +1727,24 @@ class CliBoundArguments(object):
         This methods reads `str`'s from `.in_args`. For each one, it finds the
         relevant `Parameter` instance in `.posparam` or `.namedparam` and
         delegates processing to it """
+        plan = self.sig.plan
+        hooks = self.sig.hooks
         self.posparam = iter(self.sig.positional)
-        self.namedparams = dict(self.sig.aliases)
+        self._aliases = plan.aliases
         self.unsatisfied = set(self.sig.required)
         self.not_provided = set(self.sig.optional)
         self.sticky = None
         self.posarg_only = False
         self.skip = 0
+        self.short_offset = 1
 
         with _SeekFallbackCommand():
             for i, arg in enumerate(self.in_args):
                 if self.skip > 0:
                     self.skip -= 1
                     continue
-                with errors.SetArgumentErrorContext(pos=i, val=arg, ba=self):
+                param = None
+                try:
                     if self.posarg_only or len(arg) < 2 or arg[0] != '-':
                         if self.sticky is not None:
                             param = self.sticky
@@ -1203,17 +1760,24 @@ class CliBoundArguments(object):
                         self.posarg_only = True
                         continue
                     else:
-                        if arg.startswith('--'):
+                        if arg[1] == '-':
                             name = arg.partition('=')[0]
                         else:
                             name = arg[:2]
                         try:
-                            param = self.namedparams[name]
+                            param = self._aliases[name]
                         except KeyError:
                             raise errors.UnknownOption(name)
-                    with errors.SetArgumentErrorContext(param=param):
-                        param.read_argument(self, i)
-                        param.apply_generic_flags(self)
+                    if hooks:
+                        for hook in hooks:
+                            hook.argument_matched(self, param, i)
+                    param.read_argument(self, i)
+                    param.apply_generic_flags(self)
+                except errors.ArgumentError as exc:
+                    if param is not None:
+                        errors.set_error_context(exc, param=param)
+                    errors.set_error_context(exc, pos=i, val=arg, ba=self)
+                    raise
 
         if not self.func:
             if self.unsatisfied:
@@ -1225,13 +1789,64 @@ class CliBoundArguments(object):
                 if unsatisfied:
                     raise errors.MissingRequiredArguments(unsatisfied)
 
-            for p in self.sig.parameters.values():
+            for p in plan.post_parse:
                 p.post_parse(self)
 
-        del self.sticky, self.posarg_only, self.skip, self.unsatisfied, self.not_provided
+        self.awaiting = self.meta.pop(_AWAITING, [])
+        if not self.awaiting:
+            for hook in hooks:
+                hook.post_parse(self)
+
+        del self.sticky, self.posarg_only, self.skip, self.short_offset
+        del self.unsatisfied, self.not_provided
+
+    def await_values(self):
+        """Returns an awaitable that awaits the values in `.awaiting`
+        together, puts them in place of the awaitables in `.args` and
+        `.kwargs`, then calls the signature's `ParseHooks.post_parse`
+        hooks.
+
+        Raises `.errors.BadArgumentFormat` with the usual context if a
+        conversion failed."""
+        from clize import _async
+        awaiting, self.awaiting = self.awaiting, []
+        ret = _async.gather([aw for aw, _, _ in awaiting])
+        if trace.current is not None:
+            ret = _async.traced('await {0} values'.format(len(awaiting)), ret)
+        return _async.then(ret, partial(self._set_awaited, awaiting))
+
+    def _set_awaited(self, awaiting, results):
+        values = {}
+        for (aw, param, arg), result in zip(awaiting, results):
+            if isinstance(result, BaseException):
+                raise _awaited_error(param, arg, self, result)
+            values[id(aw)] = result
+        _replace_values(self.args, values)
+        for key, value in self.kwargs.items():
+            if isinstance(value, list):
+                _replace_values(value, values)
+            else:
+                self.kwargs[key] = values.get(id(value), value)
+        for hook in self.sig.hooks:
+            hook.post_parse(self)
+
+    @property
+    def namedparams(self):
+        if self._aliases is self.sig.plan.aliases:
+            self._aliases = dict(self._aliases)
+        return self._aliases
+
+    @namedparams.setter
+    def namedparams(self, value):
+        self._aliases = value
 
     def get_best_guess(self, passed_in_arg):
-        return util.closest_option(passed_in_arg, list(self.sig.aliases))
+        return self.sig.suggestions.closest(passed_in_arg)
+
+    def get_best_guesses(self, passed_in_arg, count):
+        """Returns up to ``count`` aliases similar to ``passed_in_arg``, most
+        similar first."""
+        return self.sig.suggestions.suggest(passed_in_arg, count=count)
 
     def __iter__(self):
         yield self.func
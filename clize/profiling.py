@@ -0,0 +1,112 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""hidden options that profile a command
+
+Passing ``profile=True`` to `.Clize`, `.SubcommandDispatcher` or `.run`
+adds two options that can be given before any other argument:
+
+``--clize-profile=PATH``
+    Runs the rest of the command line under `cProfile` and writes the
+    statistics to ``PATH``, which can be read using `pstats`.
+
+``--clize-memory=PATH``
+    Runs the rest of the command line under `tracemalloc` and writes the
+    lines that allocated the most memory to ``PATH``.
+"""
+
+from clize import parser, errors
+
+
+TOP_ALLOCATIONS = 25
+"""How many lines `profile_memory` lists in its report."""
+
+
+def profile_cpu(path, func):
+    """Calls ``func`` under `cProfile` and writes the statistics to
+    ``path``."""
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(path)
+
+
+def profile_memory(path, func, top=TOP_ALLOCATIONS):
+    """Calls ``func`` under `tracemalloc` and writes the ``top`` lines that
+    allocated the most memory to ``path``."""
+    try:
+        import tracemalloc
+    except ImportError:
+        raise errors.UserError(
+            "Memory profiling needs the tracemalloc module (Python 3.4+)")
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        return func()
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+        stats = snapshot.statistics('lineno')
+        with open(path, 'w') as f:
+            f.write('Current: {0:.1f} KiB, peak: {1:.1f} KiB\n'.format(
+                current / 1024.0, peak / 1024.0))
+            f.write('Top {0} lines by allocated memory:\n'.format(top))
+            for stat in stats[:top]:
+                f.write('{0}\n'.format(stat))
+
+
+class ProfiledCommand(object):
+    """Runs a command line through a profiler. `.Clize` calls it with
+    itself as the command to run."""
+
+    def __init__(self, profiler, path):
+        self.profiler = profiler
+        self.path = path
+
+    def __call__(self, cli, name, *args):
+        return self.profiler(self.path, lambda: cli(name, *args))
+
+
+class ProfileParameter(parser.AlternateCommandParameter):
+    """Alternate action that runs the rest of the command line through
+    ``profiler``, a function like `profile_cpu`.
+
+    Its value is the path to write the profile to."""
+
+    def __init__(self, profiler, **kwargs):
+        super(ProfileParameter, self).__init__(**kwargs)
+        self.profiler = profiler
+
+    def read_argument(self, ba, i):
+        if i:
+            raise errors.ArgsBeforeAlternateCommand(self)
+        name, glued, path = ba.in_args[i].partition('=')
+        if not glued:
+            try:
+                path = ba.in_args[i + 1]
+            except IndexError:
+                raise errors.MissingValue
+            ba.skip = 1
+        if not path:
+            raise errors.MissingValue
+        ba.args[:] = [ba.name]
+        ba.kwargs.clear()
+        ba.func = ProfiledCommand(self.profiler, path)
+        ba.posarg_only = True
+        ba.sticky = parser.AppendArguments()
+
+
+def profile_parameters():
+    """Returns the hidden parameters that trigger profiling."""
+    return [
+        ProfileParameter(profile_cpu, aliases=['--clize-profile'],
+                         undocumented=True),
+        ProfileParameter(profile_memory, aliases=['--clize-memory'],
+                         undocumented=True),
+        ]
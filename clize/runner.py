@@ -9,11 +9,15 @@ import os
 from functools import partial, update_wrapper
 import itertools
 import shutil
+import io
+import atexit
 
+import six
 from sigtools.modifiers import annotate, autokwoargs, kwoargs
 from sigtools.specifiers import forwards_to_method, signature
 
-from clize import util, errors, parser, parameters
+from clize import util, errors, parser, parameters, trace, profiling
+from clize.trace import get_tracer, tracing
 
 
 class _BasicHelper(object):
@@ -32,9 +36,468 @@ class _CliWrapper(object):
             obj.helper = _BasicHelper(description, usages)
         self.cli = obj
 
-def cli_commands(obj, namef, clizer):
-    cmds = util.OrderedDict()
-    cmd_by_name = {}
+class _LazyHelpParameter(parser.FallbackCommandParameter):
+    """`.parser.FallbackCommandParameter` for the help alias that only builds
+    the help CLI (and imports `clize.help`) once it is actually needed."""
+
+    def __init__(self, subject, **kwargs):
+        super(_LazyHelpParameter, self).__init__(**kwargs)
+        self.subject = subject
+
+    @util.property_once
+    def func(self):
+        return self.subject.helper.cli
+
+
+class SignatureCache(object):
+    """Stores the CLI parameters built for functions in a file, so that
+    later processes can load them instead of introspecting the functions
+    again.
+
+    Entries are keyed by the function's module and qualified name and are
+    discarded when the source file of the function's module changes, or that
+    of a module defining a decorator or other function its parameters come
+    from. Functions that can't be
+    located by name (lambdas, local functions, or any function on Python 2,
+    which lacks ``__qualname__``) or whose parameters can't be pickled are
+    simply not cached. New entries are written to the file by `flush`.
+
+    The file is read with `pickle`, so it should be stored somewhere only
+    the user running the command can write to.
+
+    :param str path: The file to store the cache in.
+    """
+
+    version = 2
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+
+    @classmethod
+    def get_cache(cls, obj):
+        """Returns ``obj`` if it is already a cache or `None`, or creates a
+        cache stored at path ``obj``."""
+        if obj is None or isinstance(obj, cls):
+            return obj
+        return cls(obj)
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self):
+        from six.moves import cPickle as pickle
+        try:
+            with open(self.path, 'rb') as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            return {}
+        if version != self.version:
+            return {}
+        return entries
+
+    def _save(self):
+        from six.moves import cPickle as pickle
+        _write_file(self.path, 'wb', lambda f: pickle.dump(
+            (self.version, self.entries), f, pickle.HIGHEST_PROTOCOL))
+
+    def get(self, func):
+        """Returns the list of parameters stored for ``func``, or `None`."""
+        key = _cache_key(func)
+        if key is None:
+            return None
+        try:
+            modules, fingerprint, data = self.entries[key]
+        except KeyError:
+            return None
+        if fingerprint != _cache_fingerprint(modules):
+            return None
+        from six.moves import cPickle as pickle
+        try:
+            return pickle.loads(data)
+        except Exception:
+            return None
+
+    def put(self, func, parameters, func_signature=None):
+        """Stores the list of parameters built for ``func``.
+
+        :param func_signature: The signature of ``func`` the parameters were
+            built from. The source files of the modules of the functions
+            listed in its ``sources`` are checked along with ``func``'s
+            when the entry is read back.
+        """
+        key = _cache_key(func)
+        if key is None:
+            return
+        modules = _cache_modules(func, func_signature)
+        fingerprint = _cache_fingerprint(modules)
+        if fingerprint is None:
+            return
+        from six.moves import cPickle as pickle
+        try:
+            data = pickle.dumps(parameters, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        self.entries[key] = modules, fingerprint, data
+        if not self._dirty:
+            self._dirty = True
+            atexit.register(self.flush)
+
+    def flush(self):
+        """Writes the entries stored since the file was last written.
+        `.run` calls this once the command is done, and it is otherwise
+        called when the interpreter exits."""
+        if self._dirty:
+            self._dirty = False
+            self._save()
+
+
+def _write_file(path, mode, write):
+    tmp = '{0}.{1}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmp, mode) as f:
+            write(f)
+        getattr(os, 'replace', os.rename)(tmp, path)
+    except (IOError, OSError):
+        pass
+
+
+def _read_json(path):
+    import json
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _cache_key(func):
+    bound = getattr(func, '__self__', None) is not None
+    func = getattr(func, '__func__', func)
+    try:
+        module = func.__module__
+        # without __qualname__ (Python 2), local functions and methods
+        # can't be told apart from module-level functions of the same name
+        qualname = func.__qualname__
+    except AttributeError:
+        return None
+    if module is None or '<' in qualname:
+        return None
+    return module, qualname, bound
+
+
+def _file_fingerprint(module):
+    try:
+        path = module.__file__
+        st = os.stat(path)
+    except (AttributeError, TypeError, OSError):
+        return None
+    return path, st.st_mtime, st.st_size
+
+
+def _cache_modules(func, func_signature):
+    func = getattr(func, '__func__', func)
+    modules = util.OrderedDict.fromkeys([func.__module__, parser.__name__])
+    if func_signature is not None:
+        sources = func_signature.sources
+        funcs = itertools.chain(
+            sources['+depths'],
+            *(sources[pname] for pname in func_signature.parameters))
+        for source in funcs:
+            module = getattr(source, '__module__', None)
+            if module is not None:
+                modules[module] = None
+    return tuple(modules)
+
+
+def _module_fingerprint(modname):
+    path = _module_source(modname)
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime, st.st_size
+
+
+def _cache_fingerprint(modules):
+    fingerprints = tuple(_module_fingerprint(module) for module in modules)
+    if fingerprints[0] is None:
+        return None
+    return fingerprints
+
+
+class _ImportedCli(object):
+    """CLI object for a callable designated by an import path such as
+    ``'package.module:attribute'``. The module is only imported when the
+    command is run or its help is needed."""
+
+    def __init__(self, import_path, clizer, kwargs):
+        module, sep, attribute = import_path.partition(':')
+        if not (module and sep and attribute):
+            raise ValueError(
+                "Expected an import path like 'package.module:attribute', "
+                "got {0!r}".format(import_path))
+        self.import_path = import_path
+        self.module = module
+        self.attribute = attribute
+        self.clizer = clizer
+        self.kwargs = kwargs
+
+    @util.property_once
+    def target(self):
+        """The CLI object for the imported callable."""
+        import importlib
+        with trace.phase('import {0}', self.module):
+            obj = importlib.import_module(self.module)
+        for name in self.attribute.split('.'):
+            obj = getattr(obj, name)
+        return self.clizer.get_cli(obj, **self.kwargs)
+
+    @property
+    def cli(self):
+        return self
+
+    @property
+    def helper(self):
+        return self.target.helper
+
+    def __call__(self, *args):
+        return self.target(*args)
+
+    def __repr__(self):
+        return '<CLI for {0!r}>'.format(self.import_path)
+
+
+def _module_source(modname):
+    try:
+        path = sys.modules[modname].__file__
+    except (KeyError, AttributeError):
+        pass
+    else:
+        if path and path.endswith(('.pyc', '.pyo')):
+            path = path[:-1]
+        return path
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        return _loader_source(modname)
+    try:
+        spec = find_spec(modname)
+    except (ImportError, ValueError, AttributeError):
+        return None
+    return getattr(spec, 'origin', None)
+
+
+def _loader_source(modname):
+    # Python 2 has no importlib.util.find_spec
+    import pkgutil
+    try:
+        return pkgutil.find_loader(modname).get_filename(modname)
+    except (ImportError, AttributeError):
+        return None
+
+
+class CommandManifest(object):
+    """Records the one-line descriptions of subcommands given as import paths,
+    so that the dispatcher's help can list them without importing their
+    modules.
+
+    Descriptions are recorded the first time they are needed, and written
+    to the file by `flush`. They are discarded when the source file of the
+    subcommand's module changes, in which case the module is imported to
+    get a fresh description.
+
+    :param str path: The JSON file to store the descriptions in.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+
+    @classmethod
+    def get_manifest(cls, obj):
+        """Returns ``obj`` if it is already a manifest or `None`, or
+        creates a manifest stored at path ``obj``."""
+        if obj is None or isinstance(obj, cls):
+            return obj
+        return cls(obj)
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = _read_json(self.path)
+        return self._entries
+
+    def _fingerprint(self, import_path):
+        source = _module_source(import_path.partition(':')[0])
+        if source is None:
+            return None
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        return [source, st.st_mtime, st.st_size]
+
+    def get_description(self, import_path):
+        """Returns the recorded description for ``import_path`` or `None`
+        if there is none or it is out of date."""
+        try:
+            fingerprint, description = self.entries[import_path]
+        except (KeyError, ValueError, TypeError):
+            return None
+        if fingerprint is None or fingerprint != self._fingerprint(import_path):
+            return None
+        return description
+
+    def put_description(self, import_path, description):
+        """Records the description for ``import_path``."""
+        fingerprint = self._fingerprint(import_path)
+        if fingerprint is None:
+            return
+        self.entries[import_path] = [fingerprint, description]
+        if not self._dirty:
+            self._dirty = True
+            atexit.register(self.flush)
+
+    def flush(self):
+        """Writes the descriptions recorded since the file was last
+        written. The dispatcher's help calls this once it has listed the
+        commands, and it is otherwise called when the interpreter exits."""
+        if self._dirty:
+            self._dirty = False
+            import json
+            _write_file(self.path, 'w', lambda f: json.dump(
+                self.entries, f, indent=1, sort_keys=True))
+
+
+class HelpCache(object):
+    """Stores the help text rendered for commands in a file, so that later
+    processes can print it without building it again.
+
+    Entries are keyed by a hash of what the help is built from: the
+    command's parameters, the docstrings and source files of the functions
+    they come from, the program name and the terminal width. Only the
+    commands documented by `.HelpForAutodetectedDocstring` and its
+    subclasses are cached.
+
+    :param str path: The JSON file to store the help text in.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+
+    @classmethod
+    def get_cache(cls, obj):
+        """Returns ``obj`` if it is already a cache or `None`, or creates a
+        cache stored at path ``obj``."""
+        if obj is None or isinstance(obj, cls):
+            return obj
+        return cls(obj)
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = _read_json(self.path)
+        return self._entries
+
+    def get(self, key):
+        """Returns the text stored under ``key``, or `None`."""
+        return self.entries.get(key)
+
+    def put(self, key, text):
+        """Stores ``text`` under ``key``."""
+        self.entries[key] = text
+        import json
+        _write_file(self.path, 'w', lambda f: json.dump(self.entries, f))
+
+
+ARGS_CHUNK_SIZE = 1 << 16
+
+
+def read_args(f, delimiter='\n'):
+    """Yields the arguments read from the file object ``f``, in which they
+    are separated by ``delimiter``. The file is read in chunks as the
+    arguments are consumed. When the delimiter is a newline, blank lines
+    are skipped and ``\r\n`` line endings are accepted."""
+    lines = delimiter == '\n'
+    rest = ''
+    while True:
+        chunk = f.read(ARGS_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = (rest + chunk).split(delimiter)
+        rest = parts.pop()
+        for part in parts:
+            if lines:
+                part = part.rstrip('\r')
+                if not part:
+                    continue
+            yield part
+    if lines:
+        rest = rest.rstrip('\r')
+    if rest:
+        yield rest
+
+
+def _open_args_file(path):
+    if six.PY2:
+        return open(path)
+    return io.open(path, encoding=sys.getfilesystemencoding(),
+                   errors='surrogateescape')
+
+
+def expand_args_files(args, delimiter='\n', stdin=None):
+    """Yields ``args``, replacing each argument like ``@path`` with the
+    arguments read from the file at ``path`` using `read_args`.
+
+    ``@-`` reads the arguments from ``stdin``, or `sys.stdin` if it is
+    unspecified. Arguments read from files aren't expanded again, and
+    neither are arguments after ``--``.
+
+    :raises: `.UserError` if a file can't be read.
+    """
+    args = iter(args)
+    for arg in args:
+        if arg == '--':
+            yield arg
+            for arg in args:
+                yield arg
+            return
+        if len(arg) < 2 or arg[0] != '@':
+            yield arg
+            continue
+        path = arg[1:]
+        if path == '-':
+            for arg in read_args(sys.stdin if stdin is None else stdin,
+                                 delimiter):
+                yield arg
+            continue
+        try:
+            with _open_args_file(path) as f:
+                for arg in read_args(f, delimiter):
+                    yield arg
+        except (IOError, OSError) as exc:
+            raise errors.UserError(
+                "Can't read arguments from {0}: {1}".format(
+                    path, exc.strerror or exc))
+
+
+def cli_commands(obj, namef, clizer, **kwargs):
+    """Returns two mappings of subcommand names to CLI objects: one keyed by
+    the tuple of all names of each command, the other by each name.
+
+    The CLI objects are only built from the values of ``obj`` when they are
+    looked up."""
+    sources = util.OrderedDict()
+    names_by_name = {}
     try:
         names = util.dict_from_names(obj).items()
     except AttributeError:
@@ -44,15 +507,19 @@ def cli_commands(obj, namef, clizer):
         if not key:
             continue
         names = tuple(namef(name) for name in util.maybe_iter(key))
-        cli = clizer.get_cli(val)
-        cmds[names] = cli
+        sources[names] = val
         for name in names:
-            cmd_by_name[name] = cli
-    return cmds, cmd_by_name
+            names_by_name[name] = names
+    cmds = util.LazyMapping(sources, partial(clizer.get_cli, **kwargs))
+    return cmds, util.LazyMapping(names_by_name, cmds.__getitem__)
 
 class Clize(object):
     """Wraps a function into a CLI object that accepts command-line arguments
-    and translates them to match the wrapped function's parameters."""
+    and translates them to match the wrapped function's parameters.
+
+    If the function returns a coroutine, such as when it is defined with
+    ``async def``, it is run on a new event loop and its result is returned.
+    """
 
     @forwards_to_method('__init__', 1)
     def __new__(cls, fn=None, **kwargs):
@@ -62,7 +529,9 @@ class Clize(object):
             return super(Clize, cls).__new__(cls)
 
     def __init__(self, fn, owner=None, alt=(), extra=(),
-                 help_names=('help', 'h'), helper_class=None, hide_help=False):
+                 help_names=('help', 'h'), helper_class=None, hide_help=False,
+                 signature_cache=None, help_cache=None, hooks=(),
+                 profile=False, args_files=False, args_delimiter='\n'):
         """
         :param sequence alt: Alternate actions the CLI will handle.
         :param help_names: Names to use to trigger the help.
@@ -72,7 +541,26 @@ class Clize(object):
         :type helper_class: a type like `.ClizeHelp`
         :param bool hide_help: Mark the parameters used to trigger the help
             as undocumented.
+        :param signature_cache: A path or `.SignatureCache` instance in
+            which to store the CLI parameters built from the function's
+            signature. Processes that find an up-to-date entry skip
+            introspecting the function.
+        :param help_cache: A path or `.HelpCache` instance in which to store
+            the rendered help and usage text.
+        :param hooks: `.parser.ParseHooks` instances notified as the
+            arguments are processed and the function is called.
+        :param bool profile: Add the hidden ``--clize-profile=PATH`` and
+            ``--clize-memory=PATH`` options, which run the rest of the
+            command line under a profiler. See `clize.profiling`.
+        :param bool args_files: Replace arguments like ``@path`` with the
+            arguments listed in the file at ``path``, and ``@-`` with the
+            arguments read from the standard input.
+            See `.expand_args_files`.
+        :param str args_delimiter: What separates the arguments in these
+            files: a newline by default, or ``'\0'`` for the output of
+            ``find -print0`` and similar.
         """
+        trace.count('Clize')
         update_wrapper(self, fn)
         self.func = fn
         self.owner = owner
@@ -82,6 +570,14 @@ class Clize(object):
         self.help_aliases = [util.name_py2cli(s, kw=True) for s in help_names]
         self.helper_class = helper_class
         self.hide_help = hide_help
+        self.signature_cache = SignatureCache.get_cache(signature_cache)
+        self.help_cache = HelpCache.get_cache(help_cache)
+        self.hooks = tuple(hooks)
+        self.profile = profile
+        self.args_files = args_files
+        self.args_delimiter = args_delimiter
+        self._signature_source = None
+        self._bound_sources = {}
 
     def parameters(self):
         """Returns the parameters used to instantiate this class, minus the
@@ -92,6 +588,12 @@ class Clize(object):
             'help_names': self.help_names,
             'helper_class': self.helper_class,
             'hide_help': self.hide_help,
+            'signature_cache': self.signature_cache,
+            'help_cache': self.help_cache,
+            'hooks': self.hooks,
+            'profile': self.profile,
+            'args_files': self.args_files,
+            'args_delimiter': self.args_delimiter,
             }
 
     @classmethod
@@ -138,7 +640,11 @@ class Clize(object):
         2. If the object is callable, `.Clize` or whichever object this
            class method is used from is used to build a CLI. ``**kwargs`` are
            forwarded to its initializer.
-        3. If the object is iterable, `.SubcommandDispatcher` is used on
+        3. If the object is a string like ``'package.module:attribute'``,
+           a CLI object that imports ``attribute`` from ``package.module``
+           and applies these rules to it is returned. The import only happens
+           once the command is run or its help is needed.
+        4. If the object is iterable, `.SubcommandDispatcher` is used on
            the object, and its `cli <.SubcommandDispatcher.cli>` method
            is used.
 
@@ -150,6 +656,8 @@ class Clize(object):
         except AttributeError:
             if callable(obj):
                 cli = cls(obj, **kwargs)
+            elif isinstance(obj, six.string_types):
+                cli = _ImportedCli(obj, cls, kwargs)
             else:
                 try:
                     iter(obj)
@@ -176,7 +684,16 @@ class Clize(object):
             return self
         params = self.parameters()
         params['owner'] = obj
-        return type(self)(func, **params)
+        ret = type(self)(func, **params)
+        # Copies bound to instances of the same class share the signatures
+        # of the first one, so that methods are only introspected once per
+        # class. The instance itself only matters when the function is
+        # called.
+        try:
+            ret._signature_source = self._bound_sources[type(obj)]
+        except KeyError:
+            self._bound_sources[type(obj)] = ret
+        return ret
 
     @util.property_once
     def helper(self):
@@ -184,7 +701,8 @@ class Clize(object):
         requests a help message. See the constructor for ways to affect this
         attribute."""
         if self.helper_class is None:
-            from clize.help import ClizeHelp as class_
+            with trace.phase('import clize.help'):
+                from clize.help import ClizeHelp as class_
         else:
             class_ = self.helper_class
         return class_(self, self.owner)
@@ -192,21 +710,50 @@ class Clize(object):
     @util.property_once
     def signature(self):
         """The `.parser.CliSignature` object used to parse arguments."""
-        return parser.CliSignature.from_signature(
-            self.func_signature,
-            extra=itertools.chain(self._process_alt(self.alt), self.extra))
+        if self._signature_source is not None:
+            return self._signature_source.signature
+        with trace.phase(_func_phase, 'build signature of', self.func):
+            sig = self._read_signature()
+            if self.hooks:
+                sig.hooks = self.hooks
+            return sig
+
+    def _read_signature(self):
+        extra = itertools.chain(self._alternates, self.extra)
+        cache = self.signature_cache
+        if cache is None:
+            return parser.CliSignature.from_signature(
+                self.func_signature, extra=extra)
+        params = cache.get(self.func)
+        if params is None:
+            params = parser.CliSignature.convert_parameters(
+                self.func_signature)
+            cache.put(self.func, params, self.func_signature)
+        return parser.CliSignature(itertools.chain(params, extra))
 
     @util.property_once
     def func_signature(self):
-        return signature(self.func)
+        if self._signature_source is not None:
+            return self._signature_source.func_signature
+        trace.count('signature')
+        with trace.phase(_func_phase, 'introspect', self.func):
+            return signature(self.func)
+
+    @util.property_once
+    def _alternates(self):
+        return list(self._process_alt(self.alt))
 
     def _process_alt(self, alt):
         if self.help_names:
-            p = parser.FallbackCommandParameter(
-                func=self.helper.cli, undocumented=self.hide_help,
+            p = _LazyHelpParameter(
+                subject=self, undocumented=self.hide_help,
                 aliases=self.help_aliases)
             yield p
 
+        if self.profile:
+            for p in profiling.profile_parameters():
+                yield p
+
         for name, func in util.dict_from_names(alt).items():
             func = self.get_cli(func)
             param = parser.AlternateCommandParameter(
@@ -216,8 +763,20 @@ class Clize(object):
 
     def __call__(self, *args):
         with errors.SetUserErrorContext(cli=self, pname=args[0]):
-            func, name, posargs, kwargs = self.read_commandline(args)
-            return func(*posargs, **kwargs)
+            ba, name = self._read_commandline(args, await_values=False)
+            func = ba.func or self.func
+            if ba.awaiting and not util.iscoroutinefunction(func):
+                util.run_awaitable(ba.await_values())
+            if isinstance(func, profiling.ProfiledCommand):
+                func = partial(func, self)
+            call = partial(self._dispatch, func, name, ba.args, ba.kwargs)
+            with trace.phase('run {0}', name):
+                return _call(call, ba)
+
+    def _dispatch(self, func, name, posargs, kwargs):
+        for hook in self.hooks:
+            hook.dispatched(func, name, posargs, kwargs)
+        return func(*posargs, **kwargs)
 
     def read_commandline(self, args):
         """Reads the command-line arguments from args and returns a tuple
@@ -226,10 +785,47 @@ class Clize(object):
 
         :raises: `.ArgumentError`
         """
-        ba = self.signature.read_arguments(args[1:], args[0])
-        func, post, posargs, kwargs = ba
-        name = ' '.join([args[0]] + post)
-        return func or self.func, name, posargs, kwargs
+        ba, name = self._read_commandline(args)
+        return ba.func or self.func, name, ba.args, ba.kwargs
+
+    def _read_commandline(self, args, await_values=True):
+        in_args = args[1:]
+        if self.args_files:
+            in_args = expand_args_files(in_args, self.args_delimiter)
+        ba = self.signature.read_arguments(
+            in_args, args[0], await_values=await_values)
+        if self._signature_source is not None and ba.func is not None:
+            ba.func = self._rebind_alternate(ba.func)
+        return ba, ' '.join([args[0]] + ba.post_name)
+
+    def _rebind_alternate(self, func):
+        # the alternate actions of a shared signature were built for the
+        # copy it came from; run this copy's own instead
+        shared = self._signature_source._alternates
+        for i, param in enumerate(shared):
+            if vars(param).get('func') is func:
+                return self._alternates[i].func
+        return func
+
+
+def _call(call, ba):
+    """Calls ``call``, running it on an event loop if it returns an
+    awaitable. If values from coroutine function converters are yet to be
+    awaited, they are awaited on the same loop before ``call`` runs."""
+    if ba.awaiting:
+        from clize import _async
+        return util.run_awaitable(
+            _async.then(ba.await_values(), lambda _: call()))
+    ret = call()
+    if util.isawaitable(ret):
+        return util.run_awaitable(ret)
+    return ret
+
+
+def _func_phase(action, func):
+    return action + ' ' + (getattr(func, '__qualname__', None)
+                           or getattr(func, '__name__', None) or repr(func))
+
 
 def _dispatcher_helper(*args, **kwargs):
     """alias for clize.help.DispatcherHelper, avoiding circular import"""
@@ -238,11 +834,43 @@ def _dispatcher_helper(*args, **kwargs):
 
 
 class SubcommandDispatcher(object):
+    """Dispatches to one of several commands depending on the first
+    argument.
+
+    :param commands: The commands to dispatch to, as a mapping of names to
+        :ref:`CLI objects <cli-object>` or a sequence of functions.
+        Commands can be given as import paths like
+        ``'package.module:function'`` so that they are only imported when
+        used.
+    :param str description: Text to show before the list of commands.
+    :param str footnotes: Text to show after the list of commands.
+    :param signature_cache: See `.SignatureCache`. Passed on to the
+        subcommands.
+    :param help_cache: See `.HelpCache`. Passed on to the subcommands.
+    :param hooks: See `.parser.ParseHooks`. Passed on to the subcommands.
+    :param manifest: A path or `.CommandManifest` instance used to list the
+        descriptions of commands given as import paths without importing
+        them.
+    """
+
     clizer = Clize
 
-    def __init__(self, commands=(), description=None, footnotes=None, **kwargs):
+    def __init__(self, commands=(), description=None, footnotes=None,
+                 signature_cache=None, manifest=None, help_cache=None,
+                 hooks=(), **kwargs):
+        self.manifest = CommandManifest.get_manifest(manifest)
+        cli_kwargs = {}
+        cache = SignatureCache.get_cache(signature_cache)
+        if cache is not None:
+            cli_kwargs['signature_cache'] = cache
+        help_cache = HelpCache.get_cache(help_cache)
+        if help_cache is not None:
+            cli_kwargs['help_cache'] = help_cache
+        if hooks:
+            cli_kwargs['hooks'] = hooks
         self.cmds, self.cmds_by_name = cli_commands(
-            commands, namef=util.name_py2cli, clizer=self.clizer)
+            commands, namef=util.name_py2cli, clizer=self.clizer,
+            **cli_kwargs)
         self.description = description
         self.footnotes = footnotes
         self.clize_kwargs = kwargs
@@ -253,7 +881,7 @@ class SubcommandDispatcher(object):
         try:
             func = self.cmds_by_name[command.lower()]
         except KeyError:
-            guess = util.closest_option(command, list(self.cmds_by_name))
+            guess = self.suggestions.closest(command)
             if guess:
                 raise errors.ArgumentError(
                     'Unknown command "{0}". Did you mean "{1}"?'
@@ -261,7 +889,11 @@ class SubcommandDispatcher(object):
             raise errors.ArgumentError('Unknown command "{0}"'.format(command))
         return func('{0} {1}'.format(name, command), *args)
 
-    @property
+    @util.property_once
+    def suggestions(self):
+        return util.SuggestionIndex(self.cmds_by_name)
+
+    @util.property_once
     def cli(self):
         c = Clize(self._cli, helper_class=_dispatcher_helper,
                   **self.clize_kwargs)
@@ -322,7 +954,8 @@ def main_module_name(module):
 
 
 @autokwoargs
-def run(args=None, catch=(), exit=True, out=None, err=None, *fn, **kwargs):
+def run(args=None, catch=(), exit=True, out=None, err=None, trace=None,
+        *fn, **kwargs):
     """Runs a function or :ref:`CLI object<cli-object>` with ``args``, prints
     the return value if not None, or catches the given exception types as well
     as `clize.UserError` and prints their string representation, then exit with
@@ -339,10 +972,38 @@ def run(args=None, catch=(), exit=True, out=None, err=None, *fn, **kwargs):
         command. If unspecified, uses `sys.stdout`
     :param file err: The file in which to print any exception text.
         If unspecified, uses `sys.stderr`.
+    :param trace: Record how long each phase of running the command takes:
+        `True` to print the timings on `sys.stderr`, a path to write them to
+        as JSON, or a `.trace.Tracer` instance. If unspecified, reads the
+        same from the ``CLIZE_TRACE`` environment variable, where ``1``
+        means `True` and ``0``, ``false``, ``no`` or ``off`` disable
+        tracing.
 
+    Other keyword arguments are passed to `.Clize` or
+    `.SubcommandDispatcher`. For instance ``signature_cache=path`` stores
+    the parameters built from the functions' signatures in ``path``
+    (see `.SignatureCache`), ``help_cache=path`` stores the rendered
+    help (see `.HelpCache`), ``profile=True`` adds hidden options to
+    profile the command (see `clize.profiling`), and ``args_files=True``
+    reads arguments from the files named by ``@path`` arguments and from
+    the standard input for ``@-`` (see `.expand_args_files`).
     """
+    tracer = get_tracer(trace)
+    if tracer is None:
+        _run(args, catch, exit, out, err, fn, kwargs)
+    else:
+        with tracing(tracer):
+            _run(args, catch, exit, out, err, fn, kwargs)
+
+
+def _run(args, catch, exit, out, err, fn, kwargs):
     if len(fn) == 1:
         fn = fn[0]
+    if 'signature_cache' in kwargs:
+        kwargs['signature_cache'] = SignatureCache.get_cache(
+            kwargs['signature_cache'])
+    if 'help_cache' in kwargs:
+        kwargs['help_cache'] = HelpCache.get_cache(kwargs['help_cache'])
     cli = Clize.get_cli(fn, **kwargs)
 
     if args is None:
@@ -357,7 +1018,12 @@ def run(args=None, catch=(), exit=True, out=None, err=None, *fn, **kwargs):
         err = sys.stderr
 
     try:
-        ret = cli(*args)
+        try:
+            ret = cli(*args)
+        finally:
+            cache = kwargs.get('signature_cache')
+            if cache is not None:
+                cache.flush()
     except tuple(catch) + (errors.UserError,) as exc:
         print(str(exc), file=err)
         if exit:
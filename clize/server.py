@@ -0,0 +1,315 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Keeps a command loaded in a long-lived process that runs it for
+clients connecting to a Unix domain socket
+
+Usage::
+
+    python -m clize.server serve myapp.cli:main /tmp/myapp.sock &
+    python path/to/clize/client.py /tmp/myapp.sock --some --arguments
+
+`clize.client` sends command lines to the server using only the standard
+library, so that it starts quickly. ``python -m clize.server call`` does the
+same, but imports clize first.
+
+The server imports the command and builds its parameters and help once.
+Each client sends its arguments, working directory, environment variables
+and standard streams, which are passed as file descriptors rather than
+copied. The command line is then run in a child process forked from the
+server, and its exit status is sent back to the client.
+
+When the source file of a loaded module changes, the server starts itself
+again so that the changes are picked up.
+
+This needs a platform with Unix domain sockets and `os.fork`, and
+Python 3.3 or later.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import stat
+import errno
+import array
+import select
+import socket
+import contextlib
+import traceback
+
+from sigtools.modifiers import annotate, autokwoargs, kwoargs
+
+from clize import runner, parser, errors
+from clize.client import call, _HEADER, _STATUS, _recv_exactly
+
+
+POLL_INTERVAL = 1.0
+"""How many seconds the server waits for a client before checking whether
+the watched files changed."""
+
+_STDIO = 3
+
+
+def _check_support():
+    if not (hasattr(socket, 'AF_UNIX') and hasattr(os, 'fork')
+            and hasattr(socket.socket, 'sendmsg')):
+        raise errors.UserError(
+            'clize.server needs Unix domain sockets, os.fork and '
+            'Python 3.3 or later')
+
+
+def _decode(data):
+    return json.loads(data.decode('utf-8', 'surrogatepass'))
+
+
+def recv_request(sock):
+    """Receives what `.client.send_request` sent. Returns the request and
+    the list of file descriptors."""
+    fds = array.array('i')
+    header, ancdata, _, _ = sock.recvmsg(
+        _HEADER.size, socket.CMSG_SPACE(_STDIO * fds.itemsize))
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+    header = _recv_exactly(sock, _HEADER.size, header)
+    size, = _HEADER.unpack(header)
+    return _decode(_recv_exactly(sock, size)), list(fds)
+
+
+def warm_up(cli):
+    """Builds the parts of ``cli`` that are otherwise built every time it
+    runs: its parameters and its help, along with those of its subcommands.
+    Subcommands given as import paths are imported."""
+    cli = getattr(cli, 'target', cli)
+    signature = getattr(cli, 'signature', None)
+    for param in getattr(signature, 'alternate', ()):
+        getattr(getattr(param, 'func', None), 'signature', None)
+    get_help = getattr(getattr(cli, 'helper', None), 'get_help', None)
+    if get_help is not None:
+        get_help()
+    owner = getattr(cli, 'owner', None)
+    if (isinstance(owner, runner.SubcommandDispatcher)
+            and owner.cli is cli):
+        for subcommand in owner.cmds.values():
+            warm_up(subcommand)
+
+
+def _source_path(module):
+    path = getattr(module, '__file__', None)
+    if path and path.endswith(('.pyc', '.pyo')):
+        path = path[:-1]
+    return path
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _snapshot(paths):
+    return dict((path, _mtime(path)) for path in paths)
+
+
+def _changed(snapshot):
+    for path, mtime in snapshot.items():
+        if _mtime(path) != mtime:
+            return True
+    return False
+
+
+def _listen(path):
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except OSError:
+        pass
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        # create the socket without permissions for other users, so that
+        # they can't connect before the chmod below
+        umask = os.umask(0o177)
+        try:
+            listener.bind(path)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+        listener.listen(socket.SOMAXCONN)
+    except Exception:
+        listener.close()
+        raise
+    return listener
+
+
+def _reap():
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except OSError as exc:
+            if exc.errno == errno.ECHILD:
+                return
+            raise
+        if not pid:
+            return
+
+
+def _exit_status(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_request(cli, request, fds, name, catch):
+    for target, fd in enumerate(fds[:_STDIO]):
+        if fd != target:
+            os.dup2(fd, target)
+            os.close(fd)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    args = request['argv']
+    if name is not None:
+        args[0] = name
+    sys.argv = args
+    try:
+        runner.run(cli, args=args, catch=catch)
+    except SystemExit as exc:
+        return _exit_status(exc.code)
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _handle(conn, cli, name, catch):
+    status = 1
+    try:
+        request, fds = recv_request(conn)
+        status = _run_request(cli, request, fds, name, catch)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            for f in (sys.stdout, sys.stderr):
+                f.flush()
+            conn.sendall(_STATUS.pack(status))
+        finally:
+            os._exit(0)
+
+
+def restart():
+    """Replaces the current process with a new run of the same command
+    line."""
+    argv = getattr(sys, 'orig_argv', None) or [sys.executable] + sys.argv
+    os.execv(sys.executable, argv)
+
+
+@autokwoargs
+def serve(path, name=None, catch=(), watch=True, reload=True,
+          poll=POLL_INTERVAL, *fn, **kwargs):
+    """Runs ``fn`` for each client connecting to the Unix domain socket at
+    ``path``, until interrupted.
+
+    ``fn`` is made into a CLI object like `.run` does, and `warm_up` is
+    called on it before listening. Each command line runs in a child
+    process forked from this one, as if passed to `.run`.
+
+    :param str name: The program name shown in usage and error messages.
+        Defaults to the first argument sent by the client.
+    :param catch: As in `.run`.
+    :param watch: The source files to watch for changes: `True` for those
+        of all modules loaded after `warm_up`, or a sequence of paths.
+    :param bool reload: If true, `restart` the process when a watched file
+        changes. Otherwise, return from this function.
+    :param float poll: How often to check the watched files while no
+        client connects, in seconds.
+
+    Other keyword arguments are passed to `.Clize` or
+    `.SubcommandDispatcher`.
+    """
+    _check_support()
+    if len(fn) == 1:
+        fn = fn[0]
+    cache = kwargs['signature_cache'] = runner.SignatureCache.get_cache(
+        kwargs.get('signature_cache'))
+    cli = runner.Clize.get_cli(fn, **kwargs)
+    warm_up(cli)
+    if cache is not None:
+        cache.flush()
+    if watch is True:
+        watch = [_source_path(module) for module in list(sys.modules.values())]
+    snapshot = _snapshot(path for path in watch or () if path)
+    listener = _listen(path)
+    try:
+        while True:
+            _reap()
+            readable, _, _ = select.select([listener], [], [], poll)
+            if readable:
+                conn, _ = listener.accept()
+                with contextlib.closing(conn):
+                    for f in (sys.stdout, sys.stderr):
+                        f.flush()
+                    if not os.fork():
+                        listener.close()
+                        _handle(conn, cli, name, catch)
+            if _changed(snapshot):
+                break
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    if reload:
+        restart()
+
+
+@kwoargs('name', 'no_watch')
+@annotate(name='n')
+def _serve_cli(target, socket_path, name=None, no_watch=False):
+    """Serve a command on a Unix domain socket
+
+    target: The command to serve, as in ``package.module:function``
+
+    socket_path: Where to create the socket.
+
+    name: The program name shown in usage and error messages.
+
+    no_watch: Don't restart when source files change.
+    """
+    serve(socket_path, target, name=name, watch=not no_watch)
+
+
+@annotate(socket_path=parser.Parameter.LAST_OPTION)
+def _call_cli(socket_path, *args):
+    """Run a command line on a server started with ``serve``
+
+    Running ``clize/client.py`` directly does the same without importing
+    clize.
+
+    socket_path: The socket the server listens on.
+
+    args: The arguments to pass to the command.
+    """
+    name = os.path.splitext(os.path.basename(socket_path))[0]
+    try:
+        status = call(socket_path, (name,) + args)
+    except (socket.error, OSError, EOFError) as exc:
+        raise errors.UserError(
+            'Could not run the command on {0}: {1}'.format(socket_path, exc))
+    sys.exit(status)
+
+
+def main():
+    runner.run({'serve': _serve_cli, 'call': _call_cli})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""Tests for coroutine function commands and converters, loaded by
+`clize.tests.test_async` on Python 3.5 and later."""
+
+import asyncio
+
+from sigtools import support, modifiers
+
+from functools import partial, wraps
+
+from clize import parser, errors, runner, util, Parameter, _async
+from clize.parameters import multi
+from clize.tests.util import Tests
+
+
+class AsyncCommandTests(Tests):
+    def test_coroutine_function(self):
+        @modifiers.annotate(times=int)
+        async def func(name, *, times=1):
+            await asyncio.sleep(0)
+            return ' '.join(['hello', name] * times)
+        stdout, stderr = self.crun(func, ['test', 'bob', '--times', '2'])
+        self.assertEqual(stdout.getvalue(), 'hello bob hello bob\n')
+        self.assertEqual(stderr.getvalue(), '')
+
+    def test_return_value(self):
+        async def func():
+            return 42
+        self.assertEqual(runner.Clize.get_cli(func)('test'), 42)
+
+    def test_sync_unchanged(self):
+        def func():
+            return 42
+        self.assertEqual(runner.Clize.get_cli(func)('test'), 42)
+
+    def test_subcommands(self):
+        async def one():
+            return 'one'
+        def two():
+            return 'two'
+        stdout, stderr = self.crun([one, two], ['test', 'one'])
+        self.assertEqual(stdout.getvalue(), 'one\n')
+        stdout, stderr = self.crun([one, two], ['test', 'two'])
+        self.assertEqual(stdout.getvalue(), 'two\n')
+
+    def test_alternate_action(self):
+        async def version():
+            return 'version 1'
+        def func():
+            return 'ran'
+        stdout, stderr = self.crun(func, ['test', '--version'],
+                                   alt=[version])
+        self.assertEqual(stdout.getvalue(), 'version 1\n')
+
+    def test_iscoroutinefunction(self):
+        async def func(a):
+            pass
+        @wraps(func)
+        def wrapper(*args):
+            return func(*args)
+        self.assertTrue(util.iscoroutinefunction(func))
+        self.assertTrue(util.iscoroutinefunction(wrapper))
+        self.assertTrue(util.iscoroutinefunction(partial(func, 1)))
+        self.assertFalse(util.iscoroutinefunction(lambda: func(1)))
+
+    def test_error(self):
+        async def func():
+            raise errors.UserError('failed')
+        stdout, stderr = self.crun(func, ['test'])
+        self.assertEqual(stderr.getvalue(), 'test: failed\n')
+
+
+class AsyncConverterTests(Tests):
+    def setUp(self):
+        self.running = 0
+        self.most_running = 0
+
+    def _conv(self, **kwargs):
+        @parser.value_converter(name='CONV', **kwargs)
+        async def conv(arg):
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+            try:
+                await asyncio.sleep(0.01)
+            finally:
+                self.running -= 1
+            if arg.startswith('bad'):
+                raise ValueError(arg)
+            if arg == 'worse':
+                raise errors.CliValueError('worse value')
+            return arg.upper()
+        return conv
+
+    def _read(self, sig, conv, *args):
+        csig = parser.CliSignature.from_signature(support.s(sig, locals={
+            'conv': conv, 'multi2': (conv, multi(max=2)),
+            'stream': (conv, Parameter.STREAM)}))
+        return csig, self.read_arguments(csig, args)
+
+    def test_gathered(self):
+        csig, ba = self._read(
+            'a:conv, *args:conv, o:conv=None, m:multi2', self._conv(),
+            'a', 'b', 'c', '-o', 'd', '-m', 'e', '-m', 'f')
+        self.assertEqual(ba.args, ['A', 'B', 'C'])
+        self.assertEqual(ba.kwargs, {'o': 'D', 'm': ['E', 'F']})
+        self.assertEqual(self.most_running, 6)
+
+    def test_default(self):
+        csig, ba = self._read('o:conv="d"', self._conv(convert_default=True))
+        self.assertEqual(ba.args, ['D'])
+
+    def test_error(self):
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            self._read('*args:conv', self._conv(), 'a', 'bad1', 'bad2')
+        self.assertEqual(cm.exception.val, 'bad1')
+        self.assertEqual(cm.exception.message, "Bad value for args: 'bad1'")
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            self._read('*, o:conv', self._conv(), '-o', 'worse')
+        self.assertEqual(cm.exception.message,
+                         "Bad value for -o: worse value")
+
+    def test_lazy(self):
+        csig, ba = self._read('a:conv', self._conv(lazy=True), 'a')
+        deferred = ba.args[0]
+        self.assertIsInstance(deferred, parser.DeferredValue)
+        self.assertEqual(deferred.value, 'A')
+        csig, ba = self._read('a:conv', self._conv(lazy=True), 'bad')
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            ba.args[0].value
+        self.assertEqual(cm.exception.message, "Bad value for a: 'bad'")
+
+    def test_stream(self):
+        csig, ba = self._read('a:stream', self._conv(), 'a', 'b', 'bad')
+        stream = ba.args[0]
+        self.assertEqual(next(stream), 'A')
+        self.assertEqual(next(stream), 'B')
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            next(stream)
+        self.assertEqual(cm.exception.message, "Bad value for a: 'bad'")
+
+    def test_run(self):
+        @modifiers.annotate(args=self._conv())
+        async def func(*args):
+            return ' '.join(args)
+        stdout, stderr = self.crun(func, ['test', 'a', 'b'])
+        self.assertEqual(stdout.getvalue(), 'A B\n')
+        stdout, stderr = self.crun(func, ['test', 'a', 'bad'])
+        self.assertEqual(stderr.getvalue(),
+                         "test: Bad value for args: 'bad'\n"
+                         "Usage: test [args...]\n")
+
+    def test_one_loop(self):
+        loops = []
+        @parser.value_converter
+        async def conv(arg):
+            loops.append(asyncio.get_event_loop())
+            return arg
+        @modifiers.annotate(a=conv)
+        async def func(a):
+            loops.append(asyncio.get_event_loop())
+            return a
+        self.assertEqual(runner.Clize.get_cli(func)('test', 'a'), 'a')
+        self.assertEqual(len(loops), 2)
+        self.assertIs(loops[0], loops[1])
+
+    def test_run_sync(self):
+        @modifiers.annotate(a=self._conv(), b=self._conv(lazy=True),
+                            c=(self._conv(), Parameter.STREAM))
+        def func(a, b, c):
+            return ' '.join([a, b.value] + list(c))
+        self.assertEqual(
+            runner.Clize.get_cli(func)('test', 'a', 'b', 'c', 'd'),
+            'A B C D')
+
+    def test_run_stream(self):
+        @modifiers.annotate(values=(self._conv(), Parameter.STREAM))
+        async def func(values):
+            return [value async for value in values]
+        cli = runner.Clize.get_cli(func)
+        self.assertEqual(cli('test', 'a', 'b'), ['A', 'B'])
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            cli('test', 'a', 'bad')
+        self.assertEqual(cm.exception.message,
+                         "Bad value for values: 'bad'")
+
+    def test_run_stream_next(self):
+        @modifiers.annotate(values=(self._conv(), Parameter.STREAM))
+        async def func(values):
+            return [await value for value in values]
+        self.assertEqual(runner.Clize.get_cli(func)('test', 'a', 'b'),
+                         ['A', 'B'])
+
+    def test_run_lazy(self):
+        conv = self._conv(lazy=True)
+        @modifiers.annotate(a=conv, b=conv)
+        async def func(a, b):
+            return [await a.get(), await b.value, await b.get()]
+        cli = runner.Clize.get_cli(func)
+        self.assertEqual(cli('test', 'a', 'b'), ['A', 'B', 'B'])
+        stdout, stderr = self.crun(cli, ['test', 'a', 'bad'])
+        self.assertEqual(stderr.getvalue(),
+                         "test: Bad value for b: 'bad'\n"
+                         "Usage: test a b\n")
+
+    def test_lazy_get(self):
+        csig, ba = self._read('a:conv', self._conv(lazy=True), 'a')
+        self.assertEqual(ba.args[0].value, 'A')
+        self.assertEqual(_async.run(ba.args[0].get()), 'A')
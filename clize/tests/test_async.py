@@ -0,0 +1,13 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+import sys
+
+
+def load_tests(loader, tests, pattern):
+    # the cases use ``async def``, which is a syntax error before Python 3.5
+    if sys.version_info >= (3, 5):
+        from clize.tests import _async_cases
+        tests.addTests(loader.loadTestsFromModule(_async_cases))
+    return tests
@@ -0,0 +1,124 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+from clize.tests.util import Tests
+from clize import compile, runner, errors
+
+
+_SOURCE = '''\
+from sigtools.modifiers import kwoargs
+
+@kwoargs('loud')
+def main(name, loud=False):
+    """Greets someone
+
+    name: Who to greet
+
+    loud: Shout it
+    """
+    return ('HELLO ' if loud else 'Hello ') + name
+
+def other():
+    pass
+'''
+
+
+class CompileTests(Tests):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.write('_clize_test_compiled_app.py', _SOURCE)
+        sys.path.insert(0, self.tmpdir)
+        self.addCleanup(sys.path.remove, self.tmpdir)
+        self.addCleanup(sys.modules.pop, '_clize_test_compiled_app', None)
+        self.target = '_clize_test_compiled_app:main'
+
+    def write(self, name, source):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(source)
+        return path
+
+    def load(self, source):
+        namespace = {}
+        exec(source, namespace)
+        return compile.load_compiled(
+            namespace['TARGET'], namespace['CHECKSUMS'],
+            namespace['PARAMETERS'], namespace['TEXTS'])
+
+    def test_compiled(self):
+        source = compile.compile_cli(self.target, 'app', [78])
+        cli = self.load(source)
+        self.assertEqual(cli('app', 'world', '--loud'), 'HELLO world')
+        self.assertNotIn('func_signature', cli.__dict__)
+        self.assertEqual(cli.helper.texts, self.load(source).helper.texts)
+        dynamic = runner.Clize.get_cli(self.target).target
+        with compile._terminal_width(78):
+            self.assertEqual(cli('app', '--help'), dynamic('app', '--help'))
+            self.assertEqual(cli('app', '--help', '--usage'),
+                             dynamic('app', '--help', '--usage'))
+            self.assertNotIn('helper', cli.helper.__dict__)
+            self.assertEqual(cli('other', '--help'), dynamic('other', '--help'))
+            self.assertIn('helper', cli.helper.__dict__)
+        with self.assertRaises(errors.MissingRequiredArguments) as ar:
+            cli('app')
+        self.assertIn('Usage: app [OPTIONS] name', str(ar.exception))
+
+    def test_other_width(self):
+        cli = self.load(compile.compile_cli(self.target, 'app', [78]))
+        dynamic = runner.Clize.get_cli(self.target).target
+        with compile._terminal_width(30):
+            self.assertEqual(cli('app', '--help'), dynamic('app', '--help'))
+        self.assertIn('helper', cli.helper.__dict__)
+
+    def test_stale(self):
+        source = compile.compile_cli(self.target, 'app', [78])
+        self.write('_clize_test_compiled_app.py', _SOURCE + '\n# changed\n')
+        cli = self.load(source)
+        self.assertIsNone(cli.signature_cache)
+        self.assertEqual(cli('app', 'world'), 'Hello world')
+
+    def test_other_function(self):
+        source = compile.compile_cli(self.target, 'app', [78])
+        cli = self.load(source)
+        other = runner.Clize(lambda name: name)
+        other.signature_cache = cli.signature_cache
+        self.assertEqual(str(other.signature), 'name')
+        self.assertIn('func_signature', other.__dict__)
+
+    def test_not_single_command(self):
+        self.assertRaises(
+            errors.UserError, compile.compile_cli,
+            '_clize_test_compiled_app:nothing', 'app')
+        self.write('_clize_test_compiled_cmds.py',
+                   'from _clize_test_compiled_app import main, other\n'
+                   'commands = [main, other]\n')
+        self.addCleanup(sys.modules.pop, '_clize_test_compiled_cmds', None)
+        self.assertRaises(
+            errors.UserError, compile.compile_cli,
+            '_clize_test_compiled_cmds:commands', 'app')
+
+    def test_command_line(self):
+        output = os.path.join(self.tmpdir, '_clize_test_compiled_cli.py')
+        stdout, stderr = self.crun(
+            compile.main, args=['compile', self.target, '-o', output,
+                                '-n', 'app', '-w', '78'])
+        self.assertEqual(stderr.getvalue(), '')
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [self.tmpdir, os.path.dirname(os.path.dirname(compile.__file__))]))
+        out = subprocess.check_output([sys.executable, '-c', (
+            'import sys\n'
+            'import _clize_test_compiled_cli as c\n'
+            'c.main(args=["app", "--help"], exit=False)\n'
+            'sys.stdout.write("{0} {1}\\n".format(\n'
+            '    "clize.help" in sys.modules, "docutils" in sys.modules))\n'
+            )], env=env)
+        self.assertIn(b'Greets someone', out)
+        self.assertTrue(out.endswith(b'False False\n'), out)
@@ -10,6 +10,7 @@ import contextlib
 
 import attr
 import od
+from docutils import nodes as dunodes
 from sigtools.support import f, s
 from sigtools.modifiers import autokwoargs, kwoargs
 from sigtools.wrappers import wrapper_decorator, decorator
@@ -34,6 +35,7 @@ class WholeHelpTests(Fixtures):
 
     def _do_test(self, runner, usage, help_str):
         h = runner.helper
+        self._test_description(h)
         h.prepare()
         pc_usage = h.cli('func --help', '--usage')
         p_usage = [l.rstrip() for l in h.show_full_usage('func')]
@@ -45,6 +47,13 @@ class WholeHelpTests(Fixtures):
         self.assertLinesEqual(help_str, pc_help_str)
 
 
+    def _test_description(self, h):
+        description = h.description
+        fresh = type(h)(h.subject, h.owner, h.builder)
+        header = fresh.get_help().header
+        self.assertEqual(header[0] if header else '', description)
+
+
 class ClizeWholeHelpTests(WholeHelpTests):
     def _test(self, *args, **kwargs):
         super(ClizeWholeHelpTests, self)._test(*args, **kwargs)
@@ -1092,6 +1101,97 @@ class SphinxTokenizerTests(Fixtures):
     ]
 
 
+class SimpleSphinxReaderTests(Fixtures):
+    def _test(self, docstring, native):
+        docstring = inspect.cleandoc(docstring)
+        blocks = help._read_simple_sphinx_docstring(docstring)
+        self.assertEqual(native, blocks is not None)
+        document, errout = help.document_from_sphinx_docstring(
+            docstring, 'func')
+        with capture_stderr():
+            elements = list(
+                help.elements_from_sphinx_docstring(docstring, 'func'))
+        self.assertEqual(
+            elements, list(help.elements_from_sphinx_document(document)))
+        if native:
+            self.assertEqual('', errout)
+
+    paragraphs = SphinxTokenizerTests.paragraphs[0], True
+    trailing_spaces = SphinxTokenizerTests.trailing_spaces[0], True
+    after = SphinxTokenizerTests.after[0], True
+    fields = SphinxTokenizerTests.fields[0], True
+    literal_block = SphinxTokenizerTests.literal_block[0], True
+    labels = SphinxTokenizerTests.labels[0], True
+    markup = SphinxTokenizerTests.markup[0], False
+    code = SphinxTokenizerTests.code[0], False
+    substitution = SphinxTokenizerTests.substitution[0], False
+
+    literal_after_space = """
+        Code follows ::
+
+            code
+    """, True
+
+    label_before_literal = """
+        Not a label::
+
+            code
+
+        :param a: a
+    """, True
+
+    indented = """
+        Description
+
+            Block quote
+    """, False
+
+    bullet_list = """
+        - one
+        - two
+    """, False
+
+    enumerated_list = """
+        1. one
+        2. two
+    """, False
+
+    section = """
+        Title
+        =====
+    """, False
+
+    definition_list = """
+        term
+            definition
+    """, False
+
+    literal_expected = """
+        Nothing follows::
+
+        :param a: a
+    """, False
+
+    field_without_blank = """
+        :param a: a
+        Footnotes
+    """, False
+
+    nested_field = """
+        :param a: a
+
+            :param b: b
+    """, False
+
+    reference = """
+        See target_.
+    """, False
+
+    star_param = """
+        :param *args: arguments
+    """, False
+
+
 def sphinx_helper_class(*args, **kwargs):
     return help.ClizeHelp(
         *args, builder=help.HelpForSphinxDocstring.from_subject, **kwargs)
@@ -1299,6 +1399,7 @@ class AutodetectHelpFormatTests(WholeHelpTests):
         func.__doc__ = doc
         r = runner.Clize(func)
         h = r.helper
+        self._test_description(h)
         pc_help_str = h.cli('func --help')
         p_help_str = str(h.show('func'))
         self.assertLinesEqual(exp_help_str, p_help_str)
@@ -1426,6 +1527,38 @@ class ElementsFromAutodetectedDocstringTests(Fixtures):
     )
 
 
+class MayHaveFieldListTests(Fixtures):
+    def _test(self, docstring, expected):
+        self.assertEqual(expected, help.may_have_field_list(docstring))
+        document, _ = help.document_from_sphinx_docstring(docstring, 'func')
+        if document.next_node(dunodes.field_list) is not None:
+            self.assertTrue(expected)
+
+    clize = "Description\n\nparam: desc\n\n    code block", False
+    code_block_false_positive = "Description\n\n    :code: block", True
+    inline_role = "this is an :unknown:`ref`", False
+    colon_space = ": not a field", False
+    double_colon = "::\n\n    literal", False
+    field = "Description\n\n:param param: desc", True
+    indented_field = "Description\n\n  :param param: desc", True
+    field_no_body = ":param param:", True
+    field_unfinished = ":param param", True
+
+    def test_clize_docstring_skips_docutils(self):
+        def fail(*args, **kwargs):
+            raise AssertionError("docutils was used")
+        orig = help.document_from_sphinx_docstring
+        help.document_from_sphinx_docstring = fail
+        try:
+            self.assertEqual(
+                list(help.elements_from_autodetected_docstring(
+                    "Description\n\nparam: desc", 'func')),
+                [(help.EL_FREE_TEXT, 'Description', False),
+                 (help.EL_PARAM_DESC, 'param', 'desc')])
+        finally:
+            help.document_from_sphinx_docstring = orig
+
+
 class WrappedFuncTests(Fixtures):
     def _test(self, sig, wrapper_sigs, doc, wrapper_docs, help_str):
         ifunc = f(sig, pre="from clize import Parameter")
@@ -1437,9 +1570,12 @@ class WrappedFuncTests(Fixtures):
             func = wrapper_decorator(wfunc)(func)
         r = runner.Clize(func)
         h = help.ClizeHelp(r, None)
+        description = h.description
         h.prepare()
         p_help_str = str(h.show('func'))
         self.assertLinesEqual(help_str, p_help_str)
+        header = h.get_help().header
+        self.assertEqual(header[0] if header else '', description)
 
     args = 'one, *, alpha', [
         'three, *args, gamma, **kwargs',
@@ -1594,9 +1730,12 @@ class AutoforwardedFuncTests(Fixtures):
     def _test(self, func, help_str):
         r = runner.Clize(func)
         h = help.ClizeHelp(r, None)
+        description = h.description
         h.prepare()
         p_help_str = str(h.show('func'))
         self.assertLinesEqual(help_str, p_help_str)
+        header = h.get_help().header
+        self.assertEqual(header[0] if header else '', description)
 
     def _decorator_three(func):
         @autokwoargs
@@ -2132,6 +2271,53 @@ class DispatcherHelper(Fixtures):
               func1
         """
 
+    def test_help_built_once(self):
+        def func1():
+            """Func1 description"""
+            raise NotImplementedError
+        def func2():
+            """Func2 description
+
+            :param x: no such param
+            """
+            raise NotImplementedError
+        built = []
+        class CountingHelp(help.HelpForAutodetectedDocstring):
+            @classmethod
+            def from_subject(cls, subject, owner):
+                built.append(subject)
+                return super(CountingHelp, cls).from_subject(subject, owner)
+            description_from_subject = \
+                help.HelpForAutodetectedDocstring.description_from_subject
+        def helper_class(subject, owner):
+            return help.HelpCli(subject, owner, CountingHelp.from_subject)
+        sd = runner.SubcommandDispatcher(
+            [runner.Clize(func1, helper_class=helper_class),
+             runner.Clize(func2, helper_class=helper_class)],
+            description="Desc")
+        self.assertIn('Func2 description', sd.cli('sd', '--help'))
+        self.assertEqual(built, [])
+        h = sd.cmds_by_name['func1'].helper
+        self.assertIs(h.get_help(), h.get_help())
+        self.assertEqual(len(built), 1)
+
+    def test_description_custom_builder(self):
+        class CustomHelp(help.HelpForAutodetectedDocstring):
+            @classmethod
+            def from_subject(cls, subject, owner):
+                ret = super(CustomHelp, cls).from_subject(subject, owner)
+                ret.header.insert(0, 'Custom')
+                return ret
+        def func():
+            """Func description"""
+        h = help.HelpCli(runner.Clize(func), None, CustomHelp.from_subject)
+        self.assertEqual(h.description, 'Custom')
+
+    def test_description_nested(self):
+        inner = runner.SubcommandDispatcher([], description="Inner\n\nMore")
+        self.assertEqual(inner.cli.helper.description, 'Inner')
+        self.assertIsNone(inner.cli.helper._help)
+
     def test_dummy_external(self):
         @runner.Clize.as_is
         def ext():
@@ -351,6 +351,7 @@ class MakeFlagTests(OldInterfaceTests):
                     type=str,
                     takes_argument=3
                     ),
+                make_flag(source='flag', names=('flag', 'f')),
                 )
             )
         def fn(arg1, arg2, **kwargs):
@@ -373,6 +374,12 @@ class MakeFlagTests(OldInterfaceTests):
         self.assertEqual(arg1, 'arg1')
         self.assertEqual(arg2, 'arg2')
         self.assertEqual(kwargs, {'extra': 'extra'})
+        arg1, arg2, kwargs = fn('test', 'arg1', '-fe', 'x', 'y', 'z', 'arg2')
+        self.assertEqual(arg1, 'arg1')
+        self.assertEqual(arg2, 'arg2')
+        self.assertEqual(kwargs, {'flag': True, 'extra': 'x y z'})
+        arg1, arg2, kwargs = fn('test', 'arg1', '-feextra', 'arg2')
+        self.assertEqual(kwargs, {'flag': True, 'extra': 'extra'})
         self.assertRaises(errors.NotEnoughValues,
                           fn, 'test', 'arg1', 'arg2', '--extra', 'extra')
 
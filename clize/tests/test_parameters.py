@@ -2,6 +2,7 @@
 # Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
 # COPYING for details.
 
+from six.moves import cPickle as pickle
 from sigtools import support, modifiers
 
 from clize import parser, errors, Parameter, runner, parameters
@@ -717,3 +718,42 @@ class PnErrorTests(Fixtures):
             self.read_arguments(csig, ('bad',))
         except errors.BadArgumentFormat as exc:
             self.assertEqual(exc.param.display_name, 'other')
+
+
+@parameters.argument_decorator
+@modifiers.kwoargs('kw')
+def _pickled_deco(arg, kw='D'):
+    return arg + kw
+
+
+@parameters.value_inserter
+def _pickled_inserter(ba):
+    return 'inserted'
+
+
+class PickleTests(Fixtures):
+    def _test(self, sig_str, annotation, in_args, args, kwargs):
+        sig = support.s(sig_str, locals={'a': annotation})
+        params = parser.CliSignature.convert_parameters(sig)
+        copy = pickle.loads(pickle.dumps(params, pickle.HIGHEST_PROTOCOL))
+        csig = parser.CliSignature(copy)
+        self.assertEqual(str(csig), str(parser.CliSignature(params)))
+        ba = self.read_arguments(csig, in_args)
+        self.assertEqual(ba.args, args)
+        self.assertEqual(ba.kwargs, kwargs)
+
+    pass_name = (
+        'par:a, other', parameters.pass_name, ('arg',), ['test', 'arg'], {})
+    value_inserter = (
+        '*, par:a', _pickled_inserter, (), [], {'par': 'inserted'})
+    argument_decorator = (
+        'par:a', _pickled_deco, ('--kw=y', '1'), ['1y'], {})
+    mapped = (
+        '*, par:a', parameters.mapped([('value', ['name'], 'Help')]),
+        ('--par=name',), [], {'par': 'value'})
+    one_of = (
+        '*, par:a', parameters.one_of('x', 'y'),
+        ('--par=y',), [], {'par': 'y'})
+    multi = (
+        '*, par:a', parameters.multi(),
+        ('--par=1', '--par=2'), [], {'par': ['1', '2']})
@@ -2,10 +2,21 @@
 # Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
 # COPYING for details.
 
+import time
+import unittest
+import threading
+
+from six.moves import cPickle as pickle
 from sigtools import support, modifiers, specifiers
 
+try:
+    import concurrent.futures as futures
+except ImportError:
+    futures = None
+
 from clize import parser, errors, util
-from clize.tests.util import Fixtures
+from clize.parameters import multi
+from clize.tests.util import Fixtures, Tests
 
 
 _ic = parser._implicit_converters
@@ -270,6 +281,19 @@ class SigTests(Fixtures):
         ('-ac',), [], {'a': True, 'c': True}
         )
 
+    flag_glued_option = (
+        '*, a=False, b=False, one:"o"="x"', '[-a] [-b] [-o STR]',
+        ('-abofoo',), [], {'a': True, 'b': True, 'one': 'foo'}
+        )
+    flag_glued_option_next = (
+        '*, a=False, b=False, one:"o"="x"', '[-a] [-b] [-o STR]',
+        ('-abo', 'foo'), [], {'a': True, 'b': True, 'one': 'foo'}
+        )
+    flag_glued_int = (
+        '*, a=False, num:"n"=1, b=False', '[-a] [-n INT] [-b]',
+        ('-an12b',), [], {'a': True, 'num': 12, 'b': True}
+        )
+
     _one_flag = '*, one:"a"=False'
     _one_flag_u = '[-a]'
     flag_false = _one_flag, _one_flag_u, ('--one=',), [], {'one': False}
@@ -340,6 +364,35 @@ class SigTests(Fixtures):
         with self.assertRaises(errors.UnknownOption):
             csig.read_arguments(['--new', 'abc'], 'test')
 
+    def test_short_cluster_keeps_in_args(self):
+        seen = []
+        class Recorder(parser.FlagParameter):
+            def read_argument(self, ba, i):
+                seen.append((ba.in_args, ba.short_offset))
+                super(Recorder, self).read_argument(ba, i)
+        csig = parser.CliSignature([
+            parser.FlagParameter(aliases=['-a'], argument_name='a',
+                                 value=True),
+            Recorder(aliases=['-r'], argument_name='r', value=True),
+            ])
+        in_args = ('-aara',)
+        ba = parser.CliBoundArguments(csig, in_args, 'test')
+        ba.process_arguments()
+        self.assertEqual(ba.kwargs, {'a': True, 'r': True})
+        self.assertEqual(seen, [(in_args, 3)])
+        self.assertIs(seen[0][0], ba.in_args)
+
+    def test_short_cluster_fallback_post_name(self):
+        def func(): raise NotImplementedError
+        csig = parser.CliSignature([
+            parser.FlagParameter(aliases=['-v'], argument_name='v',
+                                 value=True),
+            parser.FallbackCommandParameter(func=func, aliases=['-h']),
+            ])
+        ba = self.read_arguments(csig, ('-vh',))
+        self.assertIs(ba.func, func)
+        self.assertEqual(ba.post_name, ['-h'])
+
     def test_posparam_set_value_parameter_not_present(self):
         param = parser.PositionalParameter(argument_name='two', display_name='two')
         sig = support.s('one, two')
@@ -418,6 +471,451 @@ class SigTests(Fixtures):
         self._do_test(sig, '[first] [par]', (), ['otherdefault', 'converted'], {})
 
 
+class LazyConverterTests(Tests):
+    def setUp(self):
+        self.converted = []
+
+    def _conv(self, **kwargs):
+        converted = self.converted
+        def conv(arg):
+            converted.append(arg)
+            if arg == 'bad':
+                raise ValueError(arg)
+            if arg == 'worse':
+                raise errors.CliValueError('worse value')
+            return arg.upper()
+        return parser.value_converter(conv, name='CONV', **kwargs)
+
+    def _read(self, conv, *args):
+        csig = parser.CliSignature.from_signature(
+            support.s('*, par:conv="d"', locals={'conv': conv}))
+        return csig, self.read_arguments(csig, args)
+
+    def test_lazy(self):
+        csig, ba = self._read(self._conv(lazy=True), '--par', 'x')
+        self.assertEqual(str(csig), '[--par=CONV]')
+        deferred = ba.kwargs['par']
+        self.assertIsInstance(deferred, parser.DeferredValue)
+        self.assertEqual(deferred.arg, 'x')
+        self.assertIs(deferred.param, csig.aliases['--par'])
+        self.assertEqual(self.converted, [])
+        self.assertEqual(deferred.value, 'X')
+        self.assertEqual(deferred.value, 'X')
+        self.assertEqual(self.converted, ['x'])
+
+    def test_lazy_default(self):
+        csig, ba = self._read(self._conv(lazy=True, convert_default=True))
+        self.assertEqual(ba.kwargs['par'].value, 'D')
+        csig, ba = self._read(self._conv(lazy=True))
+        self.assertEqual(ba.kwargs, {})
+
+    def test_lazy_error(self):
+        csig, ba = self._read(self._conv(lazy=True), '--par', 'bad')
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            ba.kwargs['par'].value
+        self.assertIs(cm.exception.param, csig.aliases['--par'])
+        self.assertEqual(cm.exception.val, 'bad')
+        self.assertEqual(cm.exception.message, "Bad value for --par: 'bad'")
+        csig, ba = self._read(self._conv(lazy=True), '--par', 'worse')
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            ba.kwargs['par'].value
+        self.assertEqual(cm.exception.message,
+                         "Bad value for --par: worse value")
+
+    def test_validate(self):
+        validated = []
+        def validate(arg):
+            validated.append(arg)
+            if arg.startswith('-'):
+                raise errors.CliValueError('looks like an option')
+        conv = self._conv(lazy=True, validate=validate)
+        csig, ba = self._read(conv, '--par', 'x')
+        self.assertEqual(validated, ['x'])
+        self.assertEqual(self.converted, [])
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            self._read(conv, '--par=-x')
+        self.assertEqual(cm.exception.message,
+                         "Bad value for --par: looks like an option")
+        self.assertEqual(self.converted, [])
+
+    def test_validate_eager(self):
+        def validate(arg):
+            if arg == 'x':
+                raise ValueError
+        conv = self._conv(validate=validate)
+        self.assertEqual(self._read(conv, '--par', 'y')[1].kwargs,
+                         {'par': 'Y'})
+        self.assertRaises(errors.BadArgumentFormat,
+                          self._read, conv, '--par', 'x')
+
+    def test_original_unchanged(self):
+        conv = self._conv()
+        lazy = parser.value_converter(conv, lazy=True)
+        self.assertIsNot(lazy, conv)
+        self.assertEqual(conv('a'), 'A')
+        self.assertIsInstance(lazy('a'), parser.DeferredValue)
+
+    def test_run(self):
+        conv = self._conv(lazy=True)
+        def func(used, unused):
+            return used.value
+        func = modifiers.annotate(used=conv, unused=conv)(func)
+        stdout, stderr = self.crun(func, ['test', 'a', 'b'])
+        self.assertEqual(stdout.getvalue(), 'A\n')
+        self.assertEqual(self.converted, ['a'])
+        stdout, stderr = self.crun(func, ['test', 'bad', 'b'])
+        self.assertEqual(stderr.getvalue(),
+                         "test: Bad value for used: 'bad'\n"
+                         "Usage: test used unused\n")
+
+
+class ConcurrentConverterTests(Tests):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.most_active = 0
+
+    def _conv(self, concurrent=True, **kwargs):
+        def conv(arg):
+            with self.lock:
+                self.active += 1
+                self.most_active = max(self.most_active, self.active)
+            try:
+                time.sleep(0.01)
+                if arg.startswith('bad'):
+                    raise ValueError(arg)
+                return arg.upper()
+            finally:
+                with self.lock:
+                    self.active -= 1
+        return parser.value_converter(
+            conv, name='CONV', concurrent=concurrent, **kwargs)
+
+    def _read(self, sig, conv, *args):
+        csig = parser.CliSignature.from_signature(
+            support.s(sig, locals={
+                'conv': conv, 'multi3': (conv, multi(max=3))}))
+        return csig, self.read_arguments(csig, args)
+
+    def test_args(self):
+        csig, ba = self._read('a, *args:conv', self._conv(),
+                              'a', 'b', 'c', 'd', 'e')
+        self.assertEqual(ba.args, ['a', 'B', 'C', 'D', 'E'])
+        self.assertEqual(csig.positional[-1].concurrency,
+                         parser.CONVERSION_THREADS)
+
+    @unittest.skipIf(futures is None, 'concurrent.futures unavailable')
+    def test_threads(self):
+        self._read('*args:conv', self._conv(), 'a', 'b', 'c', 'd')
+        self.assertGreater(self.most_active, 1)
+
+    def test_bounded(self):
+        csig, ba = self._read('*args:conv', self._conv(2),
+                              *'abcdefgh')
+        self.assertEqual(ba.args, list('ABCDEFGH'))
+        self.assertLessEqual(self.most_active, 2)
+
+    def test_multi_option(self):
+        csig, ba = self._read(
+            '*, opt:multi3', self._conv(),
+            '--opt', 'a', '--opt=b', '--opt', 'c')
+        self.assertEqual(ba.kwargs, {'opt': ['A', 'B', 'C']})
+        self.assertRaises(
+            errors.TooManyValues, self._read,
+            '*, opt:multi3', self._conv(),
+            '--opt', 'a', '--opt=b', '--opt', 'c', '--opt', 'd')
+
+    def test_first_error(self):
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            self._read('a, *args:conv', self._conv(),
+                       'a', 'b', 'bad1', 'c', 'bad2')
+        self.assertEqual(cm.exception.val, 'bad1')
+        self.assertEqual(cm.exception.pos, 2)
+        self.assertEqual(cm.exception.message, "Bad value for args: 'bad1'")
+
+    def test_single_value(self):
+        csig, ba = self._read('a:conv, *, o:conv=None', self._conv(),
+                              'a', '-o', 'b')
+        self.assertEqual(ba.args, ['A'])
+        self.assertEqual(ba.kwargs, {'o': 'B'})
+
+    def test_hooks(self):
+        events = []
+        class Hooks(parser.ParseHooks):
+            def conversion_finished(self, ba, param, arg, value,
+                                    elapsed, exc):
+                events.append((arg, value, exc))
+        csig = parser.CliSignature.from_signature(
+            support.s('*args:conv', locals={'conv': self._conv()}))
+        csig.hooks = [Hooks()]
+        self.read_arguments(csig, ('a', 'b'))
+        self.assertEqual(events, [('a', 'A', None), ('b', 'B', None)])
+
+    def test_original_unchanged(self):
+        def upper(arg):
+            return arg.upper()
+        conv = parser.value_converter(upper)
+        concurrent = parser.value_converter(conv, concurrent=True)
+        self.assertIsNot(concurrent, conv)
+        self.assertNotIn('concurrent', conv._clize__value_converter)
+
+    def test_run(self):
+        def func(*args):
+            return ' '.join(args)
+        func = modifiers.annotate(args=self._conv())(func)
+        stdout, stderr = self.crun(func, ['test', 'a', 'b'])
+        self.assertEqual(stdout.getvalue(), 'A B\n')
+        stdout, stderr = self.crun(func, ['test', 'a', 'bad'])
+        self.assertEqual(stderr.getvalue(),
+                         "test: Bad value for args: 'bad'\n"
+                         "Usage: test [args...]\n")
+
+
+class ParsePlanTests(Tests):
+    def test_alias_tables(self):
+        sig = support.s('*, one: "o"=False, two: "t"=1, three="s"')
+        csig = parser.CliSignature.from_signature(sig)
+        plan = csig.plan
+        self.assertIs(plan, csig.plan)
+        self.assertIs(plan.aliases, csig.aliases)
+        self.assertEqual(sorted(plan.long), ['--one', '--three', '--two'])
+        self.assertEqual(sorted(plan.short), ['o', 't'])
+        self.assertIs(plan.short['o'], csig.aliases['-o'])
+
+    def test_positions(self):
+        csig = parser.CliSignature.from_signature(
+            support.s('a, b, *args, c'))
+        self.assertEqual(
+            dict((p.display_name, i)
+                 for p, i in csig.plan.positions.items()),
+            {'a': 0, 'b': 1, 'args': 2})
+
+    def test_posparam_many(self):
+        # functions can't have more than 255 arguments before Python 3.7
+        names = ['a{0}'.format(i) for i in range(250)]
+        csig = parser.CliSignature.from_signature(
+            support.s(', '.join(n + '=1' for n in names)))
+        ba = self.read_arguments(csig, ('2',) * 125)
+        self.assertEqual(ba.args, [2] * 125)
+        param = csig.positional[-1]
+        param.set_value(ba, 3)
+        self.assertEqual(ba.args, [2] * 125 + [1] * 124 + [3])
+
+    def test_post_parse_only_when_needed(self):
+        called = []
+        class PostParam(parser.OptionParameter):
+            def post_parse(self, ba):
+                called.append(self)
+        @parser.value_converter(convert_default=True)
+        def conv(arg):
+            return 'c' + arg
+        post = PostParam(aliases=['--post'], argument_name='post',
+                         default='p')
+        sig = support.s('a, b=1, *, c:conv="d", d="e", post:p',
+                        locals={'conv': conv, 'p': post})
+        csig = parser.CliSignature.from_signature(sig)
+        self.assertEqual(
+            sorted(p.argument_name for p in csig.plan.post_parse),
+            ['c', 'post'])
+        ba = self.read_arguments(csig, ('x',))
+        self.assertEqual(called, [post])
+        self.assertEqual(ba.kwargs, {'c': 'cd'})
+
+    def test_namedparams_shared_until_accessed(self):
+        csig = parser.CliSignature.from_signature(support.s('*, one'))
+        ba = self.read_arguments(csig, ('--one', 'x'))
+        self.assertIs(ba._aliases, csig.aliases)
+        ba.namedparams['--other'] = None
+        self.assertNotIn('--other', csig.aliases)
+
+
+class _RecordingHooks(parser.ParseHooks):
+    def __init__(self):
+        self.events = []
+
+    def argument_matched(self, ba, param, i):
+        self.events.append(('matched', param.display_name, ba.in_args[i]))
+
+    def conversion_started(self, ba, param, arg):
+        self.events.append(('started', param.display_name, arg))
+
+    def conversion_finished(self, ba, param, arg, value, elapsed, exc):
+        self.assertGreaterEqual(elapsed, 0)
+        self.events.append(('finished', param.display_name, value,
+                            type(exc).__name__ if exc else None))
+
+    def post_parse(self, ba):
+        self.events.append(('post_parse', ba.args, ba.kwargs))
+
+    def dispatched(self, func, name, args, kwargs):
+        self.events.append(('dispatched', func.__name__, name, args, kwargs))
+
+
+class ParseHooksTests(Tests):
+    def setUp(self):
+        self.hooks = _RecordingHooks()
+        self.hooks.assertGreaterEqual = self.assertGreaterEqual
+
+    def test_events(self):
+        from clize import runner
+        func = support.f('a, b:int=1, *, c=""')
+        cli = runner.Clize(func, hooks=[self.hooks])
+        self.assertEqual(cli('test', 'x', '-c', 'y', '2'),
+                         {'a': 'x', 'b': 2, 'c': 'y'})
+        self.assertEqual(self.hooks.events, [
+            ('matched', 'a', 'x'),
+            ('started', 'a', 'x'),
+            ('finished', 'a', 'x', None),
+            ('matched', '-c', '-c'),
+            ('started', '-c', 'y'),
+            ('finished', '-c', 'y', None),
+            ('matched', 'b', '2'),
+            ('started', 'b', '2'),
+            ('finished', 'b', 2, None),
+            ('post_parse', ['x', 2], {'c': 'y'}),
+            ('dispatched', 'func', 'test', ['x', 2], {'c': 'y'}),
+            ])
+
+    def test_conversion_error(self):
+        csig = parser.CliSignature.from_signature(support.s('a:int'))
+        csig.hooks = [self.hooks]
+        self.assertRaises(errors.BadArgumentFormat,
+                          self.read_arguments, csig, ('x',))
+        self.assertEqual(self.hooks.events, [
+            ('matched', 'a', 'x'),
+            ('started', 'a', 'x'),
+            ('finished', 'a', None, 'BadArgumentFormat'),
+            ])
+
+    def test_default_conversion(self):
+        @parser.value_converter(convert_default=True)
+        def conv(arg):
+            return 'c' + arg
+        csig = parser.CliSignature.from_signature(
+            support.s('*, a:conv="d"', locals={'conv': conv}))
+        csig.hooks = [self.hooks]
+        ba = self.read_arguments(csig, ())
+        self.assertEqual(ba.kwargs, {'a': 'cd'})
+        self.assertEqual(self.hooks.events, [
+            ('started', '-a', 'd'),
+            ('finished', '-a', 'cd', None),
+            ('post_parse', [], {'a': 'cd'}),
+            ])
+
+    def test_no_hooks(self):
+        csig = parser.CliSignature.from_signature(support.s('a:int'))
+        self.assertEqual(csig.hooks, ())
+        self.assertEqual(self.read_arguments(csig, ('1',)).args, [1])
+
+    def test_dispatcher_passes_hooks(self):
+        from clize import runner
+        def one(a):
+            return a
+        cli = runner.SubcommandDispatcher([one], hooks=[self.hooks])
+        self.assertEqual(cli.cli('test', 'one', 'x'), 'x')
+        self.assertEqual(self.hooks.events[-1],
+                         ('dispatched', 'one', 'test one', ['x'], {}))
+
+
+class StreamParameterTests(Tests):
+    def _csig(self, sig_str, **locals):
+        locals['P'] = parser.Parameter
+        return parser.CliSignature.from_signature(
+            support.s(sig_str, locals=locals))
+
+    def test_lazy(self):
+        converted = []
+        @parser.value_converter
+        def conv(arg):
+            converted.append(arg)
+            return int(arg)
+        csig = self._csig('a, rest: ann, *, o=""',
+                          ann=(conv, parser.Parameter.STREAM))
+        self.assertEqual(str(csig), '[-o STR] a [rest...]')
+        ba = self.read_arguments(csig, ('x', '1', '-o', 'y', '2', '3'))
+        self.assertEqual(ba.args[0], 'x')
+        self.assertEqual(ba.kwargs, {'o': 'y'})
+        self.assertEqual(len(ba.args), 2)
+        stream = ba.args[1]
+        self.assertIsInstance(stream, parser.ArgumentStream)
+        self.assertEqual(converted, [])
+        self.assertEqual(len(stream), 3)
+        self.assertEqual(next(stream), 1)
+        self.assertEqual(converted, ['1'])
+        self.assertEqual(list(stream), [2, 3])
+        self.assertEqual(len(stream), 0)
+
+    def test_empty(self):
+        csig = self._csig('a, rest: P.STREAM')
+        ba = self.read_arguments(csig, ('x',))
+        self.assertEqual(list(ba.args[1]), [])
+
+    def test_default(self):
+        csig = self._csig('a, rest: P.STREAM=None')
+        self.assertEqual(self.read_arguments(csig, ('x',)).args, ['x'])
+
+    def test_required(self):
+        csig = self._csig('rest: ann', ann=(
+            parser.Parameter.STREAM, parser.Parameter.REQUIRED))
+        self.assertRaises(errors.MissingRequiredArguments,
+                          self.read_arguments, csig, ())
+        self.assertEqual(list(self.read_arguments(csig, ('x',)).args[0]),
+                         ['x'])
+
+    def test_bad_value(self):
+        csig = self._csig('rest: ann', ann=(int, parser.Parameter.STREAM))
+        stream = self.read_arguments(csig, ('1', 'x')).args[0]
+        self.assertEqual(next(stream), 1)
+        with self.assertRaises(errors.BadArgumentFormat) as cm:
+            next(stream)
+        self.assertIs(cm.exception.param, csig.positional[0])
+        self.assertEqual(cm.exception.val, 'x')
+
+    def test_run(self):
+        def func(first, rest):
+            return first + ''.join(rest)
+        func = modifiers.annotate(rest=parser.Parameter.STREAM)(func)
+        stdout, stderr = self.crun(func, ['test', 'a', 'b', 'c'])
+        self.assertEqual(stdout.getvalue(), 'abc\n')
+        def fail(rest):
+            for value in rest:
+                pass
+        fail = modifiers.annotate(rest=(int, parser.Parameter.STREAM))(fail)
+        stdout, stderr = self.crun(fail, ['test', '1', 'x'])
+        self.assertEqual(stderr.getvalue(),
+                         "test: Bad value for rest: 'x'\n"
+                         "Usage: test [rest...]\n")
+
+
+class _PickledMixin(parser.ParameterWithValue):
+    pass
+
+
+class PickleTests(Tests):
+    def test_signature(self):
+        sig = support.s(
+            'a, b:mix=1, *args:int, c:"x"=False, d=2.0, e:mix="s"',
+            locals={'mix': parser.use_mixin(_PickledMixin)})
+        csig = parser.CliSignature.from_signature(sig)
+        copy = pickle.loads(pickle.dumps(csig, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(str(copy), str(csig))
+        self.assertIs(copy.positional[0].default, util.UNSET)
+        self.assertIs(copy.positional[1].conv, parser._implicit_converters[int])
+        self.assertEqual(type(copy.parameters['e']), type(csig.parameters['e']))
+        ba = self.read_arguments(copy, ('1', '2', '3', '-x', '-ef'))
+        self.assertEqual(ba.args, ['1', 2, 3])
+        self.assertEqual(ba.kwargs, {'c': True, 'e': 'f'})
+
+
+_deferred_func = support.f('')
+
+
+class _DeferredFallback(parser.FallbackCommandParameter):
+    @property
+    def func(self):
+        return _deferred_func
+
+
 class ExtraParamsTests(Fixtures):
     def _test(self, sig_str, extra, args, posargs, kwargs, func):
         sig = support.s(sig_str)
@@ -471,6 +969,11 @@ class ExtraParamsTests(Fixtures):
         ['test --flb'], {}, _func2
         )
 
+    flb_deferred_func = (
+        '', [_DeferredFallback(aliases=['--alt'])],
+        ('--alt', 'a'), ['test --alt', 'a'], {}, _deferred_func
+        )
+
     def test_alt_middle(self):
         _func = support.f('')
         args = [
@@ -610,4 +1113,6 @@ class BadSigTests(Fixtures):
         sig = support.s(sig_str, pre='from clize import Parameter')
         self.assertRaises(ValueError, parser.CliSignature.from_signature, sig)
 
+    stream_varargs = '*args: Parameter.STREAM',
+    stream_named = '*, one: Parameter.STREAM',
     alias_overlapping = '*, one: "a", two: "a"',
@@ -0,0 +1,105 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+import os
+import shutil
+import pstats
+import tempfile
+import unittest
+
+from sigtools.modifiers import kwoargs
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from clize import runner, errors
+from clize.tests.util import Tests
+
+
+@kwoargs('upper')
+def _echo(word, upper=False):
+    return word.upper() if upper else word
+
+
+def _ship(name):
+    return 'ship ' + name
+
+
+def _other():
+    return 'other'
+
+
+class ProfilingTests(Tests):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.path = os.path.join(tmpdir, 'out')
+
+    def _functions(self, path):
+        stats = pstats.Stats(path)
+        return set(func for _, _, func in stats.stats)
+
+    def test_cpu(self):
+        cli = runner.Clize(_echo, profile=True)
+        self.assertEqual(
+            cli('test', '--clize-profile=' + self.path, 'abc', '--upper'),
+            'ABC')
+        self.assertIn('_echo', self._functions(self.path))
+
+    def test_cpu_separate_value(self):
+        cli = runner.Clize(_echo, profile=True)
+        self.assertEqual(
+            cli('test', '--clize-profile', self.path, 'abc'), 'abc')
+        self.assertIn('_echo', self._functions(self.path))
+
+    @unittest.skipIf(tracemalloc is None, 'tracemalloc unavailable')
+    def test_memory(self):
+        cli = runner.Clize(_echo, profile=True)
+        self.assertEqual(cli('test', '--clize-memory=' + self.path, 'abc'),
+                         'abc')
+        with open(self.path) as f:
+            report = f.read()
+        self.assertTrue(report.startswith('Current: '), report)
+        self.assertIn('by allocated memory', report)
+
+    def test_dispatcher(self):
+        cli = runner.SubcommandDispatcher([_ship, _other], profile=True)
+        self.assertEqual(
+            cli.cli('tool', '--clize-profile=' + self.path, 'ship', 'a'),
+            'ship a')
+        self.assertIn('_ship', self._functions(self.path))
+
+    def test_name_unchanged(self):
+        names = []
+        def func(name):
+            names.append(name)
+        from clize import parameters
+        from sigtools.modifiers import annotate
+        cli = runner.Clize(annotate(name=parameters.pass_name)(func),
+                           profile=True)
+        cli('test', '--clize-profile=' + self.path)
+        self.assertEqual(names, ['test'])
+
+    def test_disabled(self):
+        cli = runner.Clize(_echo)
+        self.assertRaises(errors.UnknownOption,
+                          cli, 'test', '--clize-profile=' + self.path, 'abc')
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_hidden(self):
+        cli = runner.Clize(_echo, profile=True)
+        self.assertNotIn('clize-profile', cli('test', '--help'))
+
+    def test_not_first(self):
+        cli = runner.Clize(_echo, profile=True)
+        self.assertRaises(errors.ArgsBeforeAlternateCommand,
+                          cli, 'test', 'abc', '--clize-profile=' + self.path)
+
+    def test_missing_path(self):
+        cli = runner.Clize(_echo, profile=True)
+        self.assertRaises(errors.MissingValue, cli, 'test', '--clize-profile')
+        self.assertRaises(errors.MissingValue,
+                          cli, 'test', '--clize-profile=', 'abc')
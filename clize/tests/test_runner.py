@@ -5,9 +5,14 @@
 import os
 import sys
 import shutil
+import subprocess
+import tempfile
 import unittest
+import contextlib
 
 from six.moves import cStringIO
+from sigtools.modifiers import kwoargs
+from sigtools.specifiers import forwards_to_method
 
 from clize.tests.util import Fixtures, Tests
 from clize import runner, errors
@@ -267,6 +272,89 @@ class GetCliTests(unittest.TestCase):
                                    runner.SubcommandDispatcher))
         self.assertEqual(set(sd.cmds_by_name), set(['2', '3']))
 
+    def test_sub_lazy(self):
+        built = []
+        class CountingClize(runner.Clize):
+            @classmethod
+            def get_cli(cls, obj, **kwargs):
+                built.append(obj)
+                return super(CountingClize, cls).get_cli(obj, **kwargs)
+        class Dispatcher(runner.SubcommandDispatcher):
+            clizer = CountingClize
+        def func1(): return 'func1'
+        def func2(): raise NotImplementedError
+        sd = Dispatcher([func1, func2])
+        self.assertEqual(built, [])
+        self.assertIs(sd.cli, sd.cli)
+        self.assertEqual(sd.cli('test', 'func1'), 'func1')
+        self.assertEqual(sd.cli('test', 'func1'), 'func1')
+        self.assertEqual(built, [func1])
+        self.assertIs(sd.cmds[('func1',)], sd.cmds_by_name['func1'])
+
+    def _write_module(self, name, source):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        with open(os.path.join(tmpdir, name + '.py'), 'w') as f:
+            f.write(source)
+        sys.path.insert(0, tmpdir)
+        self.addCleanup(sys.path.remove, tmpdir)
+        self.addCleanup(sys.modules.pop, name, None)
+        return tmpdir
+
+    def test_sub_import_path(self):
+        self._write_module('_clize_test_cmds', (
+            'def report(name):\n'
+            '    """Shows a report"""\n'
+            '    return "report " + name\n'
+        ))
+        sd = runner.SubcommandDispatcher({
+            'report': '_clize_test_cmds:report',
+            'other': '_clize_test_missing:other',
+            })
+        self.assertNotIn('_clize_test_cmds', sys.modules)
+        self.assertEqual(sd.cli('test', 'report', 'abc'), 'report abc')
+        self.assertIn('_clize_test_cmds', sys.modules)
+        self.assertNotIn('_clize_test_missing', sys.modules)
+
+    def test_import_path_bad(self):
+        self.assertRaises(ValueError, runner.Clize.get_cli, 'no_attribute')
+        self.assertRaises(ValueError, runner.Clize.get_cli, ':attribute')
+
+    def test_sub_import_path_manifest(self):
+        tmpdir = self._write_module('_clize_test_cmds', (
+            'def report():\n'
+            '    """Shows a report"""\n'
+        ))
+        manifest = os.path.join(tmpdir, 'manifest.json')
+        def get_help():
+            sys.modules.pop('_clize_test_cmds', None)
+            sd = runner.SubcommandDispatcher(
+                {'report': '_clize_test_cmds:report'}, manifest=manifest)
+            return sd.cli('test', '--help')
+        self.assertIn('Shows a report', get_help())
+        self.assertIn('_clize_test_cmds', sys.modules)
+        self.assertIn('Shows a report', get_help())
+        self.assertNotIn('_clize_test_cmds', sys.modules)
+        with open(os.path.join(tmpdir, '_clize_test_cmds.py'), 'w') as f:
+            f.write('def report():\n    """Shows another report"""\n')
+        self.assertIn('Shows another report', get_help())
+        self.assertIn('_clize_test_cmds', sys.modules)
+
+    def test_sub_import_path_manifest_written_once(self):
+        tmpdir = self._write_module('_clize_test_cmds', ''.join(
+            'def report{0}():\n    """Shows report {0}"""\n'.format(i)
+            for i in range(3)))
+        manifest = os.path.join(tmpdir, 'manifest.json')
+        sd = runner.SubcommandDispatcher(dict(
+            ('report{0}'.format(i), '_clize_test_cmds:report{0}'.format(i))
+            for i in range(3)), manifest=manifest)
+        with _count_writes() as writes:
+            help = sd.cli('test', '--help')
+        self.assertIn('Shows report 2', help)
+        self.assertEqual(writes, [manifest])
+        self.assertEqual(
+            len(runner.CommandManifest(manifest).entries), 3)
+
     def test_as_is(self):
         def func(): raise NotImplementedError
         ru = runner.Clize.get_cli(runner.Clize.as_is(func))
@@ -352,6 +440,79 @@ class GetCliTests(unittest.TestCase):
         self.assertTrue(ru.owner is inst)
         repr(ru)
 
+    def test_instattr_deco_shared_signature(self):
+        calls = []
+        def counting_signature(func):
+            calls.append(func)
+            return orig_signature(func)
+        orig_signature = runner.signature
+        runner.signature = counting_signature
+        self.addCleanup(setattr, runner, 'signature', orig_signature)
+        class Cls(object):
+            def __init__(self, value):
+                self.value = value
+            @runner.Clize
+            def method(self, arg):
+                return self.value + arg
+        first = Cls('first ')
+        second = Cls('second ')
+        self.assertEqual(first.method('test', 'a'), 'first a')
+        self.assertEqual(second.method('test', 'b'), 'second b')
+        self.assertEqual(first.method('test', 'c'), 'first c')
+        self.assertEqual(len(calls), 1)
+        self.assertIs(first.method.signature, second.method.signature)
+        self.assertIs(second.method.owner, second)
+        self.assertEqual(str(second.method.signature), 'arg')
+        self.assertTrue(
+            second.method('test', '--help').startswith('Usage: test arg'))
+
+    def test_instattr_deco_shared_alternates(self):
+        class Helper(object):
+            def __init__(self, subject, owner):
+                self.cli = lambda name: 'help of ' + subject.owner.value
+        def version():
+            return 'version'
+        class Cls(object):
+            def __init__(self, value):
+                self.value = value
+            @runner.Clize(helper_class=Helper, alt=[version])
+            def method(self, arg):
+                raise NotImplementedError
+        first = Cls('first')
+        second = Cls('second')
+        self.assertEqual(first.method('test', '--help'), 'help of first')
+        self.assertEqual(second.method('test', '--help'), 'help of second')
+        self.assertEqual(first.method('test', '-h'), 'help of first')
+        self.assertEqual(second.method('test', '--version'), 'version')
+        self.assertIs(first.method.signature, second.method.signature)
+
+    def test_instattr_deco_signature_per_class(self):
+        class Base(object):
+            @runner.Clize
+            @forwards_to_method('impl')
+            def method(self, *args, **kwargs):
+                return self.impl(*args, **kwargs)
+            def impl(self, a):
+                return a
+        class Sub(Base):
+            def impl(self, a, b):
+                return a + b
+        base = Base()
+        self.assertEqual(str(base.method.signature), 'a')
+        first = Sub()
+        second = Sub()
+        self.assertEqual(str(first.method.signature), 'a b')
+        self.assertIs(first.method.signature, second.method.signature)
+        self.assertIsNot(base.method.signature, first.method.signature)
+        self.assertEqual(second.method('test', 'x', 'y'), 'xy')
+        self.assertEqual(base.method('test', 'x'), 'x')
+        first.method('test', '--help')
+        cli = second.method
+        func, name, args, kwargs = cli.read_commandline(['test', '--help'])
+        self.assertIs(func.owner.subject, cli)
+        self.assertIs(func.owner.owner, second)
+        self.assertTrue(func(name).startswith('Usage: test a b'))
+
     def test_instattr_deco_selfget(self):
         class SelfGet(object):
             __name__ = 'SelfGet'
@@ -376,6 +537,301 @@ class GetCliTests(unittest.TestCase):
         obj = object()
         self.assertRaises(TypeError, runner.Clize.get_cli, obj)
 
+@contextlib.contextmanager
+def _count_writes():
+    writes = []
+    write_file = runner._write_file
+    def _write_file(path, mode, write):
+        writes.append(path)
+        return write_file(path, mode, write)
+    runner._write_file = _write_file
+    try:
+        yield writes
+    finally:
+        runner._write_file = write_file
+
+
+def _cached_func(one, two=2, *args):
+    raise NotImplementedError
+
+
+def _cached_func2(three):
+    return three
+
+
+_needs_qualname = unittest.skipIf(
+    sys.version_info < (3, 3), 'functions have no __qualname__')
+
+
+class SignatureCacheTests(Tests):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.path = os.path.join(tmpdir, 'sigcache')
+
+    @_needs_qualname
+    def test_cold_and_warm(self):
+        cache = runner.SignatureCache(self.path)
+        cli = runner.Clize(_cached_func, signature_cache=cache)
+        self.assertEqual(str(cli.signature), 'one [two] [args...]')
+        self.assertFalse(os.path.exists(self.path))
+        cache.flush()
+        self.assertTrue(os.path.exists(self.path))
+        warm = runner.Clize(_cached_func, signature_cache=self.path)
+        self.assertEqual(str(warm.signature), 'one [two] [args...]')
+        self.assertNotIn('func_signature', warm.__dict__)
+        self.assertIn('--help', warm.signature.aliases)
+        ba = warm.signature.read_arguments(['1', '3'], 'test')
+        self.assertEqual(ba.args, ['1', 3])
+
+    @_needs_qualname
+    def test_stale(self):
+        cache = runner.SignatureCache(self.path)
+        runner.Clize(_cached_func, signature_cache=cache).signature
+        key = runner._cache_key(_cached_func)
+        modules, fingerprint, data = cache.entries[key]
+        cache.entries[key] = modules, 'stale', data
+        cache._save()
+        cli = runner.Clize(_cached_func, signature_cache=self.path)
+        cli.signature
+        self.assertIn('func_signature', cli.__dict__)
+
+    @_needs_qualname
+    def test_stale_decorator(self):
+        tmpdir = os.path.dirname(self.path)
+        sys.path.insert(0, tmpdir)
+        self.addCleanup(sys.path.remove, tmpdir)
+        deco_source = (
+            'from sigtools import wrappers, modifiers\n'
+            '@wrappers.decorator\n'
+            '@modifiers.kwoargs({0})\n'
+            'def with_opts(wrapped, {1}*args, **kwargs):\n'
+            '    return wrapped(*args, **kwargs)\n')
+        with open(os.path.join(tmpdir, '_clize_deco.py'), 'w') as f:
+            f.write(deco_source.format("'verbose'", 'verbose=False, '))
+        with open(os.path.join(tmpdir, '_clize_target.py'), 'w') as f:
+            f.write('from _clize_deco import with_opts\n'
+                    '@with_opts\n'
+                    'def main(a):\n'
+                    '    return a\n')
+        for name in ('_clize_deco', '_clize_target'):
+            self.addCleanup(sys.modules.pop, name, None)
+        from _clize_target import main
+        cache = runner.SignatureCache(self.path)
+        cli = runner.Clize(main, signature_cache=cache)
+        self.assertEqual(str(cli.signature), '[--verbose] a')
+        cache.flush()
+        self.assertIsNotNone(runner.SignatureCache(self.path).get(main))
+        with open(os.path.join(tmpdir, '_clize_deco.py'), 'w') as f:
+            f.write(deco_source.format("'verbose', 'quiet'",
+                                       'verbose=False, quiet=False, '))
+        self.assertIsNone(runner.SignatureCache(self.path).get(main))
+
+    def test_local_func_not_cached(self):
+        def func(a):
+            raise NotImplementedError
+        cache = runner.SignatureCache(self.path)
+        self.assertEqual(str(runner.Clize(func, signature_cache=cache).signature), 'a')
+        self.assertEqual(cache.entries, {})
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_corrupt_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a pickle')
+        cli = runner.Clize(_cached_func, signature_cache=self.path)
+        self.assertEqual(str(cli.signature), 'one [two] [args...]')
+
+    def test_no_qualname_not_cached(self):
+        class Func(object):
+            __module__ = __name__
+            __name__ = '_cached_func'
+        self.assertIsNone(runner._cache_key(Func()))
+
+    def test_written_once(self):
+        cache = runner.SignatureCache(self.path)
+        runner.Clize(_cached_func, signature_cache=cache).signature
+        runner.Clize(_cached_func2, signature_cache=cache).signature
+        with _count_writes() as writes:
+            cache.flush()
+            cache.flush()
+        self.assertEqual(writes, [self.path] if cache.entries else [])
+
+    @_needs_qualname
+    def test_run_flushes(self):
+        with _count_writes() as writes:
+            self.crun(
+                [_cached_func, _cached_func2],
+                args=['test', 'cached-func2', 'abc'],
+                signature_cache=self.path)
+        self.assertEqual(writes, [self.path])
+
+    @_needs_qualname
+    def test_run_dispatcher(self):
+        stdout, stderr = self.crun(
+            [_cached_func2], args=['test', 'cached-func2', 'abc'],
+            signature_cache=self.path)
+        self.assertEqual(stdout.getvalue(), 'abc\n')
+        entries = runner.SignatureCache(self.path).entries
+        self.assertIn(runner._cache_key(_cached_func2), entries)
+
+
+@kwoargs('two')
+def _help_func(one, two=2):
+    """Description
+
+    one: First
+
+    two: Second
+    """
+    raise NotImplementedError
+
+
+class HelpCacheTests(Tests):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.path = os.path.join(tmpdir, 'helpcache')
+        from clize import help
+        built = self.built = []
+        class CountingHelp(help.HelpForAutodetectedDocstring):
+            @classmethod
+            def from_subject(cls, subject, owner):
+                built.append(subject)
+                return super(CountingHelp, cls).from_subject(subject, owner)
+        def helper_class(subject, owner):
+            return help.HelpCli(subject, owner, CountingHelp.from_subject)
+        self.helper_class = helper_class
+
+    def _cli(self, func=_help_func):
+        return runner.Clize(func, helper_class=self.helper_class,
+                            help_cache=self.path)
+
+    def test_help(self):
+        expected = runner.Clize(_help_func)('test', '--help')
+        self.assertEqual(self._cli()('test', '--help'), expected)
+        self.assertEqual(len(self.built), 1)
+        self.assertEqual(self._cli()('test', '--help'), expected)
+        self.assertEqual(len(self.built), 1)
+        self.assertIn('Description', expected)
+
+    def test_usage(self):
+        expected = runner.Clize(_help_func)('test', '--help', '--usage')
+        self.assertEqual(self._cli()('test', '--help', '--usage'), expected)
+        self.assertEqual(self._cli()('test', '--help', '--usage'), expected)
+        self.assertEqual(len(self.built), 1)
+        self.assertNotEqual(self._cli()('other', '--help', '--usage'),
+                            expected)
+        self.assertEqual(len(self.built), 2)
+
+    def test_error_usage(self):
+        def error_text():
+            try:
+                self._cli()('test')
+            except errors.ArgumentError as e:
+                return str(e)
+            self.fail('ArgumentError not raised')
+        expected = error_text()
+        self.assertIn('Usage: test [OPTIONS] one', expected)
+        self.assertEqual(error_text(), expected)
+        self.assertEqual(len(self.built), 1)
+
+    def test_docstring_change(self):
+        def func(one):
+            """Before"""
+        self.assertIn('Before', self._cli(func)('test', '--help'))
+        func.__doc__ = "After"
+        self.assertIn('After', self._cli(func)('test', '--help'))
+        self.assertEqual(len(self.built), 2)
+
+    def test_dispatcher_not_cached(self):
+        stdout, stderr = self.crun(
+            {'help-func': _help_func}, args=['test', '--help'],
+            help_cache=self.path)
+        self.assertIn('help-func   Description', stdout.getvalue())
+        self.assertEqual(runner.HelpCache(self.path).entries, {})
+
+
+def _args_func(first, *rest):
+    return [first] + list(rest)
+
+
+class ArgsFilesTests(Tests):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.tmpdir = tmpdir
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_read_args(self):
+        self.assertEqual(
+            list(runner.read_args(cStringIO('a b\r\n\nc\n'))),
+            ['a b', 'c'])
+        self.assertEqual(
+            list(runner.read_args(cStringIO('a\nb\0c\0\0'), '\0')),
+            ['a\nb', 'c', ''])
+        self.assertEqual(list(runner.read_args(cStringIO(''))), [])
+
+    def test_read_args_chunks(self):
+        args = ['arg{0}'.format(i) for i in range(50000)]
+        stream = cStringIO('\0'.join(args))
+        self.assertEqual(list(runner.read_args(stream, '\0')), args)
+
+    def test_read_args_lazily(self):
+        stream = cStringIO('a\n' * (runner.ARGS_CHUNK_SIZE * 2))
+        args = runner.read_args(stream)
+        self.assertEqual(next(args), 'a')
+        self.assertLessEqual(stream.tell(), runner.ARGS_CHUNK_SIZE)
+
+    def test_expand(self):
+        path = self._write('args', 'b\nc d\n@e\n')
+        self.assertEqual(
+            list(runner.expand_args_files(
+                ['a', '@' + path, '@', 'f', '--', '@' + path])),
+            ['a', 'b', 'c d', '@e', '@', 'f', '--', '@' + path])
+
+    def test_expand_stdin(self):
+        self.assertEqual(
+            list(runner.expand_args_files(
+                ['a', '@-', 'c'], '\0', stdin=cStringIO('b 1\0b 2\0'))),
+            ['a', 'b 1', 'b 2', 'c'])
+
+    def test_expand_missing(self):
+        args = runner.expand_args_files(
+            ['@' + os.path.join(self.tmpdir, 'missing')])
+        self.assertRaises(errors.UserError, list, args)
+
+    def test_clize(self):
+        path = self._write('args', 'b\0c\0')
+        cli = runner.Clize(_args_func, args_files=True, args_delimiter='\0')
+        self.assertEqual(cli('test', 'a', '@' + path), ['a', 'b', 'c'])
+        self.assertEqual(runner.Clize(_args_func)('test', '@' + path),
+                         ['@' + path])
+
+    def test_clize_stdin(self):
+        orig = sys.stdin
+        self.addCleanup(setattr, sys, 'stdin', orig)
+        sys.stdin = cStringIO('x\ny\n')
+        cli = runner.Clize(_args_func, args_files=True)
+        self.assertEqual(cli('test', '@-'), ['x', 'y'])
+
+    def test_run(self):
+        path = self._write('args', 'a\nb\n')
+        out = cStringIO()
+        runner.run(_args_func, args=['test', '@' + path], args_files=True,
+                   exit=False, out=out)
+        self.assertEqual(out.getvalue(), "['a', 'b']\n")
+
+    def test_dispatcher(self):
+        path = self._write('args', 'args-func\na\n')
+        cli = runner.SubcommandDispatcher([_args_func], args_files=True)
+        self.assertEqual(cli.cli('test', '@' + path, 'b'), ['a', 'b'])
+
+
 class RunnerTests(Tests):
     def test_subcommand(self):
         def func1(x):
@@ -489,6 +945,27 @@ class RunnerTests(Tests):
         self.assertTrue(stderr.getvalue())
         self.assertFalse(stdout.getvalue())
 
+    def test_help_not_imported_for_normal_parse(self):
+        code = (
+            'import sys, clize\n'
+            'def func(a, b=1): return a\n'
+            'clize.run(func, args=["test", "x", "2"], exit=False)\n'
+            'print(" ".join(m for m in ("clize.help", "docutils")\n'
+            '               if m in sys.modules))\n'
+        )
+        out = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(out.decode().split(), ['x'])
+
+    def test_help_lazy_param(self):
+        def func(): raise NotImplementedError
+        cli = runner.Clize(func)
+        param = cli.signature.aliases['--help']
+        self.assertNotIn('helper', cli.__dict__)
+        self.assertIs(param.func.owner, cli.helper)
+        stdout, stderr = self.crun(cli, args=['test', '--help'])
+        self.assertFalse(stderr.getvalue())
+        self.assertTrue(stdout.getvalue().startswith('Usage: test'))
+
     def test_run_sysargv(self):
         bmodules = sys.modules
         bargv = sys.argv
@@ -0,0 +1,281 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+import os
+import sys
+import time
+import shutil
+import signal
+import socket
+import tempfile
+import unittest
+import subprocess
+
+from sigtools.modifiers import kwoargs
+
+from clize import runner, server, client, trace, errors
+from clize.tests.util import Tests
+
+
+try:
+    server._check_support()
+except errors.UserError:
+    supported = False
+else:
+    supported = True
+
+
+@kwoargs('loud')
+def _greet(name, loud=False):
+    """Greets someone
+
+    name: Who to greet
+
+    loud: Shout
+    """
+    if name == 'fail':
+        raise errors.UserError('failed')
+    if name == 'exit':
+        sys.exit(3)
+    if name == 'read':
+        name = sys.stdin.read()
+    greeting = 'hello {0} in {1} {2}'.format(
+        name, os.getcwd(), os.environ.get('CLIZE_TEST', ''))
+    return greeting.upper() if loud else greeting
+
+
+def _bye():
+    return 'bye'
+
+
+@unittest.skipUnless(supported, 'clize.server is not supported here')
+class ServerTests(Tests):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'sock')
+
+    def _serve(self, *fn, **kwargs):
+        kwargs.setdefault('watch', False)
+        pid = os.fork()
+        if not pid:
+            try:
+                server.serve(self.path, poll=0.05, *fn, **kwargs)
+            finally:
+                os._exit(0)
+        self.addCleanup(self._stop, pid)
+        return pid
+
+    def _stop(self, pid):
+        try:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        except OSError:
+            pass
+
+    def _file(self, name, content=''):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def _call(self, *args, **kwargs):
+        stdin = open(self._file('in', kwargs.pop('stdin', '')))
+        stdout = open(self._file('out'), 'w+')
+        stderr = open(self._file('err'), 'w+')
+        for f in (stdin, stdout, stderr):
+            self.addCleanup(f.close)
+        status = client.call(
+            self.path, ('test',) + args,
+            stdio=(stdin.fileno(), stdout.fileno(), stderr.fileno()),
+            **kwargs)
+        stdout.seek(0)
+        stderr.seek(0)
+        return status, stdout.read(), stderr.read()
+
+    def test_call(self):
+        self._serve(_greet)
+        self.assertEqual(
+            self._call('bob', cwd=self.tmpdir, env={'CLIZE_TEST': 'env'}),
+            (0, 'hello bob in {0} env\n'.format(self.tmpdir), ''))
+        status, out, err = self._call('bob', '--loud')
+        self.assertEqual(out.split()[:2], ['HELLO', 'BOB'])
+
+    def test_stdin(self):
+        self._serve(_greet)
+        self.assertEqual(self._call('read', stdin='alice', env={})[1],
+                         'hello alice in {0} \n'.format(os.getcwd()))
+
+    def test_exit_status(self):
+        self._serve(_greet)
+        self.assertEqual(self._call('fail'), (1, '', 'test: failed\n'))
+        self.assertEqual(self._call('exit')[0], 3)
+        status, out, err = self._call('--unknown')
+        self.assertEqual(status, 2)
+        self.assertTrue(err.startswith("test: Unknown option '--unknown'"))
+
+    def test_name(self):
+        self._serve(_greet, name='greet')
+        self.assertEqual(self._call()[2],
+                         'greet: Missing required arguments: name\n'
+                         'Usage: greet [OPTIONS] name\n')
+
+    def test_subcommands(self):
+        self._serve(_greet, _bye)
+        self.assertEqual(self._call('bye'), (0, 'bye\n', ''))
+        status, out, err = self._call('--help')
+        self.assertIn('Greets someone', out)
+
+    def test_many(self):
+        self._serve(_greet)
+        for i in range(5):
+            self.assertEqual(self._call('bob', env={})[0], 0)
+
+    def test_reload(self):
+        source = self._file('source.py')
+        pid = self._serve(_greet, watch=[source], reload=False)
+        self.assertEqual(self._call('bob')[0], 0)
+        os.utime(source, (0, 0))
+        for i in range(100):
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                break
+            time.sleep(0.02)
+        else:
+            self.fail('server did not stop')
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_not_listening(self):
+        self.assertRaises(socket.error, client.call, self.path, ['test'],
+                          retry=0)
+
+    def test_socket_permissions(self):
+        modes = []
+        def chmod(path, mode):
+            modes.append(os.stat(path).st_mode & 0o777)
+        orig_chmod = os.chmod
+        umask = os.umask(0)
+        os.chmod = chmod
+        try:
+            server._listen(self.path).close()
+        finally:
+            os.chmod = orig_chmod
+            self.assertEqual(os.umask(umask), 0)
+        self.assertEqual(modes, [0o600])
+
+    def test_replaces_stale_socket(self):
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(self.path)
+        stale.close()
+        self._serve(_greet)
+        self.assertEqual(self._call('bob')[0], 0)
+
+    def _client(self, *args):
+        proc = subprocess.Popen(
+            [sys.executable, client.__file__.replace('.pyc', '.py')]
+            + list(args),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True)
+        out, err = proc.communicate()
+        return proc.returncode, out, err
+
+    def test_client_script(self):
+        self._serve(_greet)
+        status, out, err = self._client(self.path, 'bob')
+        self.assertEqual((status, err), (0, ''))
+        self.assertEqual(out.split()[:2], ['hello', 'bob'])
+        status, out, err = self._client(self.path, 'fail')
+        self.assertEqual((status, err), (1, 'sock: failed\n'))
+
+    def test_client_script_imports(self):
+        out = subprocess.check_output([sys.executable, '-c', (
+            'import runpy, sys; runpy.run_path({0!r}); '
+            'print(sorted(m for m in sys.modules if m.startswith("clize")))'
+            ).format(client.__file__.replace('.pyc', '.py'))],
+            universal_newlines=True)
+        self.assertEqual(out, '[]\n')
+
+    def test_client_script_errors(self):
+        status, out, err = self._client()
+        self.assertEqual(status, 2)
+        self.assertTrue(err.startswith('Usage: client.py socket-path'))
+        status, out, err = self._client('--help')
+        self.assertEqual((status, err), (0, ''))
+        self.assertTrue(out.startswith('Usage: client.py socket-path'))
+        status, out, err = self._client(self.path, 'bob')
+        self.assertEqual(status, 1)
+        self.assertTrue(err.startswith(
+            'client.py: Could not run the command on ' + self.path))
+
+    def test_protocol(self):
+        left, right = socket.socketpair(socket.AF_UNIX)
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+        r, w = os.pipe()
+        request = {'argv': ['test', u'\udcff'], 'cwd': '/', 'env': {}}
+        client.send_request(left, request, [r, w])
+        os.close(r)
+        os.close(w)
+        received, fds = server.recv_request(right)
+        self.assertEqual(received, request)
+        self.assertEqual(len(fds), 2)
+        os.write(fds[1], b'x')
+        self.assertEqual(os.read(fds[0], 1), b'x')
+        for fd in fds:
+            os.close(fd)
+
+
+@unittest.skipIf(supported, 'clize.server is supported here')
+class UnsupportedTests(Tests):
+    path = os.path.join(tempfile.gettempdir(), 'sock')
+
+    def test_serve(self):
+        self.assertRaises(errors.UserError, server.serve, self.path, _greet)
+
+    def test_call(self):
+        self.assertRaises(OSError, client.call, self.path, ['test'])
+
+    def test_call_cli(self):
+        stdout, stderr = self.crun(server._call_cli, ['test', self.path])
+        self.assertTrue(stderr.getvalue().startswith(
+            'test: Could not run the command on ' + self.path))
+
+    def test_client_script(self):
+        proc = subprocess.Popen(
+            [sys.executable, client.__file__.replace('.pyc', '.py'),
+             self.path, 'bob'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True)
+        out, err = proc.communicate()
+        self.assertEqual(proc.returncode, 1)
+        self.assertTrue(err.startswith(
+            'client.py: Could not run the command on ' + self.path))
+
+
+class WarmUpTests(Tests):
+    def test_warm_up(self):
+        runner.Clize.get_cli(_bye)('test', '--help')
+        cli = runner.Clize.get_cli(_greet)
+        server.warm_up(cli)
+        with trace.counting() as counts:
+            cli('test', 'bob')
+            cli('test', '--help')
+        self.assertEqual(counts, {})
+
+    def test_warm_up_subcommands(self):
+        runner.Clize.get_cli(_bye)('test', '--help')
+        cli = runner.Clize.get_cli([_greet, _bye])
+        server.warm_up(cli)
+        with trace.counting() as counts:
+            cli('test', 'greet', 'bob')
+            cli('test', 'bye')
+            cli('test', '--help')
+        self.assertEqual(counts, {})
+
+    def test_warm_up_imported(self):
+        cli = runner.Clize.get_cli(
+            {'greet': 'clize.tests.test_server:_greet'})
+        server.warm_up(cli)
+        with trace.counting() as counts:
+            cli('test', 'greet', 'bob')
+        self.assertEqual(counts, {})
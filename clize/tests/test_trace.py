@@ -0,0 +1,293 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+from six.moves import cStringIO
+from sigtools import support
+from sigtools.modifiers import kwoargs
+
+from clize import runner, trace, errors, help
+from clize.tests.util import Tests
+
+
+def _greet(name, times=1):
+    """Greets someone
+
+    name: Who to greet
+
+    times: How many times
+    """
+    return ' '.join(['hello', name] * int(times))
+
+
+class TraceTests(Tests):
+    def setUp(self):
+        self.environ = os.environ.pop('CLIZE_TRACE', None)
+        self.addCleanup(self._restore_environ)
+
+    def _restore_environ(self):
+        os.environ.pop('CLIZE_TRACE', None)
+        if self.environ is not None:
+            os.environ['CLIZE_TRACE'] = self.environ
+
+    def _capture_stderr(self):
+        orig = sys.stderr
+        self.addCleanup(setattr, sys, 'stderr', orig)
+        sys.stderr = cStringIO()
+        return sys.stderr
+
+    def _run(self, *args, **kwargs):
+        out = cStringIO()
+        runner.run(_greet, args=('test',) + args, out=out, exit=False,
+                   **kwargs)
+        return out.getvalue()
+
+    def _phases(self, tracer):
+        return [(name, depth) for name, depth, _, _ in tracer.records]
+
+    def test_disabled(self):
+        self.assertIsNone(trace.get_tracer())
+        self.assertIsNone(trace.get_tracer(False))
+        self._run('bob')
+        self.assertIsNone(trace.current)
+
+    def test_phases(self):
+        tracer = trace.Tracer(out=os.devnull)
+        self.assertEqual(self._run('bob', '2', trace=tracer),
+                         'hello bob hello bob\n')
+        self.assertEqual(self._phases(tracer), [
+            ('build signature of _greet', 0),
+            ('introspect _greet', 1),
+            ('process arguments', 0),
+            ('convert name', 1),
+            ('convert times', 1),
+            ('run test', 0),
+            ])
+        for name, depth, start, duration in tracer.records:
+            self.assertGreaterEqual(start, 0)
+            self.assertGreaterEqual(duration, 0)
+        self.assertIsNone(trace.current)
+
+    def test_help_phases(self):
+        tracer = trace.Tracer(out=os.devnull)
+        self.assertIn('Greets someone', self._run('--help', trace=tracer))
+        phases = self._phases(tracer)
+        self.assertIn(('process arguments', 0), phases)
+        self.assertIn(('run test --help', 0), phases)
+        names = [name for name, depth in phases]
+        self.assertIn('build help', names)
+        self.assertIn('render help', names)
+
+    def test_nested(self):
+        tracer = trace.Tracer()
+        with tracer.phase('outer'):
+            with tracer.phase('inner'):
+                pass
+            with tracer.phase('inner 2'):
+                pass
+        self.assertEqual(self._phases(tracer),
+                         [('outer', 0), ('inner', 1), ('inner 2', 1)])
+        outer, inner, inner2 = tracer.records
+        self.assertLessEqual(inner[2] + inner[3], inner2[2])
+        self.assertLessEqual(inner2[2] + inner2[3], outer[2] + outer[3])
+
+    def test_phase(self):
+        self.assertIsNone(trace.current)
+        with trace.phase('ignored'):
+            pass
+        tracer = trace.Tracer(out=os.devnull)
+        with trace.tracing(tracer):
+            with trace.phase('outer'):
+                with trace.phase('inner'):
+                    pass
+        self.assertEqual(self._phases(tracer), [('outer', 0), ('inner', 1)])
+        self.assertIsNone(trace.current)
+
+    def test_phase_name_args(self):
+        def name(*args):
+            names.append(args)
+            return ' '.join(args)
+        names = []
+        with trace.phase(name, 'ignored', 'phase'):
+            pass
+        with trace.phase(None, 'not formatted'):
+            pass
+        self.assertEqual(names, [])
+        tracer = trace.Tracer(out=os.devnull)
+        with trace.tracing(tracer):
+            with trace.phase(name, 'built', 'phase'):
+                pass
+            with trace.phase('convert {0} ({1} values)', 'args', 3):
+                pass
+        self.assertEqual(names, [('built', 'phase')])
+        self.assertEqual(self._phases(tracer), [
+            ('built phase', 0), ('convert args (3 values)', 0)])
+
+    def test_phase_error(self):
+        tracer = trace.Tracer(out=os.devnull)
+        with self.assertRaises(ValueError):
+            with trace.phase('ignored'):
+                raise ValueError
+        with self.assertRaises(ValueError):
+            with trace.tracing(tracer):
+                with trace.phase('failing'):
+                    raise ValueError
+        self.assertEqual(self._phases(tracer), [('failing', 0)])
+
+    def test_report_stderr(self):
+        err = self._capture_stderr()
+        self._run('bob', trace=True)
+        lines = err.getvalue().splitlines()
+        self.assertEqual(lines[0], 'clize trace:')
+        self.assertTrue(lines[-1].endswith(' ms  run test'), lines[-1])
+
+    def test_report_json(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'trace.json')
+        os.environ['CLIZE_TRACE'] = path
+        self._run('bob')
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual(report[-1]['phase'], 'run test')
+        self.assertEqual(report[-1]['depth'], 0)
+        self.assertGreaterEqual(report[-1]['duration_ms'], 0)
+
+    def test_environ(self):
+        os.environ['CLIZE_TRACE'] = '1'
+        self.assertIsInstance(trace.get_tracer(), trace.Tracer)
+        self.assertIsNone(trace.get_tracer().out)
+        for value in ('', '0', 'false', 'No', 'OFF'):
+            os.environ['CLIZE_TRACE'] = value
+            self.assertIsNone(trace.get_tracer())
+
+    def test_get_tracer(self):
+        tracer = trace.Tracer()
+        self.assertIs(trace.get_tracer(tracer), tracer)
+        self.assertEqual(trace.get_tracer('path').out, 'path')
+        self.assertRaises(TypeError, trace.get_tracer, 1)
+
+    def test_report_on_error(self):
+        tracer = trace.Tracer(out=os.devnull)
+        self._capture_stderr()
+        self._run(trace=tracer)
+        phases = self._phases(tracer)
+        self.assertIn(('process arguments', 0), phases)
+        self.assertNotIn(('run test', 0), phases)
+        self.assertIsNone(trace.current)
+
+
+@kwoargs('flag', 'opt')
+def _options(name, flag=False, opt=1):
+    """Greets someone
+
+    name: Who to greet
+
+    flag: A flag
+
+    opt: An option
+    """
+
+
+def _sphinx(name):
+    """Greets someone
+
+    :param name: Who to greet
+    """
+
+
+def _sphinx_directive(name):
+    """Greets someone
+
+    :param name: Who to greet
+
+    .. note:: Needs docutils
+    """
+
+
+class OperationCountTests(Tests):
+    def setUp(self):
+        # the help module is imported and the help CLI's own signature is
+        # built once for all commands
+        runner.Clize.get_cli(
+            _sphinx, helper_class=help.ClizeHelp)('test', '--help')
+
+    def _count(self, cli, *args):
+        with trace.counting() as counts:
+            try:
+                cli('test', *args)
+            except errors.ArgumentError as exc:
+                str(exc)
+        return counts
+
+    def _commands(self, count):
+        return [support.f('arg', name='command{0}'.format(i))
+                for i in range(count)]
+
+    def test_not_counting(self):
+        self.assertIsNone(trace.counts)
+        trace.count('signature')
+        self.assertIsNone(trace.counts)
+
+    def test_run(self):
+        self.assertEqual(
+            self._count(runner.Clize.get_cli(_options), 'bob', '--flag'),
+            {'signature': 1, 'CliSignature': 1})
+
+    def test_run_again(self):
+        cli = runner.Clize.get_cli(_options)
+        cli('test', 'bob')
+        self.assertEqual(self._count(cli, 'bob'), {})
+
+    def test_help(self):
+        self.assertEqual(
+            self._count(runner.Clize.get_cli(_options), '--help'),
+            {'Clize': 1, 'signature': 1, 'CliSignature': 1})
+
+    def test_help_again(self):
+        cli = runner.Clize.get_cli(_options)
+        cli('test', '--help')
+        self.assertEqual(self._count(cli, '--help'), {})
+
+    def test_help_sphinx(self):
+        counts = self._count(runner.Clize.get_cli(_sphinx), '--help')
+        self.assertNotIn('docutils parse', counts)
+        counts = self._count(runner.Clize.get_cli(_sphinx_directive),
+                             '--help')
+        self.assertEqual(counts['docutils parse'], 1)
+
+    def test_missing_argument(self):
+        self.assertEqual(
+            self._count(runner.Clize.get_cli(_options)),
+            {'signature': 1, 'CliSignature': 1})
+
+    def test_unknown_option(self):
+        self.assertEqual(
+            self._count(runner.Clize.get_cli(_options), '--flga', 'bob'),
+            {'signature': 1, 'CliSignature': 1,
+             'similarity': 1})
+
+    def test_dispatch(self):
+        cli = runner.Clize.get_cli(self._commands(50))
+        self.assertEqual(
+            self._count(cli, 'command20', 'x'),
+            {'Clize': 1, 'signature': 2, 'CliSignature': 2})
+
+    def test_dispatcher_help(self):
+        cli = runner.Clize.get_cli(self._commands(50))
+        self.assertEqual(
+            self._count(cli, '--help'),
+            {'Clize': 51, 'signature': 51, 'CliSignature': 51})
+
+    def test_unknown_command(self):
+        cli = runner.Clize.get_cli(self._commands(50))
+        self.assertEqual(
+            self._count(cli, 'comand20'),
+            {'signature': 1, 'CliSignature': 1,
+             'similarity': 1})
@@ -2,8 +2,10 @@
 # Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
 # COPYING for details.
 
+from six.moves import cPickle as pickle
+
 from clize import util
-from clize.tests.util import Fixtures
+from clize.tests.util import Fixtures, Tests
 
 
 def formatter(**kwargs):
@@ -240,3 +242,38 @@ class KeywordNameConversionTests(Fixtures):
     avoiding_name = "list_", "--list"
     private_name = "_name", "--name"
     private_one_letter = "_n", "-n"
+
+
+class SentinelTests(Tests):
+    def test_pickle_identity(self):
+        self.assertIs(pickle.loads(pickle.dumps(util.UNSET)), util.UNSET)
+
+
+class SuggestionIndexTests(Tests):
+    options = [
+        '--alpha', '--alphabet', '-a', '--beta', '--bet', '--gamma',
+        '--gammb', '--delta', '-d', '--verbose', '--version', '-v']
+
+    def test_matches_closest_option(self):
+        index = util.SuggestionIndex(self.options)
+        for search in ['--alpa', '--bta', '--gama', '--versoin', '-x', '--z',
+                       '', 'alpha', '--delta', '--gammx', '-b']:
+            for threshold in [0, 0.3, 0.6, 0.9]:
+                self.assertEqual(
+                    index.closest(search, threshold),
+                    util.closest_option(search, self.options, threshold))
+
+    def test_tie_keeps_order(self):
+        index = util.SuggestionIndex(['--ab', '--ba', '--aa'])
+        self.assertEqual(index.closest('--a'), '--ab')
+
+    def test_suggest_several(self):
+        index = util.SuggestionIndex(self.options)
+        self.assertEqual(index.suggest('--gammc', count=2),
+                         ['--gamma', '--gammb'])
+        self.assertEqual(index.suggest('--verbion', count=3),
+                         ['--version', '--verbose'])
+
+    def test_empty(self):
+        self.assertEqual(util.SuggestionIndex([]).suggest('--a', count=3), [])
+        self.assertEqual(util.SuggestionIndex([]).closest('--a', 0), None)
@@ -0,0 +1,204 @@
+# clize -- A command-line argument parser for Python
+# Copyright (C) 2011-2016 by Yann Kaiser and contributors. See AUTHORS and
+# COPYING for details.
+
+"""timing of the phases of running a command
+
+Set the ``CLIZE_TRACE`` environment variable to ``1`` to print how long
+each phase took on standard error, or to a file path to write them to that
+file as JSON. An empty value, ``0``, ``false``, ``no`` or ``off`` disables
+tracing. `.run` also accepts the same through its ``trace`` argument.
+
+The module also counts costly operations, such as introspecting a function
+or parsing a docstring with docutils, while `counting` is in use. Clize's
+tests use these counts to check how much work a command line takes.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import six
+
+
+current = None
+"""The `Tracer` recording phases, or `None` when tracing is disabled.
+
+Instrumented code goes through `phase`, which checks this before doing
+anything else, so that tracing costs next to nothing when it is disabled."""
+
+
+counts = None
+"""Dict mapping operation names to how many times they were performed, or
+`None` when operations aren't being counted."""
+
+
+def count(operation):
+    """Records that ``operation`` was performed once, if operations are
+    being counted.
+
+    The operations counted by clize are:
+
+    ``'signature'``
+        Introspecting a callable with `sigtools.specifiers.signature`.
+    ``'CliSignature'``
+        Creating a `.parser.CliSignature`.
+    ``'Clize'``
+        Creating a `.Clize` object.
+    ``'docutils parse'``
+        Parsing a docstring with docutils.
+    ``'similarity'``
+        Comparing two strings with `.util.compute_similarity` to suggest
+        a correction.
+    """
+    if counts is not None:
+        counts[operation] = counts.get(operation, 0) + 1
+
+
+@contextmanager
+def counting():
+    """Counts operations performed within the ``with`` block in the dict it
+    returns."""
+    global counts
+    previous = counts
+    counts = {}
+    try:
+        yield counts
+    finally:
+        counts = previous
+
+
+try:
+    _clock = time.perf_counter
+except AttributeError:
+    _clock = time.time
+
+
+class Tracer(object):
+    """Records how long each phase of running a command took.
+
+    :param out: Where to write the report: `None` for standard error, or a
+        path to write it to as JSON.
+    """
+
+    def __init__(self, out=None):
+        self.out = out
+        self.records = []
+        """List of ``[name, depth, start, duration]`` lists, in the order
+        the phases started. Times are in seconds."""
+        self._depth = 0
+        self._start = _clock()
+
+    @contextmanager
+    def phase(self, name):
+        """Records the time taken by the ``with`` block as phase ``name``.
+        Phases started within it are recorded as its children."""
+        record = [name, self._depth, _clock() - self._start, None]
+        self.records.append(record)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record[3] = _clock() - self._start - record[2]
+
+    def as_dicts(self):
+        """Returns the records as dictionaries with ``phase``, ``depth``,
+        ``start_ms`` and ``duration_ms`` keys."""
+        return [
+            {
+                'phase': name, 'depth': depth,
+                'start_ms': start * 1000,
+                'duration_ms': None if duration is None else duration * 1000,
+            }
+            for name, depth, start, duration in self.records]
+
+    def format_report(self):
+        """Returns the records as text, one phase per line."""
+        lines = ['clize trace:']
+        for name, depth, start, duration in self.records:
+            if duration is None:
+                duration_text = '       ?   '
+            else:
+                duration_text = '{0:8.3f} ms'.format(duration * 1000)
+            lines.append('{0}  {1}{2}'.format(
+                duration_text, '  ' * depth, name))
+        return '\n'.join(lines)
+
+    def write_report(self):
+        """Writes the report to ``out``."""
+        if self.out is None:
+            print(self.format_report(), file=sys.stderr)
+        else:
+            import json
+            with open(self.out, 'w') as f:
+                json.dump(self.as_dicts(), f, indent=1)
+
+
+class _NoPhase(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name, *args):
+    """Returns a context manager recording the ``with`` block as phase
+    ``name`` of the `current` tracer, or doing nothing if there is none.
+
+    With ``args``, ``name`` is a format string or a function that builds
+    the phase name from them, only when tracing."""
+    tracer = current
+    if tracer is None:
+        return _NO_PHASE
+    if args:
+        name = name(*args) if callable(name) else name.format(*args)
+    return tracer.phase(name)
+
+
+_DISABLED = ('', '0', 'false', 'no', 'off')
+
+
+def get_tracer(trace=None):
+    """Returns a `Tracer` from ``trace``, which is passed on by `.run`.
+
+    ``trace`` can be a `Tracer`, `True` to report on standard error, a path
+    to write a JSON report to, or `None` to read the ``CLIZE_TRACE``
+    environment variable the same way. Returns `None` if tracing is
+    disabled.
+    """
+    if trace is None:
+        trace = os.environ.get('CLIZE_TRACE', '')
+        if trace.lower() in _DISABLED:
+            trace = None
+        elif trace in ('1', 'stderr'):
+            trace = True
+    if trace is None or trace is False or isinstance(trace, Tracer):
+        return trace or None
+    if trace is True:
+        return Tracer()
+    if isinstance(trace, six.string_types):
+        return Tracer(trace)
+    raise TypeError("trace must be a Tracer, a boolean or a path, got {0!r}"
+                    .format(trace))
+
+
+@contextmanager
+def tracing(tracer):
+    """Makes ``tracer`` the `current` tracer for the ``with`` block, then
+    writes its report."""
+    global current
+    previous = current
+    current = tracer
+    try:
+        yield tracer
+    finally:
+        current = previous
+        tracer.write_report()
@@ -5,6 +5,7 @@
 """various"""
 
 import os
+import inspect
 from functools import partial, update_wrapper
 import itertools
 import textwrap
@@ -15,18 +16,38 @@ try:
 except ImportError:
     from ordereddict import OrderedDict
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 import six
 
+from clize import trace
+
+
+_sentinels = {}
+
+
+def _get_sentinel(name):
+    return _sentinels[name]
+
 
 class Sentinel(object):
     __slots__ = ('name')
 
     def __init__(self, name):
         self.name = name
+        _sentinels.setdefault(name, self)
 
     def __repr__(self):
         return self.name
 
+    def __reduce__(self):
+        # unpickle as the very same object so that identity checks such as
+        # ``default is UNSET`` keep working
+        return _get_sentinel, (self.name,)
+
 UNSET = Sentinel('<unset>')
 
 try:
@@ -35,6 +56,7 @@ except AttributeError:
     zip_longest = itertools.izip_longest
 
 def compute_similarity(word1, word2):
+    trace.count('similarity')
     seq_matcher = SequenceMatcher(None, word1, word2)
     return seq_matcher.ratio()
 
@@ -48,6 +70,72 @@ def closest_option(search, options, threshold=0.6):
     return None
 
 
+class SuggestionIndex(object):
+    """Finds the options most similar to a string, as measured by
+    `compute_similarity`, without comparing the string against every
+    option.
+
+    Similarity can't exceed ``2 * M / T``, where ``M`` is the number of
+    characters both strings have in common and ``T`` their total length.
+    The index maps characters to the options they appear in, so that this
+    bound is computed for all options at once. Only the options whose bound
+    can beat the best matches found so far are compared fully.
+
+    :param options: The strings to pick suggestions from.
+    """
+
+    def __init__(self, options):
+        self.options = list(options)
+        self.postings = {}
+        for i, option in enumerate(self.options):
+            for char, count in _char_counts(option).items():
+                self.postings.setdefault(char, []).append((i, count))
+
+    def _bounds(self, search, threshold):
+        common = {}
+        for char, count in _char_counts(search).items():
+            for i, opt_count in self.postings.get(char, ()):
+                common[i] = common.get(i, 0) + min(count, opt_count)
+        indices = range(len(self.options)) if threshold <= 0 else common
+        for i in indices:
+            total = len(search) + len(self.options[i])
+            bound = 2.0 * common.get(i, 0) / total if total else 1.0
+            if bound >= threshold:
+                yield bound, i
+
+    def suggest(self, search, threshold=0.6, count=1):
+        """Returns up to ``count`` options whose similarity with ``search``
+        is at least ``threshold``, most similar first. Options that are as
+        similar as each other are returned in their original order.
+
+        With ``count=1``, the result matches that of `closest_option`.
+        """
+        best = []
+        for bound, i in sorted(self._bounds(search, threshold),
+                               key=lambda item: (-item[0], item[1])):
+            if len(best) >= count and bound < -best[-1][0]:
+                break
+            ratio = compute_similarity(search, self.options[i])
+            if ratio >= threshold:
+                best.append((-ratio, i))
+                best.sort()
+                del best[count:]
+        return [self.options[i] for _, i in best]
+
+    def closest(self, search, threshold=0.6):
+        """Returns the option most similar to ``search``, or `None` if none
+        reach ``threshold``."""
+        ret = self.suggest(search, threshold, 1)
+        return ret[0] if ret else None
+
+
+def _char_counts(s):
+    ret = {}
+    for char in s:
+        ret[char] = ret.get(char, 0) + 1
+    return ret
+
+
 def to_kebap_case(s):
     had_letter = False
     for c in s:
@@ -95,6 +183,37 @@ def maybe_iter(x):
             return x,
     return x
 
+_isawaitable = getattr(inspect, 'isawaitable', None)
+
+
+def isawaitable(obj):
+    """Tells whether ``obj`` is a coroutine or another object that can be
+    awaited. Always false before Python 3.5."""
+    return _isawaitable is not None and _isawaitable(obj)
+
+
+_iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+
+
+def iscoroutinefunction(func):
+    """Tells whether ``func``, or a function it wraps or partially applies,
+    was defined with ``async def``. Always false before Python 3.5."""
+    while _iscoroutinefunction is not None and func is not None:
+        if _iscoroutinefunction(func):
+            return True
+        if isinstance(func, partial):
+            func = func.func
+        else:
+            func = getattr(func, '__wrapped__', None)
+    return False
+
+
+def run_awaitable(awaitable):
+    """Runs ``awaitable`` to completion on a new event loop and returns its
+    result."""
+    from clize import _async
+    return _async.run(awaitable)
+
 def dict_from_names(obj, receiver=None):
     try:
         obj.items
@@ -111,6 +230,35 @@ def dict_from_names(obj, receiver=None):
     receiver.update((x.__name__, x) for x in maybe_iter(obj))
     return receiver
 
+class LazyMapping(Mapping):
+    """Read-only mapping whose values are produced by calling ``factory``
+    on the corresponding value of ``sources`` the first time they are
+    looked up. Iteration order and length follow ``sources``."""
+
+    def __init__(self, sources, factory):
+        self.sources = sources
+        self.factory = factory
+        self._values = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        ret = self._values[key] = self.factory(self.sources[key])
+        return ret
+
+    def __iter__(self):
+        return iter(self.sources)
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __repr__(self):
+        return '{0}({1!r}, {2!r})'.format(
+            type(self).__name__, self.sources, self.factory)
+
+
 class property_once(object):
     def __init__(self, func):
         update_wrapper(self, func)